@@ -1,9 +1,14 @@
 import { NextRequest, NextResponse } from 'next/server';
 
-export async function GET() {
+export async function GET(request: NextRequest) {
+  // Files are only served by the artifact id from /api/generate
+  const artifactId = request.nextUrl.searchParams.get('artifact_id');
+  if (!artifactId) {
+    return NextResponse.json({ error: 'artifact_id is required' }, { status: 400 });
+  }
   try {
     // Proxy to internal backend server
-    const backendUrl = 'http://localhost:8000/api/download/excel';
+    const backendUrl = `http://localhost:8000/api/download/excel?artifact_id=${encodeURIComponent(artifactId)}`;
     const response = await fetch(backendUrl);
     
     if (!response.ok) {
@@ -23,6 +23,7 @@ import {
   DropdownMenuItem,
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu";
+import { listProjects } from "@/lib/projects";
 
 type Project = {
   id: number;
@@ -38,10 +39,9 @@ export default function DashboardPage() {
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
-    fetch("/api/projects")
-      .then((res) => res.json())
+    listProjects<Project>()
       .then((data) => {
-        setProjects(data.projects || data || []);
+        setProjects(data);
         setIsLoading(false);
       })
       .catch(() => setIsLoading(false));
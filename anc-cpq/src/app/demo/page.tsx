@@ -5,6 +5,8 @@ import { Card, CardContent, CardDescription, CardFooter, CardHeader, CardTitle }
 import { Button } from "@/components/ui/button"
 import { Badge } from "@/components/ui/badge"
 import { AlertCircle, CheckCircle2, Download, FileSpreadsheet, FileText, LayoutDashboard, Mail, RefreshCw, Smartphone } from "lucide-react"
+import { artifactUrl } from "@/lib/proposal-request"
+import { listProjects } from "@/lib/projects"
 
 export default function DemoPage() {
   const [projects, setProjects] = useState<any[]>([])
@@ -12,10 +14,11 @@ export default function DemoPage() {
   const [status, setStatus] = useState<string>('')
   const [loading, setLoading] = useState(false)
   const [emailAddr, setEmailAddr] = useState('')
+  // Artifact ids from the last generate; files are only served by id
+  const [artifacts, setArtifacts] = useState<{ excel: string; pdf: string } | null>(null)
 
   useEffect(() => {
-    fetch('/api/projects')
-      .then(r => r.json())
+    listProjects()
       .then((d) => {
         setProjects(d)
         // Auto-select demo if exists
@@ -43,13 +46,14 @@ export default function DemoPage() {
         timeline: 'standard'
       }
       
-      const r = await fetch('/api/generate', {
+      const r = await fetch('/api/generate?fields=summary', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(payload)
       })
       
       if (r.ok) {
+        setArtifacts((await r.json()).artifacts)
         setStatus('Success: PDF & Excel generated')
       } else {
         const j = await r.json()
@@ -166,10 +170,10 @@ export default function DemoPage() {
                         </Button>
                     </CardContent>
                     <CardFooter className="flex gap-2">
-                        <Button variant="outline" size="sm" onClick={() => openLink('/api/download/pdf')} className="flex-1">
+                        <Button variant="outline" size="sm" onClick={() => artifacts && openLink(artifactUrl('pdf', artifacts.pdf))} disabled={!artifacts} className="flex-1">
                             <FileText className="mr-2 h-4 w-4 text-red-500"/> View PDF
                         </Button>
-                        <Button variant="outline" size="sm" onClick={() => openLink('/api/download/excel')} className="flex-1">
+                        <Button variant="outline" size="sm" onClick={() => artifacts && openLink(artifactUrl('excel', artifacts.excel))} disabled={!artifacts} className="flex-1">
                             <FileSpreadsheet className="mr-2 h-4 w-4 text-green-600"/> View Excel
                         </Button>
                     </CardFooter>
@@ -6,6 +6,7 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { ArrowLeft, FileText, Download } from "lucide-react"
 import Link from "next/link"
+import { ArtifactKind, openGeneratedArtifact, toProjectRequest } from "@/lib/proposal-request"
 
 export default function ProjectDetailPage() {
   const params = useParams()
@@ -23,6 +24,13 @@ export default function ProjectDetailPage() {
       .finally(() => setLoading(false))
   }, [projectId])
 
+  const download = (kind: ArtifactKind) =>
+    openGeneratedArtifact(kind, toProjectRequest({ clientName: project.client_name, ...project.state }))
+      .catch((e) => {
+        console.error(e)
+        alert('Failed to generate the file')
+      })
+
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-screen">
@@ -81,11 +89,11 @@ export default function ProjectDetailPage() {
               <FileText className="h-4 w-4" />
               Edit in Wizard
             </Button>
-            <Button variant="outline" className="w-full gap-2" onClick={() => window.open('/api/download/pdf', '_blank')}>
+            <Button variant="outline" className="w-full gap-2" onClick={() => download('pdf')}>
               <Download className="h-4 w-4" />
               Download PDF
             </Button>
-            <Button variant="outline" className="w-full gap-2" onClick={() => window.open('/api/download/excel', '_blank')}>
+            <Button variant="outline" className="w-full gap-2" onClick={() => download('excel')}>
               <Download className="h-4 w-4" />
               Download Excel
             </Button>
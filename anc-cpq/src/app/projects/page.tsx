@@ -21,6 +21,7 @@ import {
   DropdownMenuItem,
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu";
+import { listProjects } from "@/lib/projects";
 
 type Project = {
   id: number;
@@ -36,10 +37,9 @@ export default function ProjectsPage() {
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
-    fetch("/api/projects")
-      .then((res) => res.json())
+    listProjects<Project>()
       .then((data) => {
-        setProjects(data.projects || data || []);
+        setProjects(data);
         setIsLoading(false);
       })
       .catch(() => setIsLoading(false));
@@ -21,8 +21,11 @@ import {
 import ConfirmModal from "./ConfirmModal";
 import { WIZARD_QUESTIONS } from "../lib/wizard-questions";
 import { CPQInput } from "../lib/types";
+import { createPatch, rebase } from "../lib/json-patch";
+import { ArtifactKind, openGeneratedArtifact, toProjectRequest } from "../lib/proposal-request";
 import { ModelSelector } from "./ModelSelector";
 import { DEFAULT_MODEL } from "../lib/ai-models";
+import { listProjects } from "../lib/projects";
 import clsx from "clsx";
 
 interface ConversationalWizardProps {
@@ -236,22 +239,21 @@ export function ConversationalWizard({
     const inputRef = useRef<HTMLInputElement>(null);
     const fileInputRef = useRef<HTMLInputElement>(null);
     const searchTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+    // Last state the server acknowledged, so autosave can send a JSON Patch
+    const savedStateRef = useRef<{ projectId: number; version: number; state: any } | null>(null);
 
     // Fetch All Projects (History)
     const fetchHistory = useCallback(async () => {
         try {
-            const res = await fetch("/api/projects");
-            if (res.ok) {
-                const data = await res.json();
-                const historyAsProposals: SavedProposal[] = data.map((p: any) => ({
-                    id: p.id.toString(),
-                    name: p.client_name || "Untitled Project",
-                    timestamp: new Date(p.created_at).getTime(),
-                    state: p.state || {},
-                    messages: [] // Don't need all messages for the list
-                }));
-                setSavedProposals(historyAsProposals);
-            }
+            const data = await listProjects();
+            const historyAsProposals: SavedProposal[] = data.map((p: any) => ({
+                id: p.id.toString(),
+                name: p.client_name || "Untitled Project",
+                timestamp: new Date(p.created_at).getTime(),
+                state: p.state || {},
+                messages: [] // Don't need all messages for the list
+            }));
+            setSavedProposals(historyAsProposals);
         } catch (e) {
             console.error("Failed to fetch project history", e);
         }
@@ -266,6 +268,7 @@ export function ConversationalWizard({
                 const res = await fetch(`/api/projects/${savedId}`);
                 if (res.ok) {
                     const data = await res.json();
+                    savedStateRef.current = { projectId: data.id, version: data.version ?? 0, state: data.state || {} };
                     setProjectId(data.id);
                     if (onProjectInit) onProjectInit(data.id);
                     if (data.messages && data.messages.length > 0) {
@@ -287,6 +290,7 @@ export function ConversationalWizard({
             const res = await fetch("/api/projects", { method: "POST" });
             if (res.ok) {
                 const data = await res.json();
+                savedStateRef.current = { projectId: data.id, version: 0, state: {} };
                 setProjectId(data.id);
                 if (onProjectInit) onProjectInit(data.id);
                 localStorage.setItem("anc_project_id", data.id.toString());
@@ -311,12 +315,50 @@ export function ConversationalWizard({
     // Save state to Server (DB) on changes
     useEffect(() => {
         if (projectId && Object.keys(cpqState).length > 0) {
-            const timeoutId = setTimeout(() => {
-                fetch(`/api/projects/${projectId}/state`, {
-                    method: "PUT",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify(cpqState),
-                }).catch((e) => console.error("Failed to auto-save state", e));
+            const timeoutId = setTimeout(async () => {
+                // Snapshot what is being sent; the ref only moves on success
+                const state = JSON.parse(JSON.stringify(cpqState));
+                const known = savedStateRef.current;
+                let base = known && known.projectId === projectId ? known : null;
+                try {
+                    // Local edits since the last state the server acknowledged
+                    const edits = createPatch(base ? base.state : {}, state);
+                    if (edits.length === 0) return;
+                    let target = state;
+                    for (let attempt = 0; attempt < 3; attempt++) {
+                        if (base) {
+                            const patch = createPatch(base.state, target);
+                            let version = base.version;
+                            if (patch.length > 0) {
+                                const res = await fetch(`/api/projects/${projectId}/state`, {
+                                    method: "PATCH",
+                                    headers: { "Content-Type": "application/json" },
+                                    body: JSON.stringify({ version: base.version, patch }),
+                                });
+                                // 409 (edited elsewhere) or 422: re-sync below and retry
+                                if (res.status === 409 || res.status === 422) base = null;
+                                else if (!res.ok) return;
+                                else version = (await res.json()).version;
+                            }
+                            if (base) {
+                                savedStateRef.current = { projectId, version, state: target };
+                                if (target !== state) {
+                                    // Keep other tabs' changes, and anything typed meanwhile
+                                    setCpqState((current) => rebase(target, createPatch(state, current)));
+                                }
+                                return;
+                            }
+                        }
+                        // Fetch the latest version and replay our edits on top of it
+                        const res = await fetch(`/api/projects/${projectId}`);
+                        if (!res.ok) return;
+                        const data = await res.json();
+                        base = { projectId, version: data.version ?? 0, state: data.state || {} };
+                        target = rebase(base.state, edits);
+                    }
+                } catch (e) {
+                    console.error("Failed to auto-save state", e);
+                }
             }, 1000); // Debounce save
             return () => clearTimeout(timeoutId);
         }
@@ -1252,6 +1294,7 @@ export function ConversationalWizard({
             const res = await fetch("/api/projects", { method: "POST" });
             if (res.ok) {
                 const data = await res.json();
+                savedStateRef.current = { projectId: data.id, version: 0, state: {} };
                 setProjectId(data.id);
                 if (onProjectInit) onProjectInit(data.id);
                 localStorage.setItem("anc_project_id", data.id.toString());
@@ -1266,6 +1309,7 @@ export function ConversationalWizard({
             const res = await fetch(`/api/projects/${prop.id}`);
             if (res.ok) {
                 const data = await res.json();
+                savedStateRef.current = { projectId: data.id, version: data.version ?? 0, state: data.state || {} };
                 setProjectId(data.id);
                 if (onProjectInit) onProjectInit(data.id);
                 localStorage.setItem("anc_project_id", data.id.toString());
@@ -1316,6 +1360,14 @@ export function ConversationalWizard({
         }
     };
 
+    // Render the current state and open this session's own file
+    const downloadArtifact = (kind: ArtifactKind) => {
+        openGeneratedArtifact(kind, toProjectRequest(cpqState as CPQInput)).catch((e) => {
+            console.error(`Failed to download ${kind}`, e);
+            alert(`${kind === "pdf" ? "PDF" : "Excel"} generation failed`);
+        });
+    };
+
     // Compute current step for widget rendering (used in JSX)
     const currentNextStep = messages[messages.length - 1]?.nextStep;
     const widgetDef = WIZARD_QUESTIONS.find((q) => q.id === currentNextStep);
@@ -2052,7 +2104,7 @@ export function ConversationalWizard({
                 {/* Export Actions Row */}
                 <div className="flex gap-2 mb-2 justify-end">
                     <button
-                        onClick={() => window.open('/api/download-pdf', '_blank')}
+                        onClick={() => downloadArtifact("pdf")}
                         disabled={!cpqState.clientName}
                         className="px-3 py-1.5 bg-slate-900 hover:bg-blue-900/50 text-slate-400 hover:text-blue-400 rounded-lg border border-slate-800 transition-all active:scale-95 disabled:opacity-30 disabled:cursor-not-allowed text-xs font-medium flex items-center gap-1.5"
                         title="Download Client PDF"
@@ -2061,7 +2113,7 @@ export function ConversationalWizard({
                         PDF
                     </button>
                     <button
-                        onClick={() => window.open('/api/download-excel', '_blank')}
+                        onClick={() => downloadArtifact("excel")}
                         disabled={!cpqState.clientName}
                         className="px-3 py-1.5 bg-slate-900 hover:bg-green-900/50 text-slate-400 hover:text-green-400 rounded-lg border border-slate-800 transition-all active:scale-95 disabled:opacity-30 disabled:cursor-not-allowed text-xs font-medium flex items-center gap-1.5"
                         title="Download Internal Excel"
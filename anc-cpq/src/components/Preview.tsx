@@ -4,6 +4,7 @@ import { CPQInput, CalculationResult, ScreenConfig } from '../lib/types';
 import { Download, Layers, ShieldCheck, Clock, Zap, FileText, Table2, Share2, Loader2 } from 'lucide-react';
 import { ANCLogo } from './ANCLogo';
 import { calculateScreen } from '../lib/calculator';
+import { artifactUrl, toProjectRequest } from '../lib/proposal-request';
 import { ExcelPreview } from './ExcelPreview';
 import { Button } from '@/components/ui/button';
 
@@ -162,61 +163,17 @@ export default function Preview({ input, result, projectId, onUpdateField, initi
         }
       } else {
         // EXCEL GENERATION
-        const payload = {
-          client_name: input.clientName || "Proposal",
-          screens: (input.screens && input.screens.length > 0) ? input.screens.map(s => ({
-            product_class: s.productClass,
-            pixel_pitch: String(s.pixelPitch),
-            width_ft: s.widthFt,
-            height_ft: s.heightFt,
-            is_outdoor: s.environment === 'Outdoor',
-            shape: s.shape,
-            access: s.access,
-            complexity: s.complexity,
-            structure_condition: s.structureCondition || 'Existing',
-            labor_type: s.laborType || 'NonUnion',
-            power_distance: s.powerDistance || 'Close',
-            mounting_type: s.mountingType || input.mountingType || 'Wall',
-            venue_type: input.venueType || 'corporate',
-            target_margin: input.targetMargin || 30.0,
-            permits: s.permits || 'Client',
-            control_system: s.controlSystem || 'Include',
-            bond_required: !!s.bondRequired
-          })) : [{
-            product_class: input.productClass,
-            pixel_pitch: String(input.pixelPitch),
-            width_ft: input.widthFt,
-            height_ft: input.heightFt,
-            is_outdoor: input.environment === 'Outdoor',
-            shape: input.shape,
-            access: input.access,
-            complexity: input.complexity,
-            structure_condition: input.structureCondition || 'Existing',
-            unit_cost: input.unitCost || 0,
-            target_margin: input.targetMargin || 0,
-            labor_type: input.laborType || 'NonUnion',
-            power_distance: input.powerDistance || 'Close',
-            mounting_type: input.mountingType || 'Wall',
-            venue_type: input.venueType || 'corporate',
-            permits: input.permits || 'Client',
-            control_system: input.controlSystem || 'Include',
-            bond_required: !!input.bondRequired
-          }],
-          service_level: input.serviceLevel || 'bronze',
-          timeline: input.timeline || 'standard',
-          permits: input.permits || 'client',
-          control_system: input.controlSystem || 'include',
-          bond_required: !!input.bondRequired
-        };
-
-        const genRes = await fetch('/api/generate', {
+        const payload = toProjectRequest(input);
+
+        const genRes = await fetch('/api/generate?fields=summary', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify(payload)
         });
 
         if (genRes.ok) {
-          const downloadRes = await fetch('/api/download/excel');
+          const { artifacts } = await genRes.json();
+          const downloadRes = await fetch(artifactUrl('excel', artifacts.excel));
           if (downloadRes.ok) {
             const blob = await downloadRes.blob();
             const url = window.URL.createObjectURL(blob);
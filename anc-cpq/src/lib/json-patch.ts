@@ -0,0 +1,63 @@
+// RFC 6902 JSON Patch generation for delta state saves
+// (PATCH /api/projects/{id}/state). Objects are diffed key by key;
+// arrays and scalars that changed are replaced whole.
+
+export type PatchOperation =
+    | { op: "add" | "replace"; path: string; value: unknown }
+    | { op: "remove"; path: string };
+
+const escapeToken = (key: string) => key.replace(/~/g, "~0").replace(/\//g, "~1");
+
+const isObject = (value: unknown): value is Record<string, unknown> =>
+    typeof value === "object" && value !== null && !Array.isArray(value);
+
+const isEqual = (a: unknown, b: unknown) => JSON.stringify(a) === JSON.stringify(b);
+
+export function createPatch(previous: unknown, next: unknown, path = ""): PatchOperation[] {
+    if (isObject(previous) && isObject(next)) {
+        const ops: PatchOperation[] = [];
+        for (const key of Object.keys(previous)) {
+            if (previous[key] !== undefined && (!(key in next) || next[key] === undefined)) {
+                ops.push({ op: "remove", path: `${path}/${escapeToken(key)}` });
+            }
+        }
+        for (const [key, value] of Object.entries(next)) {
+            if (value === undefined) continue;
+            const child = `${path}/${escapeToken(key)}`;
+            if (!(key in previous) || previous[key] === undefined) {
+                ops.push({ op: "add", path: child, value });
+            } else if (!isEqual(previous[key], value)) {
+                ops.push(...createPatch(previous[key], value, child));
+            }
+        }
+        return ops;
+    }
+    return isEqual(previous, next) ? [] : [{ op: "replace", path, value: next }];
+}
+
+const unescapeToken = (token: string) => token.replace(/~1/g, "/").replace(/~0/g, "~");
+
+// Replay ``ops`` (from createPatch) on a copy of a newer ``doc``, e.g. local
+// edits on top of the state another tab saved in the meantime. Missing
+// parents are created and removes of absent keys are skipped, so where both
+// sides touched the same field the replayed edit wins.
+export function rebase<T = any>(doc: unknown, ops: PatchOperation[]): T {
+    let root: any = JSON.parse(JSON.stringify(doc ?? {}));
+    for (const op of ops) {
+        const tokens = op.path.split("/").slice(1).map(unescapeToken);
+        if (tokens.length === 0) {
+            root = op.op === "remove" ? {} : JSON.parse(JSON.stringify(op.value));
+            continue;
+        }
+        if (!isObject(root)) root = {};
+        let parent: any = root;
+        for (const token of tokens.slice(0, -1)) {
+            if (!isObject(parent[token])) parent[token] = {};
+            parent = parent[token];
+        }
+        const key = tokens[tokens.length - 1];
+        if (op.op === "remove") delete parent[key];
+        else parent[key] = op.value;
+    }
+    return root;
+}
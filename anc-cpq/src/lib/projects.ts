@@ -0,0 +1,20 @@
+// Project list paging for /api/projects.
+// The endpoint returns one keyset page at a time (newest first) and sets
+// X-Next-Cursor while more projects follow; listProjects follows it so the
+// lists and dashboard totals cover every project, not just the first page.
+
+const PAGE_SIZE = 200; // the server's maximum page
+
+export async function listProjects<T = any>(params: Record<string, string> = {}): Promise<T[]> {
+  const projects: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const query = new URLSearchParams({ ...params, limit: String(PAGE_SIZE) });
+    if (cursor) query.set("cursor", cursor);
+    const res = await fetch(`/api/projects?${query}`);
+    if (!res.ok) throw new Error(`Failed to list projects (${res.status})`);
+    projects.push(...(await res.json()));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return projects;
+}
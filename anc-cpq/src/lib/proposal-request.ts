@@ -0,0 +1,83 @@
+// Request builder and artifact downloads for /api/generate.
+// Generated files are only served by id (/api/download/{kind}?artifact_id=),
+// so every download goes through the artifacts of a generate response.
+import { CPQInput } from "./types";
+
+export type ArtifactKind = "excel" | "pdf";
+
+export function toProjectRequest(input: CPQInput) {
+  return {
+    client_name: input.clientName || "Proposal",
+    screens: (input.screens && input.screens.length > 0) ? input.screens.map(s => ({
+      product_class: s.productClass,
+      pixel_pitch: String(s.pixelPitch),
+      width_ft: s.widthFt,
+      height_ft: s.heightFt,
+      is_outdoor: s.environment === 'Outdoor',
+      shape: s.shape,
+      access: s.access,
+      complexity: s.complexity,
+      structure_condition: s.structureCondition || 'Existing',
+      labor_type: s.laborType || 'NonUnion',
+      power_distance: s.powerDistance || 'Close',
+      mounting_type: s.mountingType || input.mountingType || 'Wall',
+      venue_type: input.venueType || 'corporate',
+      target_margin: input.targetMargin || 30.0,
+      permits: s.permits || 'Client',
+      control_system: s.controlSystem || 'Include',
+      bond_required: !!s.bondRequired
+    })) : [{
+      product_class: input.productClass,
+      pixel_pitch: String(input.pixelPitch),
+      width_ft: input.widthFt,
+      height_ft: input.heightFt,
+      is_outdoor: input.environment === 'Outdoor',
+      shape: input.shape,
+      access: input.access,
+      complexity: input.complexity,
+      structure_condition: input.structureCondition || 'Existing',
+      unit_cost: input.unitCost || 0,
+      target_margin: input.targetMargin || 0,
+      labor_type: input.laborType || 'NonUnion',
+      power_distance: input.powerDistance || 'Close',
+      mounting_type: input.mountingType || 'Wall',
+      venue_type: input.venueType || 'corporate',
+      permits: input.permits || 'Client',
+      control_system: input.controlSystem || 'Include',
+      bond_required: !!input.bondRequired
+    }],
+    service_level: input.serviceLevel || 'bronze',
+    timeline: input.timeline || 'standard',
+    permits: input.permits || 'client',
+    control_system: input.controlSystem || 'include',
+    bond_required: !!input.bondRequired
+  };
+}
+
+export const artifactUrl = (kind: ArtifactKind, artifactId: string) =>
+  `/api/download/${kind}?artifact_id=${encodeURIComponent(artifactId)}`;
+
+// Render the proposal and return its artifact ids ({ excel, pdf })
+export async function generateArtifacts(request: object): Promise<Record<ArtifactKind, string>> {
+  const res = await fetch("/api/generate?fields=summary", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(request),
+  });
+  if (!res.ok) throw new Error(`Proposal generation failed (${res.status})`);
+  const { artifacts } = await res.json();
+  return artifacts;
+}
+
+// Generate and open one file in a new tab. The tab is opened up front so
+// the browser still treats it as a response to the click.
+export async function openGeneratedArtifact(kind: ArtifactKind, request: object) {
+  const tab = window.open("", "_blank");
+  try {
+    const artifacts = await generateArtifacts(request);
+    if (tab) tab.location.href = artifactUrl(kind, artifacts[kind]);
+  } catch (e) {
+    tab?.close();
+    throw e;
+  }
+}
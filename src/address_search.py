@@ -0,0 +1,195 @@
+"""
+Address / venue search for the project wizard.
+
+Every keystroke in the address field used to open a fresh httpx client (and
+TLS handshake) to Serper and then to Nominatim, with no caching. AddressSearch
+keeps one pooled keep-alive client for the life of the app, caches results
+per normalised query (LRU with a TTL) and coalesces identical in-flight
+queries, via SingleFlight, for both /api/search-places and
+/api/search-address.
+
+Providers are called through a ProviderOrchestrator: Nominatim is fired as
+a hedge when Serper has not answered within the latency budget, and each
+provider has its own circuit breaker and latency stats (see
+provider_orchestrator.py). Lookups where every provider failed are not
+cached, so a provider outage does not pin empty results for the TTL.
+
+Configuration (environment):
+    SERPER_API_KEY                 enables Serper (Google Places) as first choice
+    SERPER_PLACES_URL              default https://google.serper.dev/places
+    NOMINATIM_SEARCH_URL           default https://nominatim.openstreetmap.org/search
+    ADDRESS_SEARCH_TTL_SECONDS     cache lifetime (default 600)
+    ADDRESS_SEARCH_CACHE_ENTRIES   cache size (default 1024)
+"""
+
+import asyncio
+import os
+import re
+from typing import Dict, List, Optional
+
+import httpx
+
+from provider_orchestrator import NoProviderAvailable, Provider, ProviderOrchestrator
+from singleflight import SingleFlight
+
+MAX_RESULTS = 5
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def _serper_places(data: Dict) -> List[Dict]:
+    results = []
+    for place in data.get("places", []):
+        # Use displayName if title missing
+        title = place.get("title") or place.get("displayName", "Unknown")
+        lat = place.get("latitude")
+        lng = place.get("longitude")
+        if lat is not None and lng is not None:
+            results.append(
+                {
+                    "title": title,
+                    "address": place.get("address", ""),
+                    "lat": float(lat),
+                    "lng": float(lng),
+                }
+            )
+    return results
+
+
+def _nominatim_places(data: List[Dict]) -> List[Dict]:
+    results = []
+    for place in data:
+        # Build a readable address
+        addr = place.get("address", {})
+        address_parts = [
+            addr[part]
+            for part in ("name", "road", "city", "state", "postcode")
+            if addr.get(part)
+        ]
+        results.append(
+            {
+                "title": place.get("display_name", "").split(",")[0].strip(),
+                "address": ", ".join(address_parts),
+                "lat": float(place.get("lat", 0)),
+                "lng": float(place.get("lon", 0)),
+            }
+        )
+    return results
+
+
+class AddressSearch:
+    def __init__(
+        self,
+        serper_key: Optional[str] = None,
+        serper_url: Optional[str] = None,
+        nominatim_url: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        timeout: float = 5.0,
+        hedge_after: Optional[float] = None,
+    ):
+        self.serper_key = serper_key if serper_key is not None else os.getenv("SERPER_API_KEY")
+        self.serper_url = serper_url or os.getenv(
+            "SERPER_PLACES_URL", "https://google.serper.dev/places"
+        )
+        self.nominatim_url = nominatim_url or os.getenv(
+            "NOMINATIM_SEARCH_URL", "https://nominatim.openstreetmap.org/search"
+        )
+        self.timeout = timeout
+        self.flights = SingleFlight(
+            ttl_seconds=(
+                ttl_seconds
+                if ttl_seconds is not None
+                else float(os.getenv("ADDRESS_SEARCH_TTL_SECONDS", "600"))
+            ),
+            max_entries=max_entries or int(os.getenv("ADDRESS_SEARCH_CACHE_ENTRIES", "1024")),
+        )
+        # One pooled client per event loop; see client
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        # Serper first (when configured), Nominatim as the hedge
+        self.orchestrator = ProviderOrchestrator(
+            ([Provider("serper", self._serper)] if self.serper_key else [])
+            + [Provider("nominatim", self._nominatim)],
+            hedge_after=hedge_after,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client for the running loop, created on first use.
+        Pooled connections belong to one event loop, so each loop (e.g. a
+        TestClient portal next to the server's) gets its own client."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            # A closed loop can no longer run its client's aclose(); drop the
+            # client so its transports release their sockets when collected
+            for stale in [l for l in list(self._clients) if l.is_closed()]:
+                self._clients.pop(stale, None)
+            client = self._clients[loop] = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers={"User-Agent": "ANC-Proposal-System/1.0"},
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+            )
+        return client
+
+    async def aclose(self):
+        """Close every client on the loop that owns it."""
+        clients, self._clients = self._clients, {}
+        current = asyncio.get_running_loop()
+        for loop, client in clients.items():
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                )
+
+    async def _serper(self, query: str) -> List[Dict]:
+        r = await self.client.post(
+            self.serper_url,
+            headers={"X-API-KEY": self.serper_key},
+            json={"q": query, "num": MAX_RESULTS},
+        )
+        r.raise_for_status()
+        return _serper_places(r.json())
+
+    async def _nominatim(self, query: str) -> List[Dict]:
+        r = await self.client.get(
+            self.nominatim_url,
+            params={
+                "q": query,
+                "format": "json",
+                "addressdetails": 1,
+                "limit": MAX_RESULTS,
+            },
+        )
+        r.raise_for_status()
+        return _nominatim_places(r.json())
+
+    async def _lookup(self, query: str) -> List[Dict]:
+        try:
+            return (await self.orchestrator.first(query))[:MAX_RESULTS]
+        except NoProviderAvailable as e:
+            print(f"Address search failed: {e}")
+            raise
+
+    def stats(self) -> Dict[str, Dict]:
+        return self.orchestrator.stats()
+
+    async def search(self, query: str) -> List[Dict]:
+        """Up to MAX_RESULTS places for ``query``; [] when nothing is found or
+        every provider is down."""
+        key = normalize_query(query)
+        if not key:
+            return []
+        try:
+            results, _ = await self.flights.do(key, key, lambda: self._lookup(query.strip()))
+        except NoProviderAvailable:
+            return []
+        return results
+
+
+# App-lifetime search client shared by the search endpoints
+ADDRESS_SEARCH = AddressSearch()
@@ -1,28 +1,40 @@
 """
 ANC CPQ API Routes
 Connects frontend configuration wizard to backend calculator and output generation
+
+The wizard endpoints live on ``router``, which server.py includes in the
+served app. ``app`` wraps the same router for running this module alone.
 """
 
 import asyncio
+import dataclasses
 import json
+import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 import uvicorn
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
 from calculator import CPQCalculator, CPQInput
+from cpu_executor import CPU_EXECUTOR
+from excel_generator import ExcelGenerator
+from fast_json import FastJSONResponse, GZIP_MIN_BYTES, dumps
+from fieldsets import parse_fields, select
+from pdf_generator import PDFGenerator
+from proposal_pipeline import annotate_quote
 from catalog import IndustryTemplate, get_industry_template, get_template
-from catalog import get_template, get_industry_template, IndustryTemplate
 
 # Initialize FastAPI app
 app = FastAPI(
     title="ANC CPQ API",
     description="Configure-Price-Quote API for ANC LED Display Proposals",
     version="2.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # Add CORS middleware
@@ -33,11 +45,58 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
+
+router = APIRouter(default_response_class=FastJSONResponse)
 
 # Initialize components
 calculator = CPQCalculator(catalog=None)
-pdf_generator = PDFGenerator()
-excel_generator = ExcelGenerator()
+
+CPQ_INPUT_FIELDS = {f.name for f in dataclasses.fields(CPQInput)}
+
+
+def _cpq_input(values: Dict) -> CPQInput:
+    """Build a CPQInput from wizard values, ignoring fields it does not take."""
+    return CPQInput(**{k: v for k, v in values.items() if k in CPQ_INPUT_FIELDS})
+
+
+# Blocking work below runs on CPU_EXECUTOR (see cpu_executor.py), so these
+# helpers are module-level functions that a process pool can pickle.
+
+
+def _write_pdf_proposal(project_data: List[Dict], client_name: str, filename: str):
+    PDFGenerator().generate_proposal(
+        project_data=project_data, client_name=client_name, filename=filename
+    )
+
+
+def _write_excel_audit(calculation_result: Dict, filename: str):
+    ExcelGenerator().update_expert_estimator(
+        [calculation_result], output_path=filename
+    )
+
+
+# /api/calculate/batch limits
+MAX_BATCH_SIZE = int(os.getenv("CALCULATE_BATCH_MAX", "500"))
+BATCH_CHUNK_SIZE = 25
+
+
+def _price_chunk(inputs: List[CPQInput]) -> List[Dict]:
+    """Price one chunk with calculate_batch; if that fails, price item by item
+    so a bad configuration only fails itself. One {"result"} or {"error"}
+    per input."""
+    try:
+        return [{"result": r} for r in calculator.calculate_batch(inputs)]
+    except Exception:
+        pass
+    priced = []
+    for calculator_input in inputs:
+        try:
+            priced.append({"result": calculator.calculate_quote(calculator_input)})
+        except Exception as e:
+            priced.append({"error": f"Calculation error: {e}"})
+    return priced
+
 
 # ============================================================================
 # PYDANTIC MODELS (Input/Output Schemas)
@@ -139,6 +198,7 @@ async def root():
         "endpoints": {
             "templates": "/api/templates",
             "calculate": "/api/calculate",
+            "calculate_batch": "/api/calculate/batch",
             "generate-pdf": "/api/generate-pdf",
             "generate-excel": "/api/generate-excel",
             "demo-presets": "/api/demo-presets",
@@ -163,7 +223,7 @@ async def health_check():
     }
 
 
-@app.get("/api/templates")
+@router.get("/api/templates")
 async def list_templates():
     """List all available industry templates"""
     templates = get_industry_template("nfl")  # This returns all templates
@@ -208,7 +268,7 @@ async def list_templates():
     }
 
 
-@app.post("/api/load-template")
+@router.post("/api/load-template")
 async def load_template(request: TemplateLoadRequest):
     """Load full template configuration"""
     try:
@@ -243,9 +303,17 @@ async def load_template(request: TemplateLoadRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/calculate")
-async def calculate_costs(request: CalculationRequest):
-    """Calculate all 12 cost categories based on configuration"""
+@router.post("/api/calculate")
+async def calculate_costs(request: CalculationRequest, fields: Optional[str] = None):
+    """Calculate all 12 cost categories based on configuration
+
+    ``fields`` (see fieldsets.py) returns only the selected parts of the
+    result, once, under ``calculation_result``.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         # If using template, load it first
         if request.use_template:
@@ -259,59 +327,124 @@ async def calculate_costs(request: CalculationRequest):
                 # Merge: user values override template defaults
                 merged_dict = {**template_dict, **config_dict}
 
-                calculator_input = CPQInput(**merged_dict)
+                calculator_input = _cpq_input(merged_dict)
             else:
-                calculator_input = CPQInput(**request.config.dict())
+                calculator_input = _cpq_input(request.config.dict())
         else:
-            calculator_input = CPQInput(**request.config.dict())
+            calculator_input = _cpq_input(request.config.dict())
 
-        # Calculate all costs
-        result = calculator.calculate_quote(calculator_input)
+        # Calculate all costs (off the event loop)
+        result = await CPU_EXECUTOR.run(
+            "calculate", calculator.calculate_quote, calculator_input
+        )
 
-        return {
-            "success": True,
-            "calculation_timestamp": datetime.now().isoformat(),
-            "configuration": request.config.dict(),
-            "calculation_result": result,
-            "cost_breakdown": result["cost_breakdown"],
-            "pricing": result["pricing"],
-            "summary": result["summary"],
-            "performance_metrics": {
-                "total_categories": len(result["cost_breakdown"]),
-                "calculation_time_ms": 0,  # Would track actual time
-                "calculation_version": "2.0.0",
-            },
-        }
+        if selected is not None:
+            body = {
+                "success": True,
+                "calculation_timestamp": datetime.now().isoformat(),
+                "calculation_result": select(result, selected),
+            }
+        else:
+            body = {
+                "success": True,
+                "calculation_timestamp": datetime.now().isoformat(),
+                "configuration": request.config.dict(),
+                "calculation_result": result,
+                "cost_breakdown": result["cost_breakdown"],
+                "pricing": result["pricing"],
+                "summary": result["summary"],
+                "performance_metrics": {
+                    "total_categories": len(result["cost_breakdown"]),
+                    "calculation_time_ms": 0,  # Would track actual time
+                    "calculation_version": "2.0.0",
+                },
+            }
+        # Returned as a response so the quote tree skips jsonable_encoder
+        return FastJSONResponse(body)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
 
 
-@app.post("/api/generate-pdf")
+@router.post("/api/calculate/batch")
+async def calculate_costs_batch(configs: List[Any], fields: Optional[str] = None):
+    """Price many WizardConfigs in one request.
+
+    Streams one NDJSON line per config, in input order, as each chunk is
+    priced: {"index", "success", "summary", "calculation_result"} or
+    {"index", "success": false, "error"}. An invalid config fails only its
+    own line. ``fields`` trims calculation_result as for /api/calculate.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(configs) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(configs)} exceeds the limit of {MAX_BATCH_SIZE}",
+        )
+
+    async def lines():
+        for start in range(0, len(configs), BATCH_CHUNK_SIZE):
+            items = {}
+            inputs = {}
+            chunk = configs[start : start + BATCH_CHUNK_SIZE]
+            for index, raw in enumerate(chunk, start):
+                try:
+                    inputs[index] = _cpq_input(WizardConfig(**raw).dict())
+                except (ValidationError, TypeError, ValueError) as e:
+                    items[index] = {"error": f"Invalid configuration: {e}"}
+            priced = await CPU_EXECUTOR.run(
+                "calculate", _price_chunk, list(inputs.values())
+            )
+            items.update(zip(inputs, priced))
+
+            for index in sorted(items):
+                item = items[index]
+                if "error" in item:
+                    line = {"index": index, "success": False, "error": item["error"]}
+                else:
+                    line = {
+                        "index": index,
+                        "success": True,
+                        "summary": item["result"].get("summary"),
+                        "calculation_result": select(item["result"], selected),
+                    }
+                yield dumps(line) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/api/generate-pdf")
 async def generate_pdf_proposal(request: GeneratePDFRequest):
     """Generate ANC-branded PDF proposal"""
     try:
+        calculator_input = _cpq_input(request.config.dict())
         # If no calculation result provided, calculate it
         if not request.calculation_result:
-            calculator_input = CPQInput(**request.config.dict())
-            calculation_result = calculator.calculate_quote(calculator_input)
+            calculation_result = await CPU_EXECUTOR.run(
+                "calculate", calculator.calculate_quote, calculator_input
+            )
         else:
-            calculation_result = request.calculation_result
-
-        # Prepare data for PDF
-        project_data = calculation_result["cost_breakdown"]
+            # As for the Excel audit: rebuild the posted JSON inputs
+            calculation_result = dict(
+                request.calculation_result, inputs=calculator_input
+            )
+        annotate_quote(calculation_result, calculator_input.mounting_type)
 
         # Extract client info
         config_dict = request.config.dict()
-        client_name = config_dict.get("client_name", "ANC Client")
-        project_address = config_dict.get("address", "")
+        client_name = config_dict.get("client_name") or "ANC Client"
 
         # Generate PDF
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"anc_proposal_{timestamp}.pdf"
-        pdf_generator.generate_proposal(
-            project_data=[{"inputs": config_dict, "math": calculation_result}],
-            client_name=client_name,
-            filename=filename,
+        await CPU_EXECUTOR.run(
+            "generate_pdf",
+            _write_pdf_proposal,
+            [calculation_result],
+            client_name,
+            os.path.abspath(filename),  # pool workers keep their own cwd
         )
 
         return {
@@ -326,24 +459,34 @@ async def generate_pdf_proposal(request: GeneratePDFRequest):
         raise HTTPException(status_code=500, detail=f"PDF generation error: {str(e)}")
 
 
-@app.post("/api/generate-excel")
+@router.post("/api/generate-excel")
 async def generate_excel_audit(request: GenerateExcelRequest):
     """Generate Excel audit file with all cost categories"""
     try:
+        calculator_input = _cpq_input(request.config.dict())
         # If no calculation result provided, calculate it
         if not request.calculation_result:
-            calculator_input = CPQInput(**request.config.dict())
-            calculation_result = calculator.calculate_quote(calculator_input)
+            calculation_result = await CPU_EXECUTOR.run(
+                "calculate", calculator.calculate_quote, calculator_input
+            )
         else:
-            calculation_result = request.calculation_result
+            # A posted result carries its inputs as plain JSON; the estimator
+            # reads them as attributes, so rebuild them from the config
+            calculation_result = dict(
+                request.calculation_result, inputs=calculator_input
+            )
+        annotate_quote(calculation_result, calculator_input.mounting_type)
 
         # Prepare data for Excel
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"anc_audit_{timestamp}.xlsx"
 
         # Generate Excel
-        excel_generator.generate_excel_audit(
-            project_data=calculation_result["cost_breakdown"], filename=filename
+        await CPU_EXECUTOR.run(
+            "generate_excel",
+            _write_excel_audit,
+            calculation_result,
+            os.path.abspath(filename),  # pool workers keep their own cwd
         )
 
         return {
@@ -357,7 +500,7 @@ async def generate_excel_audit(request: GenerateExcelRequest):
         raise HTTPException(status_code=500, detail=f"Excel generation error: {str(e)}")
 
 
-@app.get("/api/demo-presets")
+@router.get("/api/demo-presets")
 async def get_demo_presets():
     """Get all available demo preset configurations"""
     return {
@@ -415,7 +558,7 @@ async def get_demo_presets():
     }
 
 
-@app.post("/api/load-preset")
+@router.post("/api/load-preset")
 async def load_demo_preset(request: DemoPresetLoadRequest):
     """Load a demo preset configuration"""
     try:
@@ -455,6 +598,9 @@ async def load_demo_preset(request: DemoPresetLoadRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+app.include_router(router)
+
+
 # ============================================================================
 # ERROR HANDLING
 # ============================================================================
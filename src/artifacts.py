@@ -0,0 +1,85 @@
+"""
+In-memory store for rendered proposal artifacts.
+
+/api/generate renders the Expert Estimator and the client PDF into memory and
+parks the bytes here under a random id; the download endpoints serve them back
+by id. Nothing touches the working directory, so concurrent users never
+overwrite each other's files.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF_MEDIA_TYPE = "application/pdf"
+
+
+@dataclass
+class Artifact:
+    """One rendered file held in memory."""
+
+    id: str
+    kind: str
+    filename: str
+    media_type: str
+    content: bytes
+    created_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+class ArtifactStore:
+    """Thread-safe, bounded, expiring map of artifact id -> Artifact.
+
+    Entries expire ``ttl_seconds`` after they were stored, and once
+    ``max_entries`` is reached the oldest artifact is evicted first.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 200):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, filename: str, media_type: str, content: bytes) -> Artifact:
+        artifact = Artifact(
+            id=secrets.token_urlsafe(12),
+            kind=kind,
+            filename=filename,
+            media_type=media_type,
+            content=content,
+        )
+        with self._lock:
+            self._purge()
+            self._items[artifact.id] = artifact
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return artifact
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        with self._lock:
+            self._purge()
+            return self._items.get(artifact_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge()
+            return len(self._items)
+
+    def _purge(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._items:
+            artifact_id, artifact = next(iter(self._items.items()))
+            if artifact.created_at > cutoff:
+                break
+            del self._items[artifact_id]
+
+
+# Process-wide store used by the API
+ARTIFACTS = ArtifactStore()
@@ -0,0 +1,117 @@
+"""
+Branding asset cache for PDF rendering.
+
+The logo and header rule referenced in branding.LOGO are read from local
+files once per process and kept as ImageReader objects, so every proposal
+reuses the same decoded images. When a file is missing the header rule is
+drawn as a vector bar in the brand colour instead, and the logo is left to
+the text header. PDF rendering never touches the network.
+
+Only the PNG paths are loaded: ReportLab cannot rasterise SVG on its own.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable
+
+from branding import COLORS, LOGO
+
+# Relative asset paths in branding.py are relative to src/
+ASSET_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class CachedImage(Flowable):
+    """Draw a preloaded ImageReader at a fixed size."""
+
+    def __init__(self, reader: ImageReader, width: float, height: float):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask="auto")
+
+
+class VectorRule(Flowable):
+    """Solid full-width bar, the in-process stand-in for the rule image."""
+
+    def __init__(self, width: float, height: float, color: str):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.color = colors.HexColor(color)
+
+    def draw(self):
+        self.canv.setFillColor(self.color)
+        self.canv.setStrokeColor(self.color)
+        self.canv.rect(0, 0, self.width, self.height, stroke=0, fill=1)
+
+
+class BrandAssetCache:
+    """Process-wide cache of decoded branding images."""
+
+    # branding.LOGO key for each cached asset
+    ASSET_KEYS = {"logo": "path_png", "rule": "rule_path_png"}
+
+    def __init__(self, logo: Dict = LOGO, root: str = ASSET_ROOT):
+        self.logo_config = logo
+        self.root = root
+        self._readers: Dict[str, Optional[ImageReader]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, bool]:
+        """Read every configured asset from disk (once). Returns which loaded."""
+        with self._lock:
+            if not self._loaded:
+                for name, key in self.ASSET_KEYS.items():
+                    self._readers[name] = self._read(self.logo_config.get(key))
+                self._loaded = True
+        return {name: reader is not None for name, reader in self._readers.items()}
+
+    def _read(self, path: Optional[str]) -> Optional[ImageReader]:
+        if not path:
+            return None
+        if not os.path.isabs(path):
+            path = os.path.join(self.root, path)
+        if not os.path.exists(path):
+            return None
+        try:
+            reader = ImageReader(path)
+            # Force the decode now rather than on the first render
+            reader.getRGBData()
+            return reader
+        except Exception as e:
+            print(f"Branding asset {path} could not be loaded: {e}")
+            return None
+
+    def get(self, name: str) -> Optional[ImageReader]:
+        if not self._loaded:
+            self.load()
+        return self._readers.get(name)
+
+    def logo(self, width: float = None, height: float = None) -> Optional[Flowable]:
+        """Logo flowable, or None when no logo file is available."""
+        reader = self.get("logo")
+        if reader is None:
+            return None
+        return CachedImage(
+            reader,
+            width or self.logo_config["width"],
+            height or self.logo_config["height"],
+        )
+
+    def rule(self, width: float, height: float) -> Flowable:
+        """Header rule: the cached image, or a vector bar in the brand colour."""
+        reader = self.get("rule")
+        if reader is None:
+            return VectorRule(width, height, COLORS["primary"])
+        return CachedImage(reader, width, height)
+
+
+BRAND_ASSETS = BrandAssetCache()
@@ -73,6 +73,7 @@ FONT_SIZES = {
 LOGO = {
     "path_svg": "static/anc_logo.svg",      # SVG preferred for quality
     "path_png": "static/anc_logo.png",      # PNG fallback
+    "rule_path_png": "static/anc_rule.png", # Header rule under the title
     "width": 150,                            # Default width in PDF
     "height": 50,                            # Default height in PDF
     "placeholder": True,                     # Set to False when real logo loaded
@@ -0,0 +1,348 @@
+"""
+Bulk proposal generation.
+
+Regenerates the Expert Estimator and client PDF for many projects in one
+run (e.g. every open project, overnight). Projects are read from JSONL or
+CSV, priced in the parent process by the proposal pipeline's inputs and
+pricing stages (one CPQCalculator.calculate_batch call per project), and
+rendered on a warm process pool. Every project gets uniquely named
+artifacts, and manifest.json records per-project status and timings.
+
+Input formats:
+    JSONL  one project per line, shaped like the /api/generate body:
+           {"client_name": ..., "screens": [{...}, ...], "service_level": ...}
+    CSV    one screen per row; rows sharing a ``project`` column (or, when
+           absent, ``client_name``) form one project. Project-level columns
+           (client_name, service_level, timeline, permits, control_system,
+           bond_required) are read from the project's first row. A CSV
+           with neither column is rejected.
+
+A JSONL line or CSV row that cannot be parsed fails its project in the
+manifest, like a pricing error, instead of aborting the run.
+
+Usage:
+    python src/bulk_proposals.py projects.jsonl --out-dir bulk_output --workers 4
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from project_rollup import ProjectRollup
+from proposal_pipeline import PipelineContext, ProposalPipeline, build_inputs, price
+from render_service import _warm_worker, render_excel, render_pdf
+
+PROJECT_FIELDS = [
+    "client_name",
+    "service_level",
+    "timeline",
+    "permits",
+    "control_system",
+    "bond_required",
+]
+BOOL_FIELDS = {"is_outdoor", "bond_required"}
+FLOAT_FIELDS = {"pixel_pitch", "width_ft", "height_ft", "target_margin", "unit_cost"}
+
+
+def _coerce(key: str, value):
+    if not isinstance(value, str):
+        return value
+    if key in BOOL_FIELDS:
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    if key in FLOAT_FIELDS:
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"{key} is not a number: {value!r}") from None
+    return value
+
+
+def _read_csv(path: str) -> List[Dict]:
+    # Keyed by project name; rows without one by their (int) line number
+    projects: Dict = {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = reader.fieldnames or []
+        if "project" not in columns and "client_name" not in columns:
+            raise ValueError(
+                f"{path}: needs a project or client_name column to group rows"
+            )
+        for row in reader:
+            where = f"line {reader.line_num}"
+            row = {k: v for k, v in row.items() if v not in ("", None)}
+            key = row.pop("project", None) or row.get("client_name")
+            if key is None:
+                projects[reader.line_num] = {
+                    "parse_error": f"{where}: no project or client_name"
+                }
+                continue
+            project = projects.get(key)
+            if project is None:
+                project = projects[key] = {
+                    k: _coerce(k, row[k]) for k in PROJECT_FIELDS if k in row
+                }
+                project["screens"] = []
+            try:
+                project["screens"].append(
+                    {k: _coerce(k, v) for k, v in row.items() if k not in PROJECT_FIELDS}
+                )
+            except ValueError as e:
+                # One bad screen fails the whole project, not the run
+                project.setdefault("parse_error", f"{where}: {e}")
+    return list(projects.values())
+
+
+def _read_jsonl(path: str) -> List[Dict]:
+    projects = []
+    with open(path) as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                project = json.loads(line)
+            except ValueError as e:
+                project = {"parse_error": f"line {number}: {e}"}
+            if not isinstance(project, dict):
+                project = {"parse_error": f"line {number}: expected a JSON object"}
+            projects.append(project)
+    return projects
+
+
+def read_projects(path: str) -> List[Dict]:
+    """Load projects from a .jsonl or .csv file. Lines or rows that cannot
+    be parsed come back as projects carrying a ``parse_error``."""
+    if path.endswith(".csv"):
+        return _read_csv(path)
+    return _read_jsonl(path)
+
+
+# Inputs and pricing are the same stages /api/generate runs
+PRICING = ProposalPipeline([("inputs", build_inputs), ("pricing", price)])
+
+
+def price_projects(projects: List[Dict]) -> Iterator[Dict]:
+    """Price every project with one batch calculator call per project."""
+    for index, project in enumerate(projects, start=1):
+        started = time.perf_counter()
+        entry = {
+            "index": index,
+            "client_name": project.get("client_name", ""),
+            "screens": len(project.get("screens", [])),
+        }
+        if "parse_error" in project:
+            entry["error"] = f"parse failed: {project['parse_error']}"
+        else:
+            try:
+                ctx = PRICING.run(PipelineContext(request=project))
+                entry["project_data"] = ctx.project_data
+            except Exception as e:
+                entry["error"] = f"pricing failed: {e}"
+        entry["timings"] = {"price_s": round(time.perf_counter() - started, 4)}
+        yield entry
+
+
+def artifact_stem(index: int, client_name: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", client_name).strip("_")[:40] or "project"
+    return f"{index:04d}_{slug}"
+
+
+def render_project(job: Dict, out_dir: str) -> Dict:
+    """Render and write one project's artifacts (runs in a pool worker)."""
+    stem = artifact_stem(job["index"], job["client_name"])
+    project_data = job.pop("project_data")
+    timings = job["timings"]
+    try:
+        rollup = ProjectRollup.from_project_data(project_data)
+        started = time.perf_counter()
+        excel = render_excel(rollup)
+        timings["excel_s"] = round(time.perf_counter() - started, 4)
+
+        started = time.perf_counter()
+        pdf = render_pdf(job["client_name"], rollup)
+        timings["pdf_s"] = round(time.perf_counter() - started, 4)
+
+        files = {
+            "excel": f"{stem}_estimation.xlsx",
+            "pdf": f"{stem}_proposal.pdf",
+        }
+        with open(os.path.join(out_dir, files["excel"]), "wb") as f:
+            f.write(excel)
+        with open(os.path.join(out_dir, files["pdf"]), "wb") as f:
+            f.write(pdf)
+    except Exception as e:
+        job.update(status="error", error=f"render failed: {e}")
+        return job
+
+    job.update(status="ok", total=rollup.totals["sell_price"], files=files)
+    return job
+
+
+def _render_failed(job: Dict, error: Exception) -> Dict:
+    job.pop("project_data", None)
+    job.update(status="error", error=f"render failed: {error}")
+    return job
+
+
+class _PoolRenderer:
+    """Renders priced projects on a process pool, ``max_pending`` at a time."""
+
+    def __init__(self, out_dir: str, workers: int, max_pending: int):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = self._new_pool()
+        self._pending: Dict[Future, Dict] = {}
+        self._suspects: List[Dict] = []
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+
+    def render(self, jobs: Iterable[Dict]) -> Iterator[Dict]:
+        try:
+            for job in jobs:
+                while len(self._pending) >= self.max_pending:
+                    yield from self._collect(FIRST_COMPLETED)
+                if self._suspects:
+                    yield from self._collect(ALL_COMPLETED)
+                    yield from self._isolate()
+                try:
+                    future = self._pool.submit(render_project, job, self.out_dir)
+                except BrokenProcessPool:
+                    self._suspects.append(job)
+                else:
+                    self._pending[future] = job
+            yield from self._collect(ALL_COMPLETED)
+            yield from self._isolate()
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _collect(self, return_when) -> Iterator[Dict]:
+        if not self._pending:
+            return
+        done, _ = wait(self._pending, return_when=return_when)
+        for future in done:
+            job = self._pending.pop(future)
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                self._suspects.append(job)
+            except Exception as e:
+                yield _render_failed(job, e)
+
+    def _isolate(self) -> Iterator[Dict]:
+        """The pool died under some in-flight project: retry each one alone
+        on a fresh pool so only the project that breaks it is failed."""
+        if not self._suspects:
+            return
+        suspects, self._suspects = self._suspects, []
+        self._restart()
+        for job in suspects:
+            try:
+                future = self._pool.submit(render_project, job, self.out_dir)
+                result = future.result()
+            except BrokenProcessPool as e:
+                result = _render_failed(job, e)
+                self._restart()
+            except Exception as e:
+                result = _render_failed(job, e)
+            yield result
+
+    def _restart(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = self._new_pool()
+
+
+def run_bulk(
+    input_path: str,
+    out_dir: str,
+    workers: int = 2,
+    max_pending: Optional[int] = None,
+) -> Dict:
+    """Price and render every project in ``input_path``; returns the manifest."""
+    started = time.perf_counter()
+    projects = read_projects(input_path)
+    os.makedirs(out_dir, exist_ok=True)
+    entries: List[Dict] = []
+
+    def priced() -> Iterator[Dict]:
+        for entry in price_projects(projects):
+            entries.append(entry)
+            if "error" in entry:
+                entry["status"] = "error"
+            else:
+                yield entry
+
+    if workers > 0:
+        renderer = _PoolRenderer(out_dir, workers, max_pending or workers * 2)
+        rendered = renderer.render(priced())
+    else:
+        rendered = (render_project(job, out_dir) for job in priced())
+    # Entries are indexed from 1 in input order; swapping the rendered result
+    # in drops the parent's copy of the priced quotes
+    for job in rendered:
+        entries[job["index"] - 1] = job
+
+    manifest = {
+        "source": os.path.abspath(input_path),
+        "generated_at": datetime.datetime.utcnow().isoformat(),
+        "total_seconds": round(time.perf_counter() - started, 4),
+        "succeeded": sum(1 for e in entries if e.get("status") == "ok"),
+        "failed": sum(1 for e in entries if e.get("status") != "ok"),
+        "projects": entries,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help="projects file (.jsonl or .csv)")
+    parser.add_argument(
+        "--out-dir",
+        default=os.path.join(
+            "bulk_output", datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        ),
+        help="directory for artifacts and manifest.json",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 2,
+        help="render processes (0 renders in this process)",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="priced projects waiting for or in render (default 2 x workers)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = run_bulk(args.input, args.out_dir, args.workers, args.max_pending)
+    except ValueError as e:
+        parser.error(str(e))
+    print(
+        f"Rendered {manifest['succeeded']}/{len(manifest['projects'])} projects "
+        f"in {manifest['total_seconds']}s -> {args.out_dir}"
+    )
+    return 1 if manifest["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import copy
 import json
 import math
 import os
@@ -735,3 +736,27 @@ class CPQCalculator:
                 "timeline": timeline_result,
             },
         }
+
+    def calculate_batch(self, project_inputs: List[CPQInput]) -> List[Dict]:
+        """
+        Price many screens in one call, in input order.
+
+        League-wide rollouts repeat the same screen spec many times, so
+        identical inputs are priced once. Repeats get a deep copy of the
+        first result, so every result carries its own ``inputs`` object and
+        nested dicts and can be annotated or edited independently.
+        """
+        priced: Dict[str, Dict] = {}
+        results = []
+        for project_input in project_inputs:
+            key = repr(project_input)
+            quote = priced.get(key)
+            if quote is None:
+                quote = priced[key] = self.calculate_quote(project_input)
+                results.append(quote)
+            else:
+                # Copy everything but the inputs, which are this item's own
+                results.append(
+                    copy.deepcopy(quote, {id(quote["inputs"]): project_input})
+                )
+        return results
@@ -708,6 +708,11 @@ def get_industry_template(venue_type: str) -> Optional[IndustryTemplate]:
     return None
 
 
+def get_template(template_id: str) -> Optional[IndustryTemplate]:
+    """Get template by ID (e.g. "nfl_stadium")"""
+    return ANC_INDUSTRY_TEMPLATES.get(template_id)
+
+
 def calculate_bulk_discount(total_sqft: float, product_id: str) -> float:
     """
     Calculate bulk discount percentage if applicable
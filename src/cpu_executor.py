@@ -0,0 +1,110 @@
+"""
+Executors for blocking work called from async FastAPI handlers.
+
+The calculator, openpyxl and ReportLab are synchronous; calling them straight
+from an ``async def`` handler stalls the event loop and every other request
+with it. CPUExecutor runs such work elsewhere, picking the executor per
+route:
+
+    thread   shared thread pool, for light work such as pricing a quote
+    process  the render service's warm process pool (render_service.py),
+             for CPU-heavy rendering; threads when it runs in-process
+    inline   run on the loop (debugging only)
+
+Route kinds default to DEFAULT_ROUTE_KINDS and can be overridden with the
+CPU_EXECUTOR_ROUTES environment variable, e.g.
+``CPU_EXECUTOR_ROUTES="calculate=thread,generate_pdf=process"``.
+The thread pool size comes from CPU_THREAD_WORKERS; process work shares
+RENDER_SERVICE's workers (RENDER_WORKERS) rather than warming a second set
+of reportlab/openpyxl processes. It does not count against the render
+service's queue depth.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+
+DEFAULT_ROUTE_KINDS = {
+    "calculate": "thread",
+    "generate": "thread",
+    "generate_pdf": "process",
+    "generate_excel": "process",
+}
+
+
+def _parse_routes(spec: str) -> Dict[str, str]:
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, kind = item.partition("=")
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind for {route!r}: {kind!r}")
+        routes[route.strip()] = kind
+    return routes
+
+
+class CPUExecutor:
+    def __init__(
+        self,
+        route_kinds: Optional[Dict[str, str]] = None,
+        thread_workers: Optional[int] = None,
+        render_service=None,
+    ):
+        self.route_kinds = dict(DEFAULT_ROUTE_KINDS)
+        self.route_kinds.update(_parse_routes(os.getenv("CPU_EXECUTOR_ROUTES", "")))
+        self.route_kinds.update(route_kinds or {})
+        self.thread_workers = thread_workers or int(
+            os.getenv("CPU_THREAD_WORKERS", "8")
+        )
+        self._render_service = render_service
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def kind_for(self, route: str) -> str:
+        return self.route_kinds.get(route, "thread")
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.thread_workers, thread_name_prefix="cpu"
+                )
+            return self._threads
+
+    def _pool(self, kind: str):
+        if kind == "process":
+            render_service = self._render_service
+            if render_service is None:
+                from render_service import RENDER_SERVICE as render_service
+            pool = render_service.worker_pool()
+            if pool is not None:
+                return pool
+        return self._thread_pool()
+
+    async def run(self, route: str, fn: Callable, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the executor configured for ``route``.
+
+        Process-pool work must be a picklable module-level function.
+        """
+        kind = self.kind_for(route)
+        if kind == "inline":
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool(kind), functools.partial(fn, *args, **kwargs)
+        )
+
+    def shutdown(self):
+        """Stop the thread pool; the process pool belongs to the render service."""
+        with self._lock:
+            threads, self._threads = self._threads, None
+        if threads is not None:
+            threads.shutdown(wait=False, cancel_futures=True)
+
+
+# Process-wide executor used by the API modules
+CPU_EXECUTOR = CPUExecutor()
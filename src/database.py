@@ -1,9 +1,12 @@
 import os
+import base64
 import datetime
 import json
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Boolean, UniqueConstraint
+import zlib
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Boolean, UniqueConstraint, LargeBinary, Index
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -29,6 +32,38 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Text at least this long is stored zlib-compressed (see CompressedText)
+COMPRESS_MIN_BYTES = int(os.getenv("MESSAGE_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSED_PREFIX = "zlib:"
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as "zlib:" + base64(zlib(utf-8)) once it reaches
+    COMPRESS_MIN_BYTES. It stays a TEXT column, so existing rows and
+    databases need no migration; uncompressed values read back unchanged."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Plain values that look compressed are compressed too, to stay unambiguous
+        if len(value) < COMPRESS_MIN_BYTES and not value.startswith(COMPRESSED_PREFIX):
+            return value
+        packed = base64.b64encode(zlib.compress(value.encode("utf-8"), 6))
+        return COMPRESSED_PREFIX + packed.decode("ascii")
+
+    def process_result_value(self, value, dialect):
+        if value is None or not value.startswith(COMPRESSED_PREFIX):
+            return value
+        try:
+            packed = base64.b64decode(value[len(COMPRESSED_PREFIX):], validate=True)
+            return zlib.decompress(packed).decode("utf-8")
+        except (ValueError, zlib.error):
+            return value
+
+
 # 2. Define Models
 
 class Project(Base):
@@ -44,16 +79,40 @@ class Project(Base):
     
     # State Snapshot (The full CPQInput JSON)
     state = Column(JSON, default={})
+
+    # Last quoted total, kept out of `state` so project lists never load it
+    final_price = Column(Float, nullable=True)
+
+    # Bumped on every state save; see project_history.py
+    version = Column(Integer, nullable=False, default=0)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     # Relationships
-    messages = relationship("Message", back_populates="project", cascade="all, delete-orphan")
+    # passive_deletes: delete_project bulk-deletes messages rather than loading them
+    messages = relationship("Message", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
     shares = relationship("SharedProposal", back_populates="project", cascade="all, delete-orphan")
     organization = relationship("Organization")
 
+    # Keyset pagination of /api/projects walks (updated_at, id)
+    __table_args__ = (Index("ix_projects_updated_at_id", "updated_at", "id"),)
+
+class ProjectRevision(Base):
+    """One state save: the JSON Patch from the previous version, plus the
+    full state every PROJECT_SNAPSHOT_EVERY versions."""
+    __tablename__ = "project_revisions"
+    __table_args__ = (UniqueConstraint("project_id", "version", name="uq_project_revision"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+    patch = Column(JSON, nullable=False)
+    # SQL NULL (not JSON null) when the revision is patch-only
+    snapshot = deferred(Column(JSON(none_as_null=True), nullable=True))
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
 class SharedProposal(Base):
     __tablename__ = "shared_proposals"
 
@@ -74,11 +133,13 @@ class Message(Base):
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), index=True)
     
     role = Column(String) # 'user' or 'assistant' or 'system'
-    content = Column(Text)
-    thinking = Column(Text, nullable=True) # For GLM/Reasoning models
+    # Large payloads: compressed, and deferred so loading a Message (or a
+    # project's messages) never pulls them in unless asked for
+    content = deferred(Column(CompressedText))
+    thinking = deferred(Column(CompressedText, nullable=True)) # For GLM/Reasoning models
     
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
 
@@ -136,9 +197,59 @@ class InviteToken(Base):
 
     organization = relationship("Organization")
 
+class ProposalJob(Base):
+    """A queued /api/jobs/proposals request and, once done, its artifacts."""
+    __tablename__ = "proposal_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued | running | succeeded | failed
+    stage = Column(String, nullable=True)  # current/last pipeline stage
+    request = Column(JSON, nullable=False)  # the ProjectRequest payload
+    result = Column(JSON, nullable=True)  # summary (totals, file names)
+    timings = Column(JSON, default={})  # seconds per stage
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # The process running the job, and when it last showed signs of life
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Rendered files; deferred so status polls never load them
+    excel = deferred(Column(LargeBinary, nullable=True))
+    pdf = deferred(Column(LargeBinary, nullable=True))
+
+# Columns added to existing tables after they were first created:
+# (table, column, DDL type). create_all() only creates missing tables.
+ADDED_COLUMNS = [
+    ("projects", "final_price", "FLOAT"),
+    ("projects", "version", "INTEGER NOT NULL DEFAULT 0"),
+    ("proposal_jobs", "worker_id", "VARCHAR"),
+    ("proposal_jobs", "heartbeat_at", "TIMESTAMP"),
+]
+
+
+def ensure_columns(bind=None):
+    """Add ADDED_COLUMNS, and any indexes, missing from older databases."""
+    bind = bind or engine
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table, column, ddl in ADDED_COLUMNS:
+            if table not in inspector.get_table_names():
+                continue
+            if column not in {c["name"] for c in inspector.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
 # 3. Create Tables
 def init_db():
     Base.metadata.create_all(bind=engine)
+    ensure_columns()
     print("Database tables created successfully.")
 
 # Helper to get DB session
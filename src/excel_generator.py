@@ -1,77 +1,343 @@
+import threading
+from copy import copy
+from io import BytesIO
+
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell.cell import Cell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
 from openpyxl.utils import get_column_letter
 
+from project_rollup import ProjectRollup
+
+ANC_BLUE = "003D82"
+CURRENCY_FORMAT = "$#,##0"
+
+# Named styles shared by every tab. Registered once per workbook and applied
+# by name so cells reference a single style record instead of carrying their
+# own Font/Fill/Alignment copies.
+STYLE_TITLE = "anc_title"
+STYLE_SECTION = "anc_section"
+STYLE_HEADER = "anc_header"
+STYLE_LABEL = "anc_label"
+STYLE_NOTE = "anc_note"
+STYLE_CURRENCY = "anc_currency"
+STYLE_NUMBER = "anc_number"
+STYLE_TOTAL = "anc_total"
+STYLE_TOTAL_CURRENCY = "anc_total_currency"
+STYLE_GRAND_TOTAL = "anc_grand_total"
+
+
+class StyleRegistry:
+    """Registers the ANC NamedStyles on a workbook and applies them by name."""
+
+    def __init__(self):
+        self.styles = [
+            NamedStyle(name=STYLE_TITLE, font=Font(bold=True, size=14)),
+            NamedStyle(name=STYLE_SECTION, font=Font(bold=True, size=12)),
+            NamedStyle(
+                name=STYLE_HEADER,
+                font=Font(bold=True, color="FFFFFF"),
+                fill=PatternFill(
+                    start_color=ANC_BLUE, end_color=ANC_BLUE, fill_type="solid"
+                ),
+                alignment=Alignment(horizontal="center"),
+            ),
+            NamedStyle(name=STYLE_LABEL, font=Font(bold=True)),
+            NamedStyle(name=STYLE_NOTE, font=Font(italic=True)),
+            NamedStyle(name=STYLE_CURRENCY, number_format=CURRENCY_FORMAT),
+            NamedStyle(name=STYLE_NUMBER, number_format="#,##0"),
+            NamedStyle(name=STYLE_TOTAL, font=Font(bold=True)),
+            NamedStyle(
+                name=STYLE_TOTAL_CURRENCY,
+                font=Font(bold=True),
+                number_format=CURRENCY_FORMAT,
+            ),
+            NamedStyle(
+                name=STYLE_GRAND_TOTAL,
+                font=Font(bold=True, size=14),
+                number_format=CURRENCY_FORMAT,
+            ),
+        ]
+
+    def register(self, wb):
+        """Add every style to the workbook (idempotent)."""
+        registered = set(wb.named_styles)
+        for style in self.styles:
+            if style.name not in registered:
+                wb.add_named_style(style)
+        return wb
+
+
+STYLE_REGISTRY = StyleRegistry()
+
+# Professional services rows: (rollup total key, category, description,
+# duration, rate)
+PROFESSIONAL_SERVICES = [
+    (
+        "project_management",
+        "Project Management",
+        "Overall project coordination and management",
+        "Project Duration",
+        "% of Total",
+    ),
+    (
+        "engineering",
+        "Engineering Services",
+        "Structural and electrical engineering",
+        "Design Phase",
+        "Fixed Fee",
+    ),
+    (
+        "permits",
+        "Permits & Approvals",
+        "Building permits and inspections",
+        "Permit Duration",
+        "Actual Cost",
+    ),
+    (
+        "submittals",
+        "Submittals",
+        "Technical submittals and drawings",
+        "Submittal Phase",
+        "Fixed Fee",
+    ),
+    (
+        "final_commissioning",
+        "Final Commissioning",
+        "System testing and commissioning",
+        "Commissioning Period",
+        "Fixed Fee",
+    ),
+]
+
+SCREEN_SPEC_LABELS = [
+    "Product Class",
+    "Pixel Pitch",
+    "Dimensions",
+    "Resolution",
+    "Total Square Footage",
+    "Indoor/Outdoor",
+    "Mounting Type",
+    "Structure Condition",
+]
+
+# (breakdown label, details key, details sub-key)
+COST_BREAKDOWN_MAPPING = [
+    ("1. Hardware", "hardware", None),
+    ("2. Structural Materials", "structural", "structural_materials"),
+    ("3. Structural Labor", "structural", "structural_labor"),
+    ("4. LED Installation", "led_installation", None),
+    ("5. Electrical Materials", "electrical", "electrical_materials"),
+    ("6. Electrical Labor", "electrical", "electrical_labor"),
+    ("7. CMS Equipment", "cms", "cms_equipment"),
+    ("8. CMS Installation", "cms", "cms_installation"),
+    ("9. CMS Commissioning", "cms", "cms_commissioning"),
+    ("10. Project Management", "project_management", None),
+    ("11. General Conditions", "general_conditions", None),
+    ("12. Travel & Expenses", "travel", None),
+    ("13. Submittals", "submittals", None),
+    ("14. Engineering", "engineering", None),
+    ("15. Permits", "permits", None),
+    ("16. Final Commissioning", "final_commissioning", None),
+]
+
+# Fixed row layout shared by the per-screen tabs and the skeleton fill
+SCREEN_FIRST_ROW = 4
+DETAIL_SPEC_ROW = 4
+DETAIL_BREAKDOWN_ROW = 15
+DETAIL_BOND_ROW = DETAIL_BREAKDOWN_ROW + len(COST_BREAKDOWN_MAPPING)
+DETAIL_TOTAL_ROW = DETAIL_BOND_ROW + 3
+
+SCREEN_DETAIL_TEMPLATE = "Screen Details Template"
+
+# Placeholder values used to lay out the screen detail template
+EMPTY_SCREEN_DETAIL = {
+    "title": None,
+    "specs": [None] * len(SCREEN_SPEC_LABELS),
+    "lines": [(None, None, None, None)] * len(COST_BREAKDOWN_MAPPING),
+    "bond": None,
+    "contingency_logic": None,
+    "contingency": None,
+    "total": None,
+}
+
+_skeleton_bytes = None
+_skeleton_lock = threading.Lock()
+
 
 class ExcelGenerator:
+    # Screen count above which update_expert_estimator switches to openpyxl's
+    # write-only workbook so memory stays flat for league-wide rollouts.
+    STREAMING_SCREEN_THRESHOLD = 100
+
     def __init__(self):
-        pass
+        self.style_registry = STYLE_REGISTRY
 
     def update_expert_estimator(
-        self, project_data, output_path="anc_internal_estimation.xlsx"
+        self,
+        project_data,
+        output_path="anc_internal_estimation.xlsx",
+        streaming=None,
+        rollup=None,
     ):
         """
         Generates a multi-tab Excel file matching ANC's internal workflow.
         Based on Natalia's requirements: separate tabs for LED, Structural, Labor, Electrical, etc.
-        """
-        wb = openpyxl.Workbook()
 
-        # Remove default sheet if it exists
-        if wb.active:
-            wb.remove(wb.active)
+        The static furniture (titles, headers, widths, reference tables) lives
+        in a cached skeleton workbook; each call clones it and fills only the
+        project-specific cells from a ProjectRollup, built here in one pass
+        unless the caller already has one.
+        With ``streaming=True`` (the default once the project reaches
+        ``STREAMING_SCREEN_THRESHOLD`` screens) every tab is instead emitted
+        row by row into a write-only workbook and flushed to disk as it goes.
+        """
+        if rollup is None:
+            rollup = ProjectRollup.from_project_data(project_data)
+        if streaming is None:
+            streaming = len(rollup) >= self.STREAMING_SCREEN_THRESHOLD
+
+        if streaming:
+            wb = openpyxl.Workbook(write_only=True)
+            self.style_registry.register(wb)
+            self._write_tabs(wb, rollup)
+
+            # 8. Cost Summary Tab - Detailed breakdown by screen
+            for screen in rollup.screens:
+                ws_detail = wb.create_sheet(title=f"Screen {screen.number} Details")
+                self._emit(
+                    ws_detail,
+                    self._generate_screen_detail_tab(
+                        ws_detail, screen.quote, screen.number
+                    ),
+                )
+        else:
+            wb = self._clone_skeleton()
+            self._fill_skeleton(wb, rollup)
+
+        # output_path may be a filesystem path or a writable binary buffer
+        wb.save(output_path)
+        if isinstance(output_path, str):
+            print(f"Excel generated at: {output_path}")
+
+    def render_expert_estimator(self, project_data, streaming=None, rollup=None):
+        """Render the Expert Estimator into memory and return the .xlsx bytes."""
+        buffer = BytesIO()
+        self.update_expert_estimator(
+            project_data, output_path=buffer, streaming=streaming, rollup=rollup
+        )
+        return buffer.getvalue()
 
+    def _write_tabs(self, wb, rollup):
+        """Emit the seven project-level tabs, in workbook order."""
         # 1. Executive Summary Tab - Client-facing overview
         ws_summary = wb.create_sheet(title="Executive Summary")
-        self._generate_executive_summary_tab(ws_summary, project_data)
-
-        # 2. LED Hardware Tab - Display specifications and costs
-        ws_led = wb.create_sheet(title="LED Hardware")
-        self._generate_led_hardware_tab(ws_led, project_data)
-
-        # 3. Structural Requirements Tab - Steel, mounting, engineering
-        ws_structural = wb.create_sheet(title="Structural Requirements")
-        self._generate_structural_tab(ws_structural, project_data)
-
-        # 4. Labor Analysis Tab - Union rates, crew sizes, installation complexity
-        ws_labor = wb.create_sheet(title="Labor Analysis")
-        self._generate_labor_tab(ws_labor, project_data)
-
-        # 5. Electrical Systems Tab - Power, data, PDUs
-        ws_electrical = wb.create_sheet(title="Electrical Systems")
-        self._generate_electrical_tab(ws_electrical, project_data)
+        self._emit(ws_summary, self._generate_executive_summary_tab(ws_summary, rollup))
+        if not wb.write_only:
+            ws_summary.merge_cells("A1:F1")
+
+        tabs = [
+            # 2. LED Hardware Tab - Display specifications and costs
+            ("LED Hardware", self._generate_led_hardware_tab),
+            # 3. Structural Requirements Tab - Steel, mounting, engineering
+            ("Structural Requirements", self._generate_structural_tab),
+            # 4. Labor Analysis Tab - Union rates, crew sizes, installation complexity
+            ("Labor Analysis", self._generate_labor_tab),
+            # 5. Electrical Systems Tab - Power, data, PDUs
+            ("Electrical Systems", self._generate_electrical_tab),
+            # 6. Installation Assessment Tab - Site conditions, access, complexity
+            ("Installation Assessment", self._generate_installation_tab),
+            # 7. Professional Services Tab - PM, engineering, permits
+            ("Professional Services", self._generate_professional_services_tab),
+        ]
+        for title, generate_tab in tabs:
+            ws = wb.create_sheet(title=title)
+            self._emit(ws, generate_tab(ws, rollup))
 
-        # 6. Installation Assessment Tab - Site conditions, access, complexity
-        ws_installation = wb.create_sheet(title="Installation Assessment")
-        self._generate_installation_tab(ws_installation, project_data)
+    # ------------------------------------------------------------------
+    # Skeleton workbook
+    # ------------------------------------------------------------------
 
-        # 7. Professional Services Tab - PM, engineering, permits
-        ws_services = wb.create_sheet(title="Professional Services")
-        self._generate_professional_services_tab(ws_services, project_data)
+    def _build_skeleton(self):
+        """Render every tab for an empty project plus a screen detail template."""
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        self.style_registry.register(wb)
+        self._write_tabs(wb, ProjectRollup())
+
+        template = wb.create_sheet(title=SCREEN_DETAIL_TEMPLATE)
+        self._emit(template, self._generate_screen_detail_tab(template))
+
+        buffer = BytesIO()
+        wb.save(buffer)
+        return buffer.getvalue()
+
+    def _clone_skeleton(self):
+        """Load a fresh copy of the skeleton, building it on first use."""
+        global _skeleton_bytes
+        if _skeleton_bytes is None:
+            with _skeleton_lock:
+                if _skeleton_bytes is None:
+                    _skeleton_bytes = self._build_skeleton()
+        return openpyxl.load_workbook(BytesIO(_skeleton_bytes))
+
+    def _fill_skeleton(self, wb, rollup):
+        """Write only the project-specific cells into a cloned skeleton."""
+        screen_tabs = [
+            ("Executive Summary", self._executive_summary_row, 5, "sell_price"),
+            ("LED Hardware", self._led_hardware_row, 8, "hardware"),
+            ("Structural Requirements", self._structural_row, 7, "structural"),
+            ("Labor Analysis", self._labor_row, 7, "labor"),
+            ("Electrical Systems", self._electrical_row, 7, "electrical"),
+        ]
+        for title, screen_row, total_column, total_key in screen_tabs:
+            ws = wb[title]
+            if rollup.screens:
+                # Open a gap for the screen rows; the reference tables and
+                # the totals row below shift down with it.
+                ws.insert_rows(SCREEN_FIRST_ROW, amount=len(rollup))
+            for offset, screen in enumerate(rollup.screens):
+                self._put_row(ws, SCREEN_FIRST_ROW + offset, screen_row(ws, screen))
+            ws.cell(row=ws.max_row, column=total_column).value = rollup.totals[
+                total_key
+            ]
+
+        ws = wb["Professional Services"]
+        for offset, (key, *_labels) in enumerate(PROFESSIONAL_SERVICES):
+            ws.cell(row=SCREEN_FIRST_ROW + offset, column=5).value = rollup.totals[key]
+        ws.cell(row=ws.max_row, column=5).value = sum(
+            rollup.totals[key] for key, *_labels in PROFESSIONAL_SERVICES
+        )
 
         # 8. Cost Summary Tab - Detailed breakdown by screen
-        for idx, screen_data in enumerate(project_data):
-            sheet_name = f"Screen {idx + 1} Details"
-            ws_detail = wb.create_sheet(title=sheet_name)
-            self._generate_screen_detail_tab(ws_detail, screen_data, idx + 1)
-
-        wb.save(output_path)
-        print(f"Excel generated at: {output_path}")
-
-    def _generate_executive_summary_tab(self, ws, project_data):
+        template = wb[SCREEN_DETAIL_TEMPLATE]
+        for screen in rollup.screens:
+            ws_detail = wb.copy_worksheet(template)
+            ws_detail.title = f"Screen {screen.number} Details"
+            self._fill_screen_detail(
+                ws_detail, self._screen_detail_values(screen.quote, screen.number)
+            )
+        wb.remove(template)
+
+    def _fill_screen_detail(self, ws, values):
+        """Write one screen's values into a copy of the detail template."""
+        ws.cell(row=1, column=1).value = values["title"]
+        for offset, value in enumerate(values["specs"]):
+            ws.cell(row=DETAIL_SPEC_ROW + offset, column=2).value = value
+        for offset, line in enumerate(values["lines"]):
+            for column, value in enumerate(line, 2):
+                ws.cell(row=DETAIL_BREAKDOWN_ROW + offset, column=column).value = value
+        ws.cell(row=DETAIL_BOND_ROW, column=5).value = values["bond"]
+        ws.cell(row=DETAIL_BOND_ROW + 1, column=4).value = values["contingency_logic"]
+        ws.cell(row=DETAIL_BOND_ROW + 1, column=5).value = values["contingency"]
+        ws.cell(row=DETAIL_TOTAL_ROW, column=5).value = values["total"]
+
+    # ------------------------------------------------------------------
+    # Tabs
+    # ------------------------------------------------------------------
+
+    def _generate_executive_summary_tab(self, ws, rollup):
         """Executive summary for management review"""
-        # Header styling
-        header_font = Font(bold=True, color="FFFFFF", size=14)
-        header_fill = PatternFill(
-            start_color="003D82", end_color="003D82", fill_type="solid"
-        )
-
-        # Title
-        ws.cell(
-            row=1, column=1, value="ANC SPORTS ENTERPRISES - PROJECT SUMMARY"
-        ).font = Font(bold=True, size=16)
-        ws.merge_cells("A1:F1")
-
-        # Project overview
         headers = [
             "Screen #",
             "Product Type",
@@ -80,43 +346,42 @@ class ExcelGenerator:
             "Total Cost",
             "Annual Service",
         ]
-        for col, h in enumerate(headers, 1):
-            cell = ws.cell(row=3, column=col, value=h)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center")
-            ws.column_dimensions[get_column_letter(col)].width = 20
+        self._set_column_widths(ws, headers, wide_columns=False)
+
+        # Title
+        yield [self._cell(ws, "ANC SPORTS ENTERPRISES - PROJECT SUMMARY", STYLE_TITLE)]
+        yield []
+
+        # Project overview
+        yield self._header_row(ws, headers)
 
         # Data rows
-        total_cost = 0
-        for idx, item in enumerate(project_data):
-            row = idx + 4
-            inp = item["inputs"]
-            summary = item["summary"]
-
-            cost = summary.get("final_sell_price", 0)
-            service = summary.get("annual_service", 0)
-            total_cost += cost
-
-            ws.cell(row=row, column=1, value=idx + 1)
-            ws.cell(row=row, column=2, value=inp.product_class)
-            ws.cell(row=row, column=3, value=f"{inp.width_ft}' × {inp.height_ft}'")
-            ws.cell(row=row, column=4, value=f"{inp.pixel_pitch}mm")
-            ws.cell(row=row, column=5, value=cost).number_format = "$#,##0"
-            ws.cell(row=row, column=6, value=service).number_format = "$#,##0"
+        for screen in rollup.screens:
+            yield self._executive_summary_row(ws, screen)
 
         # Totals
-        total_row = len(project_data) + 5
-        ws.cell(row=total_row, column=1, value="PROJECT TOTAL").font = Font(bold=True)
-        ws.cell(row=total_row, column=5, value=total_cost).number_format = "$#,##0"
-        ws.cell(row=total_row, column=5).font = Font(bold=True, size=14)
+        yield []
+        yield [
+            self._cell(ws, "PROJECT TOTAL", STYLE_TOTAL),
+            None,
+            None,
+            None,
+            self._cell(ws, rollup.totals["sell_price"], STYLE_GRAND_TOTAL),
+        ]
 
-    def _generate_led_hardware_tab(self, ws, project_data):
-        """LED display specifications and hardware costs"""
-        ws.cell(row=1, column=1, value="LED HARDWARE SPECIFICATIONS").font = Font(
-            bold=True, size=14
-        )
+    def _executive_summary_row(self, ws, screen):
+        inp = screen.inputs
+        return [
+            screen.number,
+            inp.product_class,
+            f"{inp.width_ft}' × {inp.height_ft}'",
+            f"{inp.pixel_pitch}mm",
+            self._cell(ws, screen.sell_price, STYLE_CURRENCY),
+            self._cell(ws, screen.annual_service, STYLE_CURRENCY),
+        ]
 
+    def _generate_led_hardware_tab(self, ws, rollup):
+        """LED display specifications and hardware costs"""
         headers = [
             "Screen",
             "Product",
@@ -127,42 +392,34 @@ class ExcelGenerator:
             "Cost/Sq Ft",
             "Hardware Cost",
         ]
-        self._set_headers(ws, headers, 3)
-
-        total_hardware = 0
-        for idx, item in enumerate(project_data):
-            row = idx + 4
-            inp = item["inputs"]
-            details = item["details"]
-
-            hardware_cost = details.get("hardware", {}).get("raw_cost", 0)
-            total_hardware += hardware_cost
-
-            ws.cell(row=row, column=1, value=f"Screen {idx + 1}")
-            ws.cell(row=row, column=2, value=inp.product_class)
-            ws.cell(row=row, column=3, value=f"{inp.pixel_pitch}mm")
-            ws.cell(row=row, column=4, value=f"{inp.width_ft}' × {inp.height_ft}'")
-            ws.cell(row=row, column=5, value=f"{inp.width_px} × {inp.height_px}")
-            ws.cell(row=row, column=6, value=inp.total_sqft).number_format = "#,##0"
-            ws.cell(
-                row=row, column=7, value=details.get("hardware", {}).get("unit_cost", 0)
-            ).number_format = "$#,##0"
-            ws.cell(row=row, column=8, value=hardware_cost).number_format = "$#,##0"
+        self._set_column_widths(ws, headers)
+
+        yield [self._cell(ws, "LED HARDWARE SPECIFICATIONS", STYLE_TITLE)]
+        yield []
+        yield self._header_row(ws, headers)
+
+        for screen in rollup.screens:
+            yield self._led_hardware_row(ws, screen)
 
         # Total
-        total_row = len(project_data) + 5
-        ws.cell(row=total_row, column=1, value="TOTAL LED HARDWARE").font = Font(
-            bold=True
-        )
-        ws.cell(row=total_row, column=8, value=total_hardware).number_format = "$#,##0"
-        ws.cell(row=total_row, column=8).font = Font(bold=True)
+        yield []
+        yield self._total_row(ws, "TOTAL LED HARDWARE", 8, rollup.totals["hardware"])
+
+    def _led_hardware_row(self, ws, screen):
+        inp = screen.inputs
+        return [
+            f"Screen {screen.number}",
+            inp.product_class,
+            f"{inp.pixel_pitch}mm",
+            f"{inp.width_ft}' × {inp.height_ft}'",
+            f"{inp.width_px} × {inp.height_px}",
+            self._cell(ws, inp.total_sqft, STYLE_NUMBER),
+            self._cell(ws, screen.hardware_unit_cost, STYLE_CURRENCY),
+            self._cell(ws, screen.hardware, STYLE_CURRENCY),
+        ]
 
-    def _generate_structural_tab(self, ws, project_data):
+    def _generate_structural_tab(self, ws, rollup):
         """Structural materials, steel, mounting, engineering"""
-        ws.cell(row=1, column=1, value="STRUCTURAL REQUIREMENTS ANALYSIS").font = Font(
-            bold=True, size=14
-        )
-
         # Structural materials breakdown
         headers = [
             "Screen",
@@ -173,41 +430,18 @@ class ExcelGenerator:
             "Structural Mat'ls",
             "Structural Labor",
         ]
-        self._set_headers(ws, headers, 3)
-
-        total_structural = 0
-        for idx, item in enumerate(project_data):
-            row = idx + 4
-            inp = item["inputs"]
-            details = item["details"]
-
-            structural_materials = (
-                details.get("structural", {})
-                .get("structural_materials", {})
-                .get("raw_cost", 0)
-            )
-            structural_labor = (
-                details.get("structural", {})
-                .get("structural_labor", {})
-                .get("raw_cost", 0)
-            )
-            engineering = details.get("engineering", {}).get("raw_cost", 0)
-            total_structural += structural_materials + structural_labor + engineering
-
-            ws.cell(row=row, column=1, value=f"Screen {idx + 1}")
-            ws.cell(row=row, column=2, value=inp.mounting_type)
-            ws.cell(row=row, column=3, value=inp.structure_condition)
-            ws.cell(row=row, column=4, value="Calculated").font = Font(italic=True)
-            ws.cell(row=row, column=5, value=engineering).number_format = "$#,##0"
-            ws.cell(
-                row=row, column=6, value=structural_materials
-            ).number_format = "$#,##0"
-            ws.cell(row=row, column=7, value=structural_labor).number_format = "$#,##0"
+        self._set_column_widths(ws, headers)
+
+        yield [self._cell(ws, "STRUCTURAL REQUIREMENTS ANALYSIS", STYLE_TITLE)]
+        yield []
+        yield self._header_row(ws, headers)
+
+        for screen in rollup.screens:
+            yield self._structural_row(ws, screen)
 
         # Installation complexity assessment
-        ws.cell(
-            row=len(project_data) + 7, column=1, value="INSTALLATION COMPLEXITY FACTORS"
-        ).font = Font(bold=True, size=12)
+        yield from ([] for _ in range(3))
+        yield [self._cell(ws, "INSTALLATION COMPLEXITY FACTORS", STYLE_SECTION)]
         complexity_factors = [
             "Indoor/Outdoor Environment",
             "Front/Rear Service Access",
@@ -218,30 +452,27 @@ class ExcelGenerator:
             "Weather Protection Required",
             "Permit Complexity",
         ]
-
-        start_row = len(project_data) + 8
-        for idx, factor in enumerate(complexity_factors):
-            ws.cell(row=start_row + idx, column=1, value=factor)
-            ws.cell(row=start_row + idx, column=2, value="Assessed").font = Font(
-                italic=True
-            )
+        for factor in complexity_factors:
+            yield [factor, self._cell(ws, "Assessed", STYLE_NOTE)]
 
         # Total
-        total_row = len(project_data) + 17
-        ws.cell(row=total_row, column=1, value="TOTAL STRUCTURAL").font = Font(
-            bold=True
-        )
-        ws.cell(
-            row=total_row, column=7, value=total_structural
-        ).number_format = "$#,##0"
-        ws.cell(row=total_row, column=7).font = Font(bold=True)
+        yield []
+        yield self._total_row(ws, "TOTAL STRUCTURAL", 7, rollup.totals["structural"])
+
+    def _structural_row(self, ws, screen):
+        inp = screen.inputs
+        return [
+            f"Screen {screen.number}",
+            inp.mounting_type,
+            inp.structure_condition,
+            self._cell(ws, "Calculated", STYLE_NOTE),
+            self._cell(ws, screen.engineering, STYLE_CURRENCY),
+            self._cell(ws, screen.structural_materials, STYLE_CURRENCY),
+            self._cell(ws, screen.structural_labor, STYLE_CURRENCY),
+        ]
 
-    def _generate_labor_tab(self, ws, project_data):
+    def _generate_labor_tab(self, ws, rollup):
         """Labor analysis with union rates and crew sizes"""
-        ws.cell(
-            row=1, column=1, value="LABOR ANALYSIS & CREW REQUIREMENTS"
-        ).font = Font(bold=True, size=14)
-
         headers = [
             "Screen",
             "Labor Type",
@@ -251,62 +482,45 @@ class ExcelGenerator:
             "Total Hours",
             "Labor Cost",
         ]
-        self._set_headers(ws, headers, 3)
-
-        total_labor = 0
-        for idx, item in enumerate(project_data):
-            row = idx + 4
-            inp = item["inputs"]
-            details = item["details"]
-
-            # LED installation labor
-            led_labor = details.get("led_installation", {}).get("raw_cost", 0)
-            electrical_labor = (
-                details.get("electrical", {})
-                .get("electrical_labor", {})
-                .get("raw_cost", 0)
-            )
-            total_screen_labor = led_labor + electrical_labor
-            total_labor += total_screen_labor
-
-            ws.cell(row=row, column=1, value=f"Screen {idx + 1}")
-            ws.cell(row=row, column=2, value=inp.labor_type)
-            ws.cell(row=row, column=3, value="Calculated").font = Font(italic=True)
-            ws.cell(row=row, column=4, value="Calculated").font = Font(italic=True)
-            ws.cell(row=row, column=5, value="Union Rate").font = Font(italic=True)
-            ws.cell(row=row, column=6, value="Calculated").font = Font(italic=True)
-            ws.cell(
-                row=row, column=7, value=total_screen_labor
-            ).number_format = "$#,##0"
+        self._set_column_widths(ws, headers)
+
+        yield [self._cell(ws, "LABOR ANALYSIS & CREW REQUIREMENTS", STYLE_TITLE)]
+        yield []
+        yield self._header_row(ws, headers)
+
+        for screen in rollup.screens:
+            yield self._labor_row(ws, screen)
 
         # Union rate table
-        ws.cell(
-            row=len(project_data) + 7, column=1, value="UNION RATE REFERENCE"
-        ).font = Font(bold=True, size=12)
+        yield from ([] for _ in range(3))
+        yield [self._cell(ws, "UNION RATE REFERENCE", STYLE_SECTION)]
         union_rates = [
             ("Non-Union", "$45/hour"),
             ("Union - Local", "$75/hour"),
             ("Union - Travel", "$95/hour"),
             ("Prevailing Wage", "$85/hour"),
         ]
-
-        start_row = len(project_data) + 8
-        for idx, (union_type, rate) in enumerate(union_rates):
-            ws.cell(row=start_row + idx, column=1, value=union_type)
-            ws.cell(row=start_row + idx, column=2, value=rate)
+        for union_type, rate in union_rates:
+            yield [union_type, rate]
 
         # Total
-        total_row = len(project_data) + 14
-        ws.cell(row=total_row, column=1, value="TOTAL LABOR").font = Font(bold=True)
-        ws.cell(row=total_row, column=7, value=total_labor).number_format = "$#,##0"
-        ws.cell(row=total_row, column=7).font = Font(bold=True)
+        yield from ([] for _ in range(2))
+        yield self._total_row(ws, "TOTAL LABOR", 7, rollup.totals["labor"])
+
+    def _labor_row(self, ws, screen):
+        # LED installation labor plus electrical labor
+        return [
+            f"Screen {screen.number}",
+            screen.inputs.labor_type,
+            self._cell(ws, "Calculated", STYLE_NOTE),
+            self._cell(ws, "Calculated", STYLE_NOTE),
+            self._cell(ws, "Union Rate", STYLE_NOTE),
+            self._cell(ws, "Calculated", STYLE_NOTE),
+            self._cell(ws, screen.labor_total, STYLE_CURRENCY),
+        ]
 
-    def _generate_electrical_tab(self, ws, project_data):
+    def _generate_electrical_tab(self, ws, rollup):
         """Electrical systems, power distribution, data infrastructure"""
-        ws.cell(row=1, column=1, value="ELECTRICAL SYSTEMS ANALYSIS").font = Font(
-            bold=True, size=14
-        )
-
         headers = [
             "Screen",
             "Power Req (kW)",
@@ -316,78 +530,55 @@ class ExcelGenerator:
             "Data Infrastructure",
             "Total Electrical",
         ]
-        self._set_headers(ws, headers, 3)
-
-        total_electrical = 0
-        for idx, item in enumerate(project_data):
-            row = idx + 4
-            inp = item["inputs"]
-            details = item["details"]
-
-            electrical_materials = (
-                details.get("electrical", {})
-                .get("electrical_materials", {})
-                .get("raw_cost", 0)
-            )
-            electrical_labor = (
-                details.get("electrical", {})
-                .get("electrical_labor", {})
-                .get("raw_cost", 0)
-            )
-            total_electrical += electrical_materials + electrical_labor
-
-            ws.cell(row=row, column=1, value=f"Screen {idx + 1}")
-            ws.cell(row=row, column=2, value="Calculated").font = Font(italic=True)
-            ws.cell(
-                row=row, column=3, value=inp.power_distance
-            ).number_format = "$#,##0"
-            ws.cell(
-                row=row, column=4, value=electrical_materials
-            ).number_format = "$#,##0"
-            ws.cell(row=row, column=5, value=electrical_labor).number_format = "$#,##0"
-            ws.cell(row=row, column=6, value="Included").font = Font(italic=True)
-            ws.cell(
-                row=row, column=7, value=electrical_materials + electrical_labor
-            ).number_format = "$#,##0"
+        self._set_column_widths(ws, headers)
+
+        yield [self._cell(ws, "ELECTRICAL SYSTEMS ANALYSIS", STYLE_TITLE)]
+        yield []
+        yield self._header_row(ws, headers)
+
+        for screen in rollup.screens:
+            yield self._electrical_row(ws, screen)
 
         # Power requirements table
-        ws.cell(
-            row=len(project_data) + 7,
-            column=1,
-            value="POWER REQUIREMENTS BY DISPLAY TYPE",
-        ).font = Font(bold=True, size=12)
+        yield from ([] for _ in range(3))
+        yield [self._cell(ws, "POWER REQUIREMENTS BY DISPLAY TYPE", STYLE_SECTION)]
         power_reqs = [
             ("Indoor 4mm", "0.5 kW/sqft"),
             ("Indoor 6mm", "0.4 kW/sqft"),
             ("Outdoor 10mm", "0.8 kW/sqft"),
             ("Outdoor 16mm", "0.6 kW/sqft"),
         ]
-
-        start_row = len(project_data) + 8
-        for idx, (display_type, power_req) in enumerate(power_reqs):
-            ws.cell(row=start_row + idx, column=1, value=display_type)
-            ws.cell(row=start_row + idx, column=2, value=power_req)
+        for display_type, power_req in power_reqs:
+            yield [display_type, power_req]
 
         # Total
-        total_row = len(project_data) + 14
-        ws.cell(row=total_row, column=1, value="TOTAL ELECTRICAL").font = Font(
-            bold=True
-        )
-        ws.cell(
-            row=total_row, column=7, value=total_electrical
-        ).number_format = "$#,##0"
-        ws.cell(row=total_row, column=7).font = Font(bold=True)
+        yield from ([] for _ in range(2))
+        yield self._total_row(ws, "TOTAL ELECTRICAL", 7, rollup.totals["electrical"])
+
+    def _electrical_row(self, ws, screen):
+        return [
+            f"Screen {screen.number}",
+            self._cell(ws, "Calculated", STYLE_NOTE),
+            screen.inputs.power_distance,
+            self._cell(ws, screen.electrical_materials, STYLE_CURRENCY),
+            self._cell(ws, screen.electrical_labor, STYLE_CURRENCY),
+            self._cell(ws, "Included", STYLE_NOTE),
+            self._cell(ws, screen.electrical_total, STYLE_CURRENCY),
+        ]
 
-    def _generate_installation_tab(self, ws, project_data):
+    def _generate_installation_tab(self, ws, rollup):
         """Installation assessment, site conditions, complexity factors"""
-        ws.cell(
-            row=1, column=1, value="INSTALLATION ASSESSMENT & SITE CONDITIONS"
-        ).font = Font(bold=True, size=14)
+        # Column widths
+        ws.column_dimensions["A"].width = 25
+        ws.column_dimensions["B"].width = 35
+        ws.column_dimensions["C"].width = 15
+        ws.column_dimensions["D"].width = 15
+
+        yield [self._cell(ws, "INSTALLATION ASSESSMENT & SITE CONDITIONS", STYLE_TITLE)]
+        yield []
 
         # Installation factors table
-        ws.cell(row=3, column=1, value="INSTALLATION COMPLEXITY FACTORS").font = Font(
-            bold=True, size=12
-        )
+        yield [self._cell(ws, "INSTALLATION COMPLEXITY FACTORS", STYLE_SECTION)]
 
         installation_factors = [
             ("Environment", "Indoor/Outdoor Assessment"),
@@ -401,18 +592,17 @@ class ExcelGenerator:
             ("Permit Complexity", "Simple/Moderate/Complex"),
             ("Site Prep Required", "Minimal/Moderate/Extensive"),
         ]
-
-        for idx, (factor, description) in enumerate(installation_factors):
-            row = idx + 4
-            ws.cell(row=row, column=1, value=factor).font = Font(bold=True)
-            ws.cell(row=row, column=2, value=description)
-            ws.cell(row=row, column=3, value="Assessed").font = Font(italic=True)
-            ws.cell(row=row, column=4, value="Impact").font = Font(italic=True)
+        for factor, description in installation_factors:
+            yield [
+                self._cell(ws, factor, STYLE_LABEL),
+                description,
+                self._cell(ws, "Assessed", STYLE_NOTE),
+                self._cell(ws, "Impact", STYLE_NOTE),
+            ]
 
         # Site conditions assessment
-        ws.cell(row=15, column=1, value="SITE CONDITION ASSESSMENT").font = Font(
-            bold=True, size=12
-        )
+        yield []
+        yield [self._cell(ws, "SITE CONDITION ASSESSMENT", STYLE_SECTION)]
 
         site_conditions = [
             "Venue Type (NFL/NBA/NCAA/Other)",
@@ -423,130 +613,40 @@ class ExcelGenerator:
             "Staging Area Available",
             "Security Requirements",
         ]
+        for condition in site_conditions:
+            yield [condition, self._cell(ws, "Evaluated", STYLE_NOTE)]
 
-        for idx, condition in enumerate(site_conditions):
-            row = idx + 16
-            ws.cell(row=row, column=1, value=condition)
-            ws.cell(row=row, column=2, value="Evaluated").font = Font(italic=True)
-
-        # Column widths
-        ws.column_dimensions["A"].width = 25
-        ws.column_dimensions["B"].width = 35
-        ws.column_dimensions["C"].width = 15
-        ws.column_dimensions["D"].width = 15
-
-    def _generate_professional_services_tab(self, ws, project_data):
+    def _generate_professional_services_tab(self, ws, rollup):
         """Professional services: PM, engineering, permits, commissioning"""
-        ws.cell(row=1, column=1, value="PROFESSIONAL SERVICES BREAKDOWN").font = Font(
-            bold=True, size=14
-        )
-
         headers = ["Service Category", "Description", "Duration", "Rate", "Total Cost"]
-        self._set_headers(ws, headers, 3)
+        self._set_column_widths(ws, headers)
 
-        total_services = 0
+        yield [self._cell(ws, "PROFESSIONAL SERVICES BREAKDOWN", STYLE_TITLE)]
+        yield []
+        yield self._header_row(ws, headers)
 
-        # Project Management
-        pm_cost = sum(
-            item["details"].get("project_management", {}).get("raw_cost", 0)
-            for item in project_data
-        )
-        ws.cell(row=4, column=1, value="Project Management")
-        ws.cell(row=4, column=2, value="Overall project coordination and management")
-        ws.cell(row=4, column=3, value="Project Duration").font = Font(italic=True)
-        ws.cell(row=4, column=4, value="% of Total").font = Font(italic=True)
-        ws.cell(row=4, column=5, value=pm_cost).number_format = "$#,##0"
-        total_services += pm_cost
-
-        # Engineering
-        engineering_cost = sum(
-            item["details"].get("engineering", {}).get("raw_cost", 0)
-            for item in project_data
-        )
-        ws.cell(row=5, column=1, value="Engineering Services")
-        ws.cell(row=5, column=2, value="Structural and electrical engineering")
-        ws.cell(row=5, column=3, value="Design Phase").font = Font(italic=True)
-        ws.cell(row=5, column=4, value="Fixed Fee").font = Font(italic=True)
-        ws.cell(row=5, column=5, value=engineering_cost).number_format = "$#,##0"
-        total_services += engineering_cost
-
-        # Permits
-        permits_cost = sum(
-            item["details"].get("permits", {}).get("raw_cost", 0)
-            for item in project_data
-        )
-        ws.cell(row=6, column=1, value="Permits & Approvals")
-        ws.cell(row=6, column=2, value="Building permits and inspections")
-        ws.cell(row=6, column=3, value="Permit Duration").font = Font(italic=True)
-        ws.cell(row=6, column=4, value="Actual Cost").font = Font(italic=True)
-        ws.cell(row=6, column=5, value=permits_cost).number_format = "$#,##0"
-        total_services += permits_cost
-
-        # Submittals
-        submittals_cost = sum(
-            item["details"].get("submittals", {}).get("raw_cost", 0)
-            for item in project_data
-        )
-        ws.cell(row=7, column=1, value="Submittals")
-        ws.cell(row=7, column=2, value="Technical submittals and drawings")
-        ws.cell(row=7, column=3, value="Submittal Phase").font = Font(italic=True)
-        ws.cell(row=7, column=4, value="Fixed Fee").font = Font(italic=True)
-        ws.cell(row=7, column=5, value=submittals_cost).number_format = "$#,##0"
-        total_services += submittals_cost
-
-        # Final Commissioning
-        commissioning_cost = sum(
-            item["details"].get("final_commissioning", {}).get("raw_cost", 0)
-            for item in project_data
-        )
-        ws.cell(row=8, column=1, value="Final Commissioning")
-        ws.cell(row=8, column=2, value="System testing and commissioning")
-        ws.cell(row=8, column=3, value="Commissioning Period").font = Font(italic=True)
-        ws.cell(row=8, column=4, value="Fixed Fee").font = Font(italic=True)
-        ws.cell(row=8, column=5, value=commissioning_cost).number_format = "$#,##0"
-        total_services += commissioning_cost
+        total_services = 0
+        for key, category, description, duration, rate in PROFESSIONAL_SERVICES:
+            cost = rollup.totals[key]
+            yield [
+                category,
+                description,
+                self._cell(ws, duration, STYLE_NOTE),
+                self._cell(ws, rate, STYLE_NOTE),
+                self._cell(ws, cost, STYLE_CURRENCY),
+            ]
+            total_services += cost
 
         # Total
-        total_row = 10
-        ws.cell(
-            row=total_row, column=1, value="TOTAL PROFESSIONAL SERVICES"
-        ).font = Font(bold=True)
-        ws.cell(row=total_row, column=5, value=total_services).number_format = "$#,##0"
-        ws.cell(row=total_row, column=5).font = Font(bold=True)
-
-    def _generate_screen_detail_tab(self, ws, item, screen_num):
-        """Detailed cost breakdown for individual screen (existing enhanced)"""
-        # Title
-        inp = item["inputs"]
-        ws.cell(
-            row=1,
-            column=1,
-            value=f"Screen {screen_num}: {inp.product_class} - Detailed Analysis",
-        ).font = Font(bold=True, size=14)
-
-        # Basic specs
-        ws.cell(row=3, column=1, value="Screen Specifications:").font = Font(bold=True)
-        specs = [
-            ("Product Class", inp.product_class),
-            ("Pixel Pitch", f"{inp.pixel_pitch}mm"),
-            ("Dimensions", f"{inp.width_ft}' × {inp.height_ft}'"),
-            ("Resolution", f"{inp.width_px} × {inp.height_px} pixels"),
-            ("Total Square Footage", f"{inp.total_sqft:,.0f} sq ft"),
-            ("Indoor/Outdoor", "Indoor" if inp.indoor else "Outdoor"),
-            ("Mounting Type", inp.mounting_type),
-            ("Structure Condition", inp.structure_condition),
-        ]
+        yield []
+        yield self._total_row(ws, "TOTAL PROFESSIONAL SERVICES", 5, total_services)
 
-        for idx, (label, value) in enumerate(specs):
-            ws.cell(row=idx + 4, column=1, value=label).font = Font(bold=True)
-            ws.cell(row=idx + 4, column=2, value=value)
-
-        # Detailed cost breakdown
-        start_row = 13
-        ws.cell(row=start_row, column=1, value="Detailed Cost Breakdown:").font = Font(
-            bold=True, size=12
-        )
+    def _generate_screen_detail_tab(self, ws, item=None, screen_num=None):
+        """Detailed cost breakdown for individual screen (existing enhanced)
 
+        Without ``item`` this lays out the empty detail template used by the
+        skeleton workbook.
+        """
         headers = [
             "Category",
             "Description",
@@ -554,34 +654,74 @@ class ExcelGenerator:
             "Calculation Logic",
             "Sell Price",
         ]
-        self._set_headers(ws, headers, start_row + 1)
+        self._set_column_widths(ws, headers)
 
-        # Generate detailed breakdown using existing logic
-        details = item["details"]
-        breakdown = item["cost_breakdown"]
+        if item is None:
+            values = EMPTY_SCREEN_DETAIL
+        else:
+            values = self._screen_detail_values(item, screen_num)
+
+        # Title
+        yield [self._cell(ws, values["title"], STYLE_TITLE)]
+        yield []
 
-        mapping = [
-            ("1. Hardware", "hardware", None),
-            ("2. Structural Materials", "structural", "structural_materials"),
-            ("3. Structural Labor", "structural", "structural_labor"),
-            ("4. LED Installation", "led_installation", None),
-            ("5. Electrical Materials", "electrical", "electrical_materials"),
-            ("6. Electrical Labor", "electrical", "electrical_labor"),
-            ("7. CMS Equipment", "cms", "cms_equipment"),
-            ("8. CMS Installation", "cms", "cms_installation"),
-            ("9. CMS Commissioning", "cms", "cms_commissioning"),
-            ("10. Project Management", "project_management", None),
-            ("11. General Conditions", "general_conditions", None),
-            ("12. Travel & Expenses", "travel", None),
-            ("13. Submittals", "submittals", None),
-            ("14. Engineering", "engineering", None),
-            ("15. Permits", "permits", None),
-            ("16. Final Commissioning", "final_commissioning", None),
+        # Basic specs
+        yield [self._cell(ws, "Screen Specifications:", STYLE_LABEL)]
+        for label, value in zip(SCREEN_SPEC_LABELS, values["specs"]):
+            yield [self._cell(ws, label, STYLE_LABEL), value]
+
+        # Detailed cost breakdown
+        yield []
+        yield [self._cell(ws, "Detailed Cost Breakdown:", STYLE_SECTION)]
+        yield self._header_row(ws, headers)
+
+        for (label, _key, _sub_key), line in zip(
+            COST_BREAKDOWN_MAPPING, values["lines"]
+        ):
+            description, raw_cost, logic, sell_price = line
+            yield [
+                label,
+                description,
+                self._cell(ws, raw_cost, STYLE_CURRENCY),
+                logic,
+                self._cell(ws, sell_price, STYLE_CURRENCY),
+            ]
+
+        # Bond & Contingency
+        yield [
+            "17. Bond",
+            None,
+            None,
+            None,
+            self._cell(ws, values["bond"], STYLE_CURRENCY),
+        ]
+        yield [
+            "18. Contingency",
+            None,
+            None,
+            values["contingency_logic"],
+            self._cell(ws, values["contingency"], STYLE_CURRENCY),
         ]
 
-        row = start_row + 2
-        for label, detail_key, sub_key in mapping:
-            sell_price = breakdown.get(label, 0)
+        # Total
+        yield []
+        yield [
+            self._cell(ws, "TOTAL SELL PRICE", STYLE_SECTION),
+            None,
+            None,
+            None,
+            self._cell(ws, values["total"], STYLE_GRAND_TOTAL),
+        ]
+
+    def _screen_detail_values(self, item, screen_num):
+        """Project-specific values of a screen detail tab."""
+        inp = item["inputs"]
+        details = item["details"]
+        breakdown = item["cost_breakdown"]
+
+        # Generate detailed breakdown using existing logic
+        lines = []
+        for label, detail_key, sub_key in COST_BREAKDOWN_MAPPING:
             raw_obj = {}
             if detail_key in details:
                 parent = details[detail_key]
@@ -590,56 +730,85 @@ class ExcelGenerator:
                 else:
                     raw_obj = parent
 
-            description = raw_obj.get("description", "")
-            raw_cost = raw_obj.get("raw_cost", 0)
-            logic = raw_obj.get("calculation", "")
-
-            ws.cell(row=row, column=1, value=label)
-            ws.cell(row=row, column=2, value=description)
-            ws.cell(row=row, column=3, value=raw_cost).number_format = "$#,##0"
-            ws.cell(row=row, column=4, value=logic)
-            ws.cell(row=row, column=5, value=sell_price).number_format = "$#,##0"
-            row += 1
-
-        # Bond & Contingency
-        ws.cell(row=row, column=1, value="17. Bond")
-        ws.cell(
-            row=row, column=5, value=breakdown.get("17. Bond", 0)
-        ).number_format = "$#,##0"
-        row += 1
-
-        ws.cell(row=row, column=1, value="18. Contingency")
-        ws.cell(
-            row=row,
-            column=4,
-            value=f"{item['pricing'].get('contingency_pct', 0) * 100}% of Subtotal",
-        )
-        ws.cell(
-            row=row, column=5, value=breakdown.get("18. Contingency", 0)
-        ).number_format = "$#,##0"
-        row += 1
-
-        # Total
-        row += 1
-        ws.cell(row=row, column=1, value="TOTAL SELL PRICE").font = Font(
-            bold=True, size=12
-        )
-        ws.cell(
-            row=row, column=5, value=item["summary"]["final_sell_price"]
-        ).number_format = "$#,##0"
-        ws.cell(row=row, column=5).font = Font(bold=True, size=14)
-
-    def _set_headers(self, ws, headers, row):
-        """Helper function to set table headers"""
-        for col, h in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col, value=h)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(
-                start_color="003D82", end_color="003D82", fill_type="solid"
+            lines.append(
+                (
+                    raw_obj.get("description", ""),
+                    raw_obj.get("raw_cost", 0),
+                    raw_obj.get("calculation", ""),
+                    breakdown.get(label, 0),
+                )
             )
-            cell.alignment = Alignment(horizontal="center")
+
+        return {
+            "title": f"Screen {screen_num}: {inp.product_class} - Detailed Analysis",
+            "specs": [
+                inp.product_class,
+                f"{inp.pixel_pitch}mm",
+                f"{inp.width_ft}' × {inp.height_ft}'",
+                f"{inp.width_px} × {inp.height_px} pixels",
+                f"{inp.total_sqft:,.0f} sq ft",
+                "Indoor" if inp.indoor else "Outdoor",
+                inp.mounting_type,
+                inp.structure_condition,
+            ],
+            "lines": lines,
+            "bond": breakdown.get("17. Bond", 0),
+            "contingency_logic": (
+                f"{item['pricing'].get('contingency_pct', 0) * 100}% of Subtotal"
+            ),
+            "contingency": breakdown.get("18. Contingency", 0),
+            "total": item["summary"]["final_sell_price"],
+        }
+
+    # ------------------------------------------------------------------
+    # Row helpers
+    # ------------------------------------------------------------------
+
+    def _emit(self, ws, rows):
+        """Append generated rows in order (works for write-only sheets too)."""
+        for row in rows:
+            ws.append(row)
+
+    def _put_row(self, ws, row_idx, row):
+        """Write a generated row at a fixed position of a regular sheet."""
+        for column, value in enumerate(row, 1):
+            if value is None:
+                continue
+            if isinstance(value, Cell):
+                target = ws.cell(row=row_idx, column=column, value=value.value)
+                target._style = copy(value._style)
+            else:
+                ws.cell(row=row_idx, column=column, value=value)
+
+    def _cell(self, ws, value, style=None):
+        """Build a detached cell carrying a registered named style.
+
+        The placeholder coordinates are overwritten when the row is appended.
+        """
+        cell = Cell(ws, row=1, column=1, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def _header_row(self, ws, headers):
+        """Helper function to build a table header row"""
+        return [self._cell(ws, h, STYLE_HEADER) for h in headers]
+
+    def _total_row(self, ws, label, column, value):
+        """Bold label in column A with the currency total in ``column``."""
+        row = [None] * column
+        row[0] = self._cell(ws, label, STYLE_TOTAL)
+        row[column - 1] = self._cell(ws, value, STYLE_TOTAL_CURRENCY)
+        return row
+
+    def _set_column_widths(self, ws, headers, wide_columns=True):
+        """Size table columns; must run before the first row is appended."""
+        for col in range(1, len(headers) + 1):
             ws.column_dimensions[get_column_letter(col)].width = 20
 
+        if not wide_columns:
+            return
+
         # Wider columns for descriptions
         if len(headers) > 1:
             ws.column_dimensions["B"].width = 35
@@ -0,0 +1,63 @@
+"""
+Fast JSON responses for quote payloads.
+
+FastAPI's default path walks every response through jsonable_encoder and then
+stdlib json, which is slow for deeply nested multi-screen quotes. dumps()
+encodes with orjson, which handles dataclasses (CPQInput), Enums, datetimes
+and non-string keys natively; anything else goes through _default. Without
+orjson installed it falls back to stdlib json with the same conversions.
+
+Endpoints that return FastJSONResponse(...) directly skip jsonable_encoder
+altogether; the apps also use it as their default response class.
+Compression is negotiated separately by GZipMiddleware (GZIP_MIN_BYTES).
+"""
+
+import dataclasses
+import datetime
+import enum
+import json
+import os
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+
+def _default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    if orjson is None:
+        if dataclasses.is_dataclass(obj):
+            return dict(vars(obj))
+        if isinstance(obj, (datetime.date, datetime.time)):
+            return obj.isoformat()
+        if isinstance(obj, enum.Enum):
+            return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
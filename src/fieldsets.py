@@ -0,0 +1,72 @@
+"""
+Sparse fieldsets for quote responses.
+
+A full calculate_quote() result carries the inputs, pricing factors, the
+18-line cost breakdown, the summary and a nested ``details`` tree, and the
+endpoints used to return all of it (some of it twice). Callers pass
+``fields=`` with named views and/or top-level keys, e.g. ``fields=summary``
+or ``fields=breakdown,inputs``; select() keeps only those parts, so nothing
+else is copied or JSON-encoded.
+
+Views:
+    summary    summary totals only
+    breakdown  summary, pricing factors and the per-category cost breakdown
+    details    the full per-category details tree
+    explain    per-category calculation strings (the audit trail), flattened
+    full       everything (the default when ``fields`` is not given)
+"""
+
+from typing import Dict, FrozenSet, Optional
+
+QUOTE_KEYS = ("inputs", "pricing", "cost_breakdown", "summary", "details")
+
+VIEWS = {
+    "summary": ("summary",),
+    "breakdown": ("summary", "pricing", "cost_breakdown"),
+    "details": ("details",),
+    "explain": ("explain",),
+    "full": QUOTE_KEYS,
+}
+
+
+def parse_fields(spec: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Turn ``"summary,inputs"`` into the set of keys to keep.
+
+    Returns None (keep everything) for an empty spec; raises ValueError for
+    an unknown name.
+    """
+    if not spec:
+        return None
+    keys = set()
+    for name in filter(None, (part.strip() for part in spec.split(","))):
+        if name in VIEWS:
+            keys.update(VIEWS[name])
+        elif name in QUOTE_KEYS:
+            keys.add(name)
+        else:
+            known = ", ".join(sorted(set(VIEWS) | set(QUOTE_KEYS)))
+            raise ValueError(f"Unknown field {name!r}; expected one of: {known}")
+    return frozenset(keys)
+
+
+def explain(details: Dict) -> Dict[str, str]:
+    """Flatten a details tree to {category: calculation}."""
+    lines = {}
+    for key, entry in details.items():
+        if not isinstance(entry, dict):
+            continue
+        if "calculation" in entry:
+            lines[entry.get("category", key)] = entry["calculation"]
+        else:
+            lines.update(explain(entry))
+    return lines
+
+
+def select(result: Dict, fields: Optional[FrozenSet[str]]) -> Dict:
+    """The parts of a quote result named by ``fields`` (all of it for None)."""
+    if fields is None:
+        return result
+    selected = {k: result[k] for k in QUOTE_KEYS if k in fields and k in result}
+    if "explain" in fields:
+        selected["explain"] = explain(result.get("details", {}))
+    return selected
@@ -0,0 +1,146 @@
+"""
+RFC 6902 JSON Patch for project state saves.
+
+apply_patch() applies add / remove / replace / move / copy / test operations
+to a copy of a JSON document; make_patch() produces the patch between two
+documents (objects are diffed key by key, anything else is replaced whole),
+which is how full-state saves are stored compactly in the revision log.
+"""
+
+import copy
+from typing import Any, Dict, List, Tuple
+
+
+class JsonPatchError(ValueError):
+    """A patch was malformed or did not apply to the document."""
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _split(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [_unescape(t) for t in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _parent(doc: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = _split(pointer)
+    if not tokens:
+        raise JsonPatchError("Operation needs a path below the document root")
+    target = doc
+    for token in tokens[:-1]:
+        target = _get(target, token)
+    return target, tokens[-1]
+
+
+def _get(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path member not found: {token!r}")
+        return container[token]
+    if isinstance(container, list):
+        return container[_index(container, token)]
+    raise JsonPatchError(f"Cannot descend into {type(container).__name__}")
+
+
+def _resolve(doc: Any, pointer: str) -> Any:
+    for token in _split(pointer):
+        doc = _get(doc, token)
+    return doc
+
+
+def _add(doc: Any, pointer: str, value: Any) -> Any:
+    if pointer == "":
+        return value
+    parent, token = _parent(doc, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to {type(parent).__name__}")
+    return doc
+
+
+def _remove(doc: Any, pointer: str) -> Any:
+    parent, token = _parent(doc, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path member not found: {token!r}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, token))
+    raise JsonPatchError(f"Cannot remove from {type(parent).__name__}")
+
+
+def apply_patch(doc: Any, patch: List[Dict]) -> Any:
+    """Return a patched copy of ``doc``; ``doc`` itself is left untouched."""
+    if not isinstance(patch, list):
+        raise JsonPatchError("A patch is a list of operations")
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        if not isinstance(op, dict) or "op" not in op or "path" not in op:
+            raise JsonPatchError(f"Malformed operation: {op!r}")
+        kind, path = op["op"], op["path"]
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise JsonPatchError(f"{kind} needs a value")
+        if kind == "add":
+            doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            _remove(doc, path)
+        elif kind == "replace":
+            if path == "":
+                doc = copy.deepcopy(op["value"])
+            else:
+                _remove(doc, path)
+                doc = _add(doc, path, copy.deepcopy(op["value"]))
+        elif kind == "move":
+            if path.startswith(op["from"] + "/"):
+                raise JsonPatchError("Cannot move a value into itself")
+            doc = _add(doc, path, _remove(doc, op["from"]))
+        elif kind == "copy":
+            doc = _add(doc, path, copy.deepcopy(_resolve(doc, op["from"])))
+        elif kind == "test":
+            if _resolve(doc, path) != op["value"]:
+                raise JsonPatchError(f"Test failed at {path!r}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {kind!r}")
+    return doc
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> List[Dict]:
+    """Operations that turn ``old`` into ``new``."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            elif old[key] != value:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
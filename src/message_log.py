@@ -0,0 +1,190 @@
+"""
+Write-behind chat message logging.
+
+Streaming chat logs a burst of messages per turn, and each one used to cost
+its own transaction. MessageLog buffers them per project and a background
+thread writes the buffer as one multi-row INSERT, once MESSAGE_BATCH_SIZE
+messages are waiting or MESSAGE_FLUSH_MS after the first one arrived.
+
+Durability: stop() (app shutdown) and interpreter exit flush whatever is
+buffered; a failed flush keeps the rows and retries on the next tick.
+Readers of message history call flush(project_id) first so they see every
+message that was accepted. Messages for projects deleted while buffered are
+dropped at flush time.
+
+Project existence is checked once per project and remembered, so logging a
+message does not query the projects table every time. Flushed messages are
+added to the full-text index (project_search.py) in the same transaction.
+
+Configuration (environment):
+    MESSAGE_BATCH_SIZE  buffered messages that trigger a flush (default 50)
+    MESSAGE_FLUSH_MS    max time a message waits in the buffer (default 250)
+"""
+
+import atexit
+import datetime
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import Message, Project, SessionLocal
+from project_search import SEARCH_INDEX
+
+
+class MessageLog:
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_batch: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch or int(os.getenv("MESSAGE_BATCH_SIZE", "50"))
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else float(os.getenv("MESSAGE_FLUSH_MS", "250")) / 1000
+        )
+        self._pending: Dict[int, List[Dict]] = defaultdict(list)
+        self._count = 0
+        self._known: Set[int] = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()  # something is buffered
+        self._full = threading.Event()  # a full batch is buffered
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return self._count
+
+    def start(self):
+        """Start the flusher thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="message-log", daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the flusher and write everything still buffered."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+        atexit.unregister(self.stop)
+        self._wake.set()
+        self._full.set()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def project_exists(self, db: Session, project_id: int) -> bool:
+        if project_id in self._known:
+            return True
+        if db.query(Project.id).filter(Project.id == project_id).first() is None:
+            return False
+        self._known.add(project_id)
+        return True
+
+    def forget(self, project_id: int):
+        """The project was deleted: drop its buffered messages."""
+        self._known.discard(project_id)
+        with self._lock:
+            self._count -= len(self._pending.pop(project_id, []))
+
+    def append(self, project_id: int, messages: Iterable[Dict]) -> int:
+        """Buffer ``messages`` (role, content, thinking) for ``project_id``."""
+        if self._thread is None:
+            self.start()
+        now = datetime.datetime.utcnow()
+        rows = [
+            {
+                "project_id": project_id,
+                "role": m["role"],
+                "content": m["content"],
+                "thinking": m.get("thinking"),
+                "timestamp": now,
+            }
+            for m in messages
+        ]
+        with self._lock:
+            self._pending[project_id].extend(rows)
+            self._count += len(rows)
+            full = self._count >= self.max_batch
+        self._wake.set()
+        if full:
+            self._full.set()
+        return len(rows)
+
+    def flush(self, project_id: Optional[int] = None) -> int:
+        """Write buffered messages (only ``project_id``'s, if given) in one
+        INSERT; returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                if project_id is None:
+                    batches, self._pending = dict(self._pending), defaultdict(list)
+                else:
+                    batches = {project_id: self._pending.pop(project_id, [])}
+                self._count -= sum(len(rows) for rows in batches.values())
+            batches = {pid: rows for pid, rows in batches.items() if rows}
+            if not batches:
+                return 0
+            db = self.session_factory()
+            try:
+                live = {
+                    pid
+                    for (pid,) in db.query(Project.id).filter(Project.id.in_(batches))
+                }
+                rows = [row for pid in live for row in batches[pid]]
+                if rows:
+                    SEARCH_INDEX.ensure(db)
+                    inserted = db.execute(
+                        insert(Message).returning(
+                            Message.id, Message.project_id, Message.content
+                        ),
+                        rows,
+                    ).all()
+                    SEARCH_INDEX.index_messages(db, [tuple(row) for row in inserted])
+                db.commit()
+                return len(rows)
+            except Exception as e:
+                db.rollback()
+                print(f"Message log flush failed, will retry: {e}")
+                with self._lock:
+                    for pid, rows in batches.items():
+                        self._pending[pid][:0] = rows
+                        self._count += len(rows)
+                self._wake.set()
+                return 0
+            finally:
+                db.close()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopping:
+                return
+            if self._count == 0:
+                continue
+            # Give the batch time to fill unless it is already full
+            if self._count < self.max_batch:
+                self._full.wait(self.flush_interval)
+            self._full.clear()
+            if self._stopping:
+                return
+            self.flush()
+
+
+# Process-wide buffer used by the message endpoints
+MESSAGE_LOG = MessageLog()
@@ -0,0 +1,38 @@
+"""
+Opaque cursors for keyset pagination.
+
+A page ends with the sort key of its last row, e.g. (updated_at, id); the
+next page asks for rows strictly after it. Unlike OFFSET this costs the same
+on page 500 as on page 1 and does not skip or repeat rows when new ones
+arrive. The key travels to the client as an opaque url-safe token.
+"""
+
+import base64
+import datetime
+import json
+from typing import Any, List
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by encode_cursor()."""
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime.datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        return [
+            datetime.datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
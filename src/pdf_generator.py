@@ -1,64 +1,281 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import LETTER
 from reportlab.platypus import (
-    SimpleDocTemplate,
+    BaseDocTemplate,
+    Frame,
+    PageBreak,
+    PageTemplate,
     Table,
     TableStyle,
     Paragraph,
     Spacer,
-    Image,
 )
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from typing import List, Dict
+from typing import List, Dict, Optional
+from io import BytesIO
 import datetime
 
+from brand_assets import BRAND_ASSETS
+from branding import PDF_LAYOUT
+from project_rollup import ProjectRollup
+
+ANC_BLUE = colors.HexColor("#3b82f6")
+HEADER_DARK = colors.HexColor("#1e293b")
+
+# FORCE WIDE LAYOUT: 0.4 inch (28pt) margins.
+# Letter width = 612pt. Printable width = 612 - 56 = 556pt.
+PAGE_WIDTH, PAGE_HEIGHT = LETTER
+MARGIN_TOP = 30
+MARGIN_BOTTOM = 30
+MARGIN_SIDE = 28
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN_SIDE
+
+# Heights reserved for the page furniture drawn by ProposalPageTemplate
+HEADER_HEIGHT = 100
+FOOTER_HEIGHT = 64
+FRAME_HEIGHT = PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM - HEADER_HEIGHT - FOOTER_HEIGHT
+
+PRODUCT_HEADERS = ["Item Description", "Dimensions", "Pitch", "Qty", "Installed Price"]
+# [266, 110, 60, 40, 80] = 556
+PRODUCT_COL_WIDTHS = PDF_LAYOUT["table_column_widths"]
+
+# Fixed row heights for paginated tables, so pages are planned without
+# measuring cells (item rows hold two 10pt lines in the Dimensions column)
+HEADER_ROW_HEIGHT = 28
+ITEM_ROW_HEIGHT = 30
+SUBTOTAL_ROW_HEIGHT = 20
+TOTAL_ROW_HEIGHT = 24
+
+TERMS_TITLE = "Scope of Work & Exclusions"
+TERMS = [
+    "• Price includes LED Hardware, Standard Structural/Labor (as specified), and Shipping.",
+    "• Excludes: Primary power to site, Permits (unless noted), Data runs > 300ft.",
+    "• Payment Terms: 50% Deposit, 40% Shipping, 10% Completion.",
+]
+
+
+def _build_styles():
+    styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(
+            name="ANC_Title",
+            parent=styles["Heading1"],
+            fontSize=24,
+            textColor=ANC_BLUE,  # ANC Blue
+            spaceAfter=20,
+            alignment=1,  # Center
+        )
+    )
+    styles.add(ParagraphStyle(name="ANC_Label", fontSize=10, textColor=colors.gray))
+    styles.add(
+        ParagraphStyle(
+            name="ANC_Terms_Title", parent=styles["Heading3"], fontSize=9, spaceAfter=2
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="ANC_Terms", parent=styles["Normal"], fontSize=7.5, leading=9
+        )
+    )
+    return styles
+
+
+# Compiled once per process and shared by every PDFGenerator
+STYLES = _build_styles()
+
+META_TABLE_STYLE = TableStyle(
+    [
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("TEXTCOLOR", (0, 0), (0, -1), colors.gray),
+    ]
+)
+
+_PRODUCT_HEADER_COMMANDS = [
+    ("BACKGROUND", (0, 0), (-1, 0), HEADER_DARK),  # Dark Header
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("ALIGN", (0, 0), (0, -1), "LEFT"),  # Align desc left
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+]
+
+_GRAND_TOTAL_COMMANDS = [
+    ("LINEBELOW", (0, -2), (-1, -2), 2, ANC_BLUE),  # Bold line before total
+    ("FONTNAME", (-2, -1), (-1, -1), "Helvetica-Bold"),  # Bold Total
+    ("TEXTCOLOR", (-1, -1), (-1, -1), ANC_BLUE),  # Blue Total
+    ("SIZE", (-1, -1), (-1, -1), 14),
+]
+
+PRODUCT_TABLE_STYLE = TableStyle(
+    _PRODUCT_HEADER_COMMANDS
+    + [("GRID", (0, 0), (-1, -2), 0.5, colors.lightgrey)]  # Grid for items
+    + _GRAND_TOTAL_COMMANDS
+)
+
+# Paginated mode: one table per page, closed by a page subtotal row; the
+# last page also carries the grand total below its subtotal. Labels span the
+# first four columns and sit right-aligned against the amount.
+PAGE_TABLE_STYLE = TableStyle(
+    _PRODUCT_HEADER_COMMANDS
+    + [
+        ("GRID", (0, 0), (-1, -2), 0.5, colors.lightgrey),
+        ("VALIGN", (0, 1), (-1, -1), "MIDDLE"),
+        ("SPAN", (0, -1), (3, -1)),
+        ("ALIGN", (0, -1), (3, -1), "RIGHT"),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Oblique"),
+        ("TEXTCOLOR", (0, -1), (-1, -1), colors.gray),
+    ]
+)
+
+LAST_PAGE_TABLE_STYLE = TableStyle(
+    _PRODUCT_HEADER_COMMANDS
+    + [
+        ("GRID", (0, 0), (-1, -3), 0.5, colors.lightgrey),
+        ("VALIGN", (0, 1), (-1, -1), "MIDDLE"),
+        ("SPAN", (0, -2), (3, -2)),
+        ("ALIGN", (0, -2), (3, -2), "RIGHT"),
+        ("FONTNAME", (0, -2), (-1, -2), "Helvetica-Oblique"),
+        ("TEXTCOLOR", (0, -2), (-1, -2), colors.gray),
+        ("LINEBELOW", (0, -2), (-1, -2), 2, ANC_BLUE),  # Bold line before total
+        # Grand total amount spans the last three columns to fit 14pt figures,
+        # and the label is padded so the two never touch
+        ("SPAN", (0, -1), (1, -1)),
+        ("SPAN", (2, -1), (4, -1)),
+        ("ALIGN", (0, -1), (-1, -1), "RIGHT"),
+        ("RIGHTPADDING", (0, -1), (1, -1), 18),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),  # Bold Total
+        ("TEXTCOLOR", (2, -1), (2, -1), ANC_BLUE),  # Blue Total
+        ("SIZE", (2, -1), (2, -1), 14),
+    ]
+)
+
+
+class ProposalPageTemplate(PageTemplate):
+    """
+    Single-frame page with the static header (logo, title, rule) and footer
+    (scope and terms) drawn as PDF form XObjects. Each form is recorded on
+    the first page of a document and referenced by name on every later page,
+    so the furniture is laid out once per proposal rather than per page.
+    """
+
+    HEADER_FORM = "ancProposalHeader"
+    FOOTER_FORM = "ancProposalFooter"
 
-class PDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.styles.add(
-            ParagraphStyle(
-                name="ANC_Title",
-                parent=self.styles["Heading1"],
-                fontSize=24,
-                textColor=colors.HexColor("#3b82f6"),  # ANC Blue
-                spaceAfter=20,
-                alignment=1,  # Center
-            )
+        frame = Frame(
+            MARGIN_SIDE,
+            MARGIN_BOTTOM + FOOTER_HEIGHT,
+            CONTENT_WIDTH,
+            FRAME_HEIGHT,
+            leftPadding=0,
+            rightPadding=0,
+            topPadding=0,
+            bottomPadding=0,
+            id="body",
         )
-        self.styles.add(
-            ParagraphStyle(name="ANC_Label", fontSize=10, textColor=colors.gray)
+        super().__init__(id="proposal", frames=[frame], pagesize=LETTER)
+
+    def beforeDrawPage(self, canv, doc):
+        if not canv.hasForm(self.HEADER_FORM):
+            self._record_form(canv, self.HEADER_FORM, self._draw_header)
+            self._record_form(canv, self.FOOTER_FORM, self._draw_footer)
+        canv.doForm(self.HEADER_FORM)
+        canv.doForm(self.FOOTER_FORM)
+
+        canv.saveState()
+        canv.setFont("Helvetica", 8)
+        canv.setFillColor(colors.gray)
+        canv.drawRightString(
+            PAGE_WIDTH - MARGIN_SIDE, MARGIN_BOTTOM - 12, f"Page {doc.page}"
         )
+        canv.restoreState()
+
+    def _record_form(self, canv, name, draw):
+        canv.beginForm(name)
+        canv.saveState()
+        draw(canv)
+        canv.restoreState()
+        canv.endForm()
+
+    def _draw_header(self, canv):
+        top = PAGE_HEIGHT - MARGIN_TOP
+        logo = BRAND_ASSETS.logo()
+        if logo is not None:
+            logo.drawOn(canv, MARGIN_SIDE, top - logo.height)
+
+        title = STYLES["ANC_Title"]
+        canv.setFont("Helvetica-Bold", title.fontSize)
+        canv.setFillColor(title.textColor)
+        canv.drawCentredString(PAGE_WIDTH / 2, top - 24, "ANC SPORTS ENTERPRISES")
+
+        subtitle = STYLES["Heading2"]
+        canv.setFont(subtitle.fontName, subtitle.fontSize)
+        canv.setFillColor(colors.black)
+        canv.drawString(MARGIN_SIDE, top - 62, "SALES QUOTATION")
+
+        # Full width rule under the title (556pt = printable width)
+        BRAND_ASSETS.rule(width=CONTENT_WIDTH, height=5).drawOn(
+            canv, MARGIN_SIDE, top - 80
+        )
+
+    def _draw_footer(self, canv):
+        y = MARGIN_BOTTOM + FOOTER_HEIGHT
+        for text, style in [(TERMS_TITLE, "ANC_Terms_Title")] + [
+            (line, "ANC_Terms") for line in TERMS
+        ]:
+            para = Paragraph(text, STYLES[style])
+            _, height = para.wrapOn(canv, CONTENT_WIDTH, FOOTER_HEIGHT)
+            y -= height + STYLES[style].spaceAfter
+            para.drawOn(canv, MARGIN_SIDE, y)
+
+
+class ProposalDocTemplate(BaseDocTemplate):
+    def __init__(self, filename, **kwargs):
+        super().__init__(
+            filename,
+            pagesize=LETTER,
+            topMargin=MARGIN_TOP,
+            bottomMargin=MARGIN_BOTTOM,
+            leftMargin=MARGIN_SIDE,
+            rightMargin=MARGIN_SIDE,
+            **kwargs,
+        )
+        self.addPageTemplates([ProposalPageTemplate()])
+
+
+class PDFGenerator:
+    # Proposals with at least this many screens are laid out one table per
+    # page with fixed row heights instead of as a single splitting table.
+    PAGINATED_ROW_THRESHOLD = 40
+
+    def __init__(self):
+        self.styles = STYLES
 
     def generate_proposal(
         self,
         project_data: List[Dict],
         client_name: str,
         filename: str = "anc_client_proposal.pdf",
+        rollup: Optional[ProjectRollup] = None,
+        paginated: Optional[bool] = None,
     ):
-        # FORCE WIDE LAYOUT: 0.4 inch (28pt) margins.
-        # Letter width = 612pt. Printable width = 612 - 56 = 556pt.
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=LETTER,
-            topMargin=30,
-            bottomMargin=30,
-            leftMargin=28,
-            rightMargin=28,
-        )
-        elements = []
-
-        # 1. Header with Logo Area
-        elements.append(Paragraph("ANC SPORTS ENTERPRISES", self.styles["ANC_Title"]))
-        elements.append(Paragraph("SALES QUOTATION", self.styles["Heading2"]))
+        """
+        Lay out the client proposal. With ``paginated=True`` (the default
+        once the project reaches ``PAGINATED_ROW_THRESHOLD`` screens) the
+        product table is emitted as one fixed-height table per page, each
+        with its own header row and page subtotal.
+        """
+        if rollup is None:
+            rollup = ProjectRollup.from_project_data(project_data)
+        if paginated is None:
+            paginated = len(rollup) >= self.PAGINATED_ROW_THRESHOLD
 
-        # VISUAL DEBUG: Full width line to prove margins
-        elements.append(
-            Image("https://placehold.co/550x5/3b82f6/3b82f6.png", width=556, height=5)
-        )
-        elements.append(Spacer(1, 20))
+        # Header, rule and terms are page furniture (ProposalPageTemplate);
+        # only the metadata grid and product table are laid out here.
+        doc = ProposalDocTemplate(filename)
+        elements = []
 
-        # 2. Metadata Grid
+        # 1. Metadata Grid
         date_str = datetime.datetime.now().strftime("%Y-%m-%d")
         meta_data = [
             ["Prepared For:", client_name],
@@ -72,103 +289,112 @@ class PDFGenerator:
         ]
         # Widen metadata table to match new page width (556pt)
         t_meta = Table(meta_data, colWidths=[120, 436], hAlign="LEFT")
-        t_meta.setStyle(
-            TableStyle(
-                [
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("TEXTCOLOR", (0, 0), (0, -1), colors.gray),
-                ]
-            )
-        )
+        t_meta.setStyle(META_TABLE_STYLE)
         elements.append(t_meta)
         elements.append(Spacer(1, 30))
 
-        # 3. Main Product Table
-        headers = ["Item Description", "Dimensions", "Pitch", "Qty", "Installed Price"]
-        table_data = [headers]
-
-        total_contract_value = 0
-
-        for item in project_data:
-            inp = item["inputs"]
-            summary = item["summary"]
-            sq_ft = inp.width_ft * inp.height_ft
-
-            desc = f"{inp.product_class} ({inp.shape}, {inp.access} Access)"
-            if inp.is_outdoor:
-                desc += " - Outdoor Rated"
-
-            row = [
-                desc,
-                f"{inp.width_ft}' x {inp.height_ft}'\n({sq_ft:.1f} sqft)",
-                f"{inp.pixel_pitch}mm",
-                "1",
-                f"${summary['final_sell_price']:,.2f}",
-            ]
-            table_data.append(row)
-            total_contract_value += summary["final_sell_price"]
-
-        # Total Row
-        table_data.append(["", "", "", "TOTAL:", f"${total_contract_value:,.2f}"])
-
-        # Styling: Total Width MUST be 556pt
-        # [266, 110, 60, 40, 80] = 556
-        t_prod = Table(table_data, colWidths=[266, 110, 60, 40, 80])
-        t_prod.setStyle(
-            TableStyle(
-                [
-                    (
-                        "BACKGROUND",
-                        (0, 0),
-                        (-1, 0),
-                        colors.HexColor("#1e293b"),
-                    ),  # Dark Header
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("ALIGN", (0, 0), (0, -1), "LEFT"),  # Align desc left
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("GRID", (0, 0), (-1, -2), 0.5, colors.lightgrey),  # Grid for items
-                    (
-                        "LINEBELOW",
-                        (0, -2),
-                        (-1, -2),
-                        2,
-                        colors.HexColor("#3b82f6"),
-                    ),  # Bold line before total
-                    ("FONTNAME", (-2, -1), (-1, -1), "Helvetica-Bold"),  # Bold Total
-                    (
-                        "TEXTCOLOR",
-                        (-1, -1),
-                        (-1, -1),
-                        colors.HexColor("#3b82f6"),
-                    ),  # Blue Total
-                    ("SIZE", (-1, -1), (-1, -1), 14),
-                ]
+        # 2. Main Product Table
+        total_contract_value = rollup.totals["sell_price"]
+        if paginated:
+            meta_height = t_meta.wrap(CONTENT_WIDTH, FRAME_HEIGHT)[1] + 30
+            elements.extend(
+                self._paginated_product_tables(
+                    rollup, total_contract_value, FRAME_HEIGHT - meta_height
+                )
             )
-        )
-        elements.append(t_prod)
-        elements.append(Spacer(1, 40))
+        else:
+            table_data = [PRODUCT_HEADERS]
+            table_data.extend(self._product_row(screen) for screen in rollup.screens)
 
-        # 4. Exclusions / Terms (Standard Text)
-        elements.append(
-            Paragraph("Scope of Work & Exclusions", self.styles["Heading3"])
-        )
-        terms = """
-        • Price includes LED Hardware, Standard Structural/Labor (as specified), and Shipping.
-        • Excludes: Primary power to site, Permits (unless noted), Data runs > 300ft.
-        • Payment Terms: 50% Deposit, 40% Shipping, 10% Completion.
+            # Total Row
+            table_data.append(["", "", "", "TOTAL:", f"${total_contract_value:,.2f}"])
+
+            # Styling: Total Width MUST be 556pt
+            t_prod = Table(table_data, colWidths=PRODUCT_COL_WIDTHS)
+            t_prod.setStyle(PRODUCT_TABLE_STYLE)
+            elements.append(t_prod)
+
+        # filename may be a filesystem path or a writable binary buffer
+        doc.build(elements)
+        if isinstance(filename, str):
+            print(f"Generated Publisher PDF: {filename}")
+
+    def _product_row(self, screen):
+        inp = screen.inputs
+        sq_ft = inp.width_ft * inp.height_ft
+
+        desc = f"{inp.product_class} ({inp.shape}, {inp.access} Access)"
+        if inp.is_outdoor:
+            desc += " - Outdoor Rated"
+
+        return [
+            desc,
+            f"{inp.width_ft}' x {inp.height_ft}'\n({sq_ft:.1f} sqft)",
+            f"{inp.pixel_pitch}mm",
+            "1",
+            f"${screen.sell_price:,.2f}",
+        ]
+
+    def _paginated_product_tables(self, rollup, total_contract_value, first_page_height):
         """
-        elements.append(Paragraph(terms, self.styles["Normal"]))
-
-        # 4. Exclusions / Terms (Standard Text)
-        elements.append(Paragraph("Scope of Work & Exclusions", self.styles['Heading3']))
-        terms = """
-        • Price includes LED Hardware, Standard Structural/Labor (as specified), and Shipping.
-        • Excludes: Primary power to site, Permits (unless noted), Data runs > 300ft.
-        • Payment Terms: 50% Deposit, 40% Shipping, 10% Completion.
+        Yield one product table per page followed by a PageBreak. Row counts
+        are planned from the fixed row heights, so no table ever has to be
+        measured or split by the layout engine.
         """
-        elements.append(Paragraph(terms, self.styles['Normal']))
+        reserved = HEADER_ROW_HEIGHT + SUBTOTAL_ROW_HEIGHT
+        available = first_page_height
+        screens = rollup.screens
+        start = 0
+        while start < len(screens):
+            count = max(1, int((available - reserved) // ITEM_ROW_HEIGHT))
+            remaining = len(screens) - start
+            if remaining <= count:
+                # Final page: leave room for the grand total row as well
+                fits = int((available - reserved - TOTAL_ROW_HEIGHT) // ITEM_ROW_HEIGHT)
+                count = remaining if remaining <= fits else max(1, fits)
+            chunk = screens[start : start + count]
+            start += len(chunk)
+            last_page = start >= len(screens)
 
-        doc.build(elements)
-        print(f"Generated Publisher PDF: {filename}")
+            subtotal = sum(screen.sell_price for screen in chunk)
+            table_data = [PRODUCT_HEADERS]
+            table_data.extend(self._product_row(screen) for screen in chunk)
+            table_data.append(["Page subtotal:", "", "", "", f"${subtotal:,.2f}"])
+            row_heights = (
+                [HEADER_ROW_HEIGHT]
+                + [ITEM_ROW_HEIGHT] * len(chunk)
+                + [SUBTOTAL_ROW_HEIGHT]
+            )
+            if last_page:
+                table_data.append(["TOTAL:", "", f"${total_contract_value:,.2f}", "", ""])
+                row_heights.append(TOTAL_ROW_HEIGHT)
+
+            table = Table(
+                table_data,
+                colWidths=PRODUCT_COL_WIDTHS,
+                rowHeights=row_heights,
+                repeatRows=1,
+            )
+            table.setStyle(LAST_PAGE_TABLE_STYLE if last_page else PAGE_TABLE_STYLE)
+            yield table
+            if not last_page:
+                yield PageBreak()
+            available = FRAME_HEIGHT
+
+    def render_proposal(
+        self,
+        project_data: List[Dict],
+        client_name: str,
+        rollup: Optional[ProjectRollup] = None,
+        paginated: Optional[bool] = None,
+    ) -> bytes:
+        """Render the client proposal into memory and return the PDF bytes."""
+        buffer = BytesIO()
+        self.generate_proposal(
+            project_data,
+            client_name,
+            filename=buffer,
+            rollup=rollup,
+            paginated=paginated,
+        )
+        return buffer.getvalue()
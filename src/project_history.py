@@ -0,0 +1,142 @@
+"""
+Versioned project state: JSON Patch saves with a revision log.
+
+Every state save bumps Project.version and records a ProjectRevision holding
+the RFC 6902 patch from the previous version. Every SNAPSHOT_EVERY versions
+the revision also keeps the full state, so rebuilding an old version replays
+at most SNAPSHOT_EVERY - 1 patches on top of the nearest snapshot.
+
+Saves are optimistic: the update only applies while the row is still at the
+version the caller started from, otherwise VersionConflict carries the
+current version back so the client can re-sync.
+
+What this does and does not save: the client sends only the changed
+fields (the patch), so requests are small. But Project.state is still a
+single JSON column, so every save rewrites the whole column and also
+inserts a ProjectRevision. Per save, the database writes somewhat more than
+before versioning, not less. The gain is on the wire and in the history
+(any version can be rebuilt), not in write volume.
+
+Projects saved before versioning have state at version 0 but no revisions;
+their first versioned save records that state as a version-0 snapshot.
+
+Configuration (environment):
+    PROJECT_SNAPSHOT_EVERY  versions between full snapshots (default 20)
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, undefer
+
+from database import Project, ProjectRevision
+from json_patch import apply_patch
+
+SNAPSHOT_EVERY = int(os.getenv("PROJECT_SNAPSHOT_EVERY", "20"))
+
+
+class VersionConflict(Exception):
+    """The project moved on since the caller's base version."""
+
+    def __init__(self, current: int):
+        super().__init__(f"Project is at version {current}")
+        self.current = current
+
+
+def commit_state(
+    db: Session,
+    project: Project,
+    state: Dict,
+    patch: List[Dict],
+    base_version: Optional[int] = None,
+    **columns: Any,
+) -> int:
+    """Store ``state`` (``patch`` applied to version ``base_version``) as the
+    next version, along with any extra Project ``columns``; returns it.
+
+    The full ``state`` is written to Project.state; ``patch`` is what is
+    kept in the revision log."""
+    current = project.version or 0
+    base = current if base_version is None else base_version
+    if base != current:
+        raise VersionConflict(current)
+    if base == 0 and project.state:
+        has_revisions = (
+            db.query(ProjectRevision.id)
+            .filter(ProjectRevision.project_id == project.id)
+            .first()
+        )
+        if not has_revisions:
+            db.add(
+                ProjectRevision(
+                    project_id=project.id, version=0, patch=[], snapshot=project.state
+                )
+            )
+
+    version = base + 1
+    updated = (
+        db.query(Project)
+        .filter(Project.id == project.id, func.coalesce(Project.version, 0) == base)
+        .update(
+            {"state": state, "version": version, **columns},
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        db.rollback()
+        db.refresh(project)
+        raise VersionConflict(project.version or 0)
+    db.add(
+        ProjectRevision(
+            project_id=project.id,
+            version=version,
+            patch=patch,
+            snapshot=state if version % SNAPSHOT_EVERY == 0 else None,
+        )
+    )
+    db.commit()
+    return version
+
+
+def state_at(db: Session, project_id: int, version: int) -> Dict:
+    """Rebuild the project state as of ``version``."""
+    base = (
+        db.query(ProjectRevision)
+        .options(undefer(ProjectRevision.snapshot))
+        .filter(
+            ProjectRevision.project_id == project_id,
+            ProjectRevision.version <= version,
+            ProjectRevision.snapshot.isnot(None),
+        )
+        .order_by(ProjectRevision.version.desc())
+        .first()
+    )
+    state, start = (base.snapshot, base.version) if base else ({}, 0)
+    patches = (
+        db.query(ProjectRevision.patch)
+        .filter(
+            ProjectRevision.project_id == project_id,
+            ProjectRevision.version > start,
+            ProjectRevision.version <= version,
+        )
+        .order_by(ProjectRevision.version)
+    )
+    for (patch,) in patches:
+        state = apply_patch(state, patch)
+    return state
+
+
+def revisions(db: Session, project_id: int, limit: int = 50) -> List[Dict]:
+    """The newest ``limit`` revisions, newest first (patches not included)."""
+    rows = (
+        db.query(
+            ProjectRevision.version,
+            ProjectRevision.created_at,
+            ProjectRevision.snapshot.isnot(None).label("snapshot"),
+        )
+        .filter(ProjectRevision.project_id == project_id)
+        .order_by(ProjectRevision.version.desc())
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
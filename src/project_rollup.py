@@ -0,0 +1,136 @@
+"""
+Single-pass rollup of calculated quotes.
+
+The Excel tabs and the PDF summary all need the same per-screen raw costs and
+per-category totals. ProjectRollup walks the CPQCalculator results once and
+keeps both, so every output renders from identical numbers.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Per-category totals kept on ProjectRollup.totals
+TOTAL_KEYS = [
+    "sell_price",
+    "annual_service",
+    "hardware",
+    "structural",
+    "labor",
+    "electrical",
+    "project_management",
+    "engineering",
+    "permits",
+    "submittals",
+    "final_commissioning",
+]
+
+
+def _raw_cost(details: Dict, key: str, sub_key: Optional[str] = None) -> float:
+    """Read ``raw_cost`` from a calculator details block (0 when absent)."""
+    block = details.get(key, {})
+    if sub_key:
+        block = block.get(sub_key, {})
+    return block.get("raw_cost", 0)
+
+
+@dataclass
+class ScreenRollup:
+    """Flattened cost columns for one screen."""
+
+    number: int
+    inputs: Any
+    quote: Dict
+    sell_price: float = 0
+    annual_service: float = 0
+    hardware: float = 0
+    hardware_unit_cost: float = 0
+    structural_materials: float = 0
+    structural_labor: float = 0
+    engineering: float = 0
+    led_installation: float = 0
+    electrical_materials: float = 0
+    electrical_labor: float = 0
+    project_management: float = 0
+    permits: float = 0
+    submittals: float = 0
+    final_commissioning: float = 0
+
+    @property
+    def structural_total(self) -> float:
+        return self.structural_materials + self.structural_labor + self.engineering
+
+    @property
+    def labor_total(self) -> float:
+        return self.led_installation + self.electrical_labor
+
+    @property
+    def electrical_total(self) -> float:
+        return self.electrical_materials + self.electrical_labor
+
+    @classmethod
+    def from_quote(cls, number: int, quote: Dict) -> "ScreenRollup":
+        details = quote.get("details", {})
+        summary = quote.get("summary", {})
+        return cls(
+            number=number,
+            inputs=quote["inputs"],
+            quote=quote,
+            sell_price=summary.get("final_sell_price", 0),
+            annual_service=summary.get("annual_service", 0),
+            hardware=_raw_cost(details, "hardware"),
+            hardware_unit_cost=details.get("hardware", {}).get("unit_cost", 0),
+            structural_materials=_raw_cost(
+                details, "structural", "structural_materials"
+            ),
+            structural_labor=_raw_cost(details, "structural", "structural_labor"),
+            engineering=_raw_cost(details, "engineering"),
+            led_installation=_raw_cost(details, "led_installation"),
+            electrical_materials=_raw_cost(
+                details, "electrical", "electrical_materials"
+            ),
+            electrical_labor=_raw_cost(details, "electrical", "electrical_labor"),
+            project_management=_raw_cost(details, "project_management"),
+            permits=_raw_cost(details, "permits"),
+            submittals=_raw_cost(details, "submittals"),
+            final_commissioning=_raw_cost(details, "final_commissioning"),
+        )
+
+
+@dataclass
+class ProjectRollup:
+    """Per-screen columns plus project-wide category totals."""
+
+    screens: List[ScreenRollup] = field(default_factory=list)
+    totals: Dict[str, float] = field(
+        default_factory=lambda: {key: 0 for key in TOTAL_KEYS}
+    )
+
+    def __len__(self) -> int:
+        return len(self.screens)
+
+    def add(self, quote: Dict) -> ScreenRollup:
+        """Fold one calculated quote into the rollup."""
+        screen = ScreenRollup.from_quote(len(self.screens) + 1, quote)
+        self.screens.append(screen)
+
+        totals = self.totals
+        totals["sell_price"] += screen.sell_price
+        totals["annual_service"] += screen.annual_service
+        totals["hardware"] += screen.hardware
+        totals["structural"] += screen.structural_total
+        totals["labor"] += screen.labor_total
+        totals["electrical"] += screen.electrical_total
+        totals["project_management"] += screen.project_management
+        totals["engineering"] += screen.engineering
+        totals["permits"] += screen.permits
+        totals["submittals"] += screen.submittals
+        totals["final_commissioning"] += screen.final_commissioning
+        return screen
+
+    @classmethod
+    def from_project_data(cls, project_data: List[Dict]) -> "ProjectRollup":
+        """Build the rollup in a single pass over the calculated quotes."""
+        rollup = cls()
+        for quote in project_data:
+            rollup.add(quote)
+        return rollup
@@ -0,0 +1,293 @@
+"""
+Full-text search over projects and chat history.
+
+One search document per project (client and project names in ``title``,
+key wizard-state fields in ``body``) and one per chat message (its content).
+On SQLite they live in an FTS5 table ranked with bm25(); on Postgres in a
+table with a generated tsvector column, a GIN index and ts_rank(). Either
+way the table is ``search_documents`` and documents are keyed by doc_id:
+
+    -project_id  the project document
+    message_id   a message document
+
+so every update and delete is a primary-key lookup, never a scan.
+
+The index is maintained by the application (message bodies are stored
+compressed, so database triggers could not read them): project saves
+re-index the project document, MessageLog flushes index the new messages,
+and deleting a project removes its documents. The first time a database is
+used the table is created and back-filled from existing rows.
+
+Queries match every word, as a prefix ("lamb" finds "Lambeau"). Results are
+scoped by joining projects, so organization changes need no re-indexing.
+"""
+
+import re
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+from database import Message, Project
+
+TABLE = "search_documents"
+
+# Wizard-state fields worth finding a project by
+STATE_FIELDS = (
+    "clientName",
+    "projectName",
+    "address",
+    "productClass",
+    "environment",
+    "serviceLevel",
+    "timeline",
+)
+
+# Title matches count this many times more than body matches (SQLite)
+TITLE_WEIGHT = 5.0
+REBUILD_BATCH = 500
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    "kind UNINDEXED, project_id UNINDEXED, message_id UNINDEXED, title, body, "
+    "tokenize = 'porter unicode61')"
+]
+
+POSTGRES_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+    "doc_id BIGINT PRIMARY KEY, kind VARCHAR(16) NOT NULL, "
+    "project_id INTEGER NOT NULL, message_id INTEGER, title TEXT, body TEXT, "
+    "tsv TSVECTOR GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED)",
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_tsv ON {TABLE} USING GIN (tsv)",
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_project_id ON {TABLE} (project_id)",
+]
+
+
+def query_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def project_document(
+    client_name: Optional[str], project_name: Optional[str], state: Optional[Dict]
+) -> Tuple[str, str]:
+    """(title, body) of a project's search document."""
+    state = state or {}
+    title = " ".join(
+        dict.fromkeys(
+            filter(None, [client_name, project_name, state.get("projectName")])
+        )
+    )
+    body = " ".join(
+        str(state[field])
+        for field in STATE_FIELDS
+        if isinstance(state.get(field), (str, int, float))
+    )
+    return title, body
+
+
+class SearchIndex:
+    def __init__(self):
+        self._ready = weakref.WeakSet()  # engines whose table exists
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _dialect(db: Session) -> str:
+        return db.get_bind().dialect.name
+
+    def ensure(self, db: Session):
+        """Create and back-fill the search table on first use of a database.
+
+        Runs on its own connection, so call it before writing in ``db``."""
+        bind = db.get_bind()
+        if bind in self._ready:
+            return
+        with self._lock:
+            if bind in self._ready:
+                return
+            with bind.begin() as conn:
+                if not inspect(conn).has_table(TABLE):
+                    ddl = POSTGRES_DDL if bind.dialect.name == "postgresql" else SQLITE_DDL
+                    for statement in ddl:
+                        conn.execute(text(statement))
+                    self._rebuild(Session(bind=conn))
+            self._ready.add(bind)
+
+    def _delete(self, db: Session, doc_ids: Sequence[int]):
+        column = "doc_id" if self._dialect(db) == "postgresql" else "rowid"
+        db.execute(
+            text(f"DELETE FROM {TABLE} WHERE {column} = :doc_id"),
+            [{"doc_id": doc_id} for doc_id in doc_ids],
+        )
+
+    def _insert(self, db: Session, docs: List[Dict]):
+        if not docs:
+            return
+        column = "doc_id" if self._dialect(db) == "postgresql" else "rowid"
+        db.execute(
+            text(
+                f"INSERT INTO {TABLE} ({column}, kind, project_id, message_id, title, body) "
+                "VALUES (:doc_id, :kind, :project_id, :message_id, :title, :body)"
+            ),
+            docs,
+        )
+
+    @staticmethod
+    def _project_doc(project_id, client_name, project_name, state) -> Dict:
+        title, body = project_document(client_name, project_name, state)
+        return {
+            "doc_id": -project_id,
+            "kind": "project",
+            "project_id": project_id,
+            "message_id": None,
+            "title": title,
+            "body": body,
+        }
+
+    @staticmethod
+    def _message_docs(messages: Iterable[Tuple[int, int, str]]) -> List[Dict]:
+        return [
+            {
+                "doc_id": message_id,
+                "kind": "message",
+                "project_id": project_id,
+                "message_id": message_id,
+                "title": "",
+                "body": content or "",
+            }
+            for message_id, project_id, content in messages
+        ]
+
+    def _rebuild(self, db: Session):
+        projects = db.query(
+            Project.id, Project.client_name, Project.project_name, Project.state
+        ).yield_per(REBUILD_BATCH)
+        self._insert(db, [self._project_doc(*project) for project in projects])
+        batch = []
+        for row in db.query(Message.id, Message.project_id, Message.content).yield_per(
+            REBUILD_BATCH
+        ):
+            batch.append(tuple(row))
+            if len(batch) >= REBUILD_BATCH:
+                self._insert(db, self._message_docs(batch))
+                batch = []
+        self._insert(db, self._message_docs(batch))
+
+    def index_project(
+        self,
+        db: Session,
+        project_id: int,
+        client_name: Optional[str],
+        project_name: Optional[str],
+        state: Optional[Dict],
+    ):
+        """(Re-)index a project's own document; the caller commits."""
+        self.ensure(db)
+        self._delete(db, [-project_id])
+        self._insert(db, [self._project_doc(project_id, client_name, project_name, state)])
+
+    def index_messages(self, db: Session, messages: Iterable[Tuple[int, int, str]]):
+        """Index new (message_id, project_id, content) rows; the caller
+        commits. ensure() must already have run for ``db``."""
+        self._insert(db, self._message_docs(messages))
+
+    def remove_project(self, db: Session, project_id: int):
+        """Drop a project's documents; call before its messages are deleted."""
+        self.ensure(db)
+        message_ids = [
+            message_id
+            for (message_id,) in db.query(Message.id).filter(Message.project_id == project_id)
+        ]
+        self._delete(db, [-project_id, *message_ids])
+
+    def rebuild(self, db: Session):
+        """Re-index every project and message from scratch; the caller commits."""
+        self.ensure(db)
+        db.execute(text(f"DELETE FROM {TABLE}"))
+        self._rebuild(db)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        org_id: Optional[int] = None,
+        limit: int = 20,
+        after: Optional[Sequence] = None,
+    ) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+        """Best matches first, and the key to pass as ``after`` for the next
+        page (None on the last one).
+
+        Hits have kind, project_id, message_id, client_name, project_name,
+        snippet and rank (higher is better). Pages are keyset-paginated on
+        (rank, doc_id), like /api/projects.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return [], None
+        self.ensure(db)
+        params = {"limit": limit + 1, "org_id": org_id}
+        # Applied to the ranked matches (columns of the ``matched`` subquery)
+        filters = "AND organization_id = :org_id" if org_id is not None else ""
+        if after is not None:
+            params["after_rank"], params["after_id"] = after
+            filters += " AND (rank < :after_rank OR (rank = :after_rank AND doc_id < :after_id))"
+        if self._dialect(db) == "postgresql":
+            params["q"] = " & ".join(f"{term}:*" for term in terms)
+            sql = f"""
+                SELECT hit.*, ts_headline('english', hit.body, to_tsquery('english', :q),
+                                          'MaxWords=20, MinWords=8') AS snippet
+                FROM (
+                    SELECT * FROM (
+                        SELECT d.doc_id, d.kind, d.project_id, d.message_id, d.body,
+                               p.organization_id, p.client_name, p.project_name,
+                               ts_rank(d.tsv, to_tsquery('english', :q)) AS rank
+                        FROM {TABLE} d JOIN projects p ON p.id = d.project_id
+                        WHERE d.tsv @@ to_tsquery('english', :q)
+                    ) matched
+                    WHERE true {filters}
+                    ORDER BY rank DESC, doc_id DESC
+                    LIMIT :limit
+                ) hit
+                ORDER BY hit.rank DESC, hit.doc_id DESC
+            """
+        else:
+            params["q"] = " ".join('"{}"*'.format(term) for term in terms)
+            sql = f"""
+                SELECT * FROM (
+                    SELECT {TABLE}.rowid AS doc_id, {TABLE}.kind, {TABLE}.project_id,
+                           {TABLE}.message_id, p.organization_id,
+                           p.client_name, p.project_name,
+                           snippet({TABLE}, -1, '', '', '…', 16) AS snippet,
+                           -bm25({TABLE}, 0, 0, 0, {TITLE_WEIGHT}, 1.0) AS rank
+                    FROM {TABLE} JOIN projects p ON p.id = {TABLE}.project_id
+                    WHERE {TABLE} MATCH :q
+                ) matched
+                WHERE 1 = 1 {filters}
+                ORDER BY rank DESC, doc_id DESC
+                LIMIT :limit
+            """
+        rows = [dict(row._mapping) for row in db.execute(text(sql), params)]
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = (float(rows[-1]["rank"]), int(rows[-1]["doc_id"]))
+        hits = []
+        for row in rows:
+            hits.append(
+                {
+                    "kind": row["kind"],
+                    "project_id": int(row["project_id"]),
+                    "message_id": row["message_id"],
+                    "client_name": row["client_name"],
+                    "project_name": row["project_name"],
+                    "snippet": row["snippet"],
+                    "rank": round(float(row["rank"]), 4),
+                }
+            )
+        return hits, next_after
+
+# Process-wide search index used by the save paths and /api/search
+SEARCH_INDEX = SearchIndex()
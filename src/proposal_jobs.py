@@ -0,0 +1,295 @@
+"""
+Asynchronous proposal jobs.
+
+POST /api/jobs/proposals enqueues a ProjectRequest and returns at once with a
+job id; a small pool of worker threads runs queued jobs through the proposal
+pipeline and, in place of the pipeline's persist/outbox stages, stores the
+Excel and PDF on the job row. Job state lives in the
+``proposal_jobs`` table, so a restart re-queues anything that was queued or
+running when the process stopped.
+
+A worker claims a job with a conditional UPDATE (queued -> running, stamped
+with its worker id), so a job is never run twice even when several
+processes re-queue the same rows. A housekeeping thread heartbeats the
+running jobs it owns. Only running jobs whose heartbeat has gone stale
+(their process died) are put back, never those of a live process. The
+same thread drops the stored files of jobs that finished more than
+JOB_RESULT_TTL_HOURS ago and marks them expired.
+
+The queue is bounded: once ``max_queue`` jobs are waiting, submit() raises
+JobQueueFull and the API answers 429.
+
+Configuration (environment):
+    JOB_WORKERS            worker threads (default 2)
+    JOB_QUEUE_DEPTH        max queued jobs before refusing (default 32)
+    JOB_HEARTBEAT_SECONDS  heartbeat and housekeeping interval (default 15)
+    JOB_STALE_SECONDS      heartbeat age after which a running job is
+                           re-queued (default 60)
+    JOB_RESULT_TTL_HOURS   how long finished jobs keep their files (default 24)
+"""
+
+import datetime
+import functools
+import os
+import queue
+import secrets
+import socket
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_
+
+from database import ProposalJob, SessionLocal
+from proposal_pipeline import PipelineContext, ProposalPipeline
+
+# Job stages in order; progress is the share of stages completed
+STAGES = ["inputs", "pricing", "rendering", "storing"]
+
+class JobQueueFull(Exception):
+    """The job queue is at capacity."""
+
+
+def job_progress(job: ProposalJob) -> float:
+    if job.status in ("succeeded", "expired"):
+        return 1.0
+    return round(len(job.timings or {}) / len(STAGES), 2)
+
+
+class ProposalJobQueue:
+    def __init__(
+        self,
+        pipeline: ProposalPipeline,
+        session_factory=SessionLocal,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        heartbeat: Optional[float] = None,
+        stale_after: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+    ):
+        # Everything but the job-specific storing stage
+        self.pipeline = pipeline.without("persist", "outbox", "storing")
+        self.session_factory = session_factory
+        self.workers = workers if workers is not None else int(os.getenv("JOB_WORKERS", "2"))
+        self.max_queue = (
+            max_queue if max_queue is not None else int(os.getenv("JOB_QUEUE_DEPTH", "32"))
+        )
+        self.heartbeat = (
+            heartbeat
+            if heartbeat is not None
+            else float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+        )
+        self.stale_after = (
+            stale_after
+            if stale_after is not None
+            else float(os.getenv("JOB_STALE_SECONDS", "60"))
+        )
+        self.result_ttl = (
+            result_ttl
+            if result_ttl is not None
+            else float(os.getenv("JOB_RESULT_TTL_HOURS", "24")) * 3600
+        )
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=self.max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        """Re-queue unfinished jobs from the DB and start the workers (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return self
+            self._stopping.clear()
+            self.recover()
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"proposal-job-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            if self.workers:
+                thread = threading.Thread(
+                    target=self._housekeep, name="proposal-job-housekeeping", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Stop after the jobs in progress; queued jobs stay queued in the DB."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stopping.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def recover(self) -> int:
+        """Queue jobs nobody is working on: queued rows, and running rows whose
+        worker stopped heartbeating (its process died). Returns the number
+        put on the queue."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.stale_after)
+        db = self.session_factory()
+        try:
+            db.query(ProposalJob).filter(
+                ProposalJob.status == "running",
+                or_(ProposalJob.heartbeat_at.is_(None), ProposalJob.heartbeat_at < cutoff),
+            ).update(
+                {"status": "queued", "stage": None, "timings": {}, "worker_id": None},
+                synchronize_session=False,
+            )
+            db.commit()
+            job_ids = [
+                job_id
+                for (job_id,) in db.query(ProposalJob.id)
+                .filter(ProposalJob.status == "queued")
+                .order_by(ProposalJob.created_at)
+            ]
+        finally:
+            db.close()
+        queued = 0
+        with self._queue.mutex:
+            waiting = set(self._queue.queue)
+        for job_id in job_ids:
+            if job_id in waiting:
+                continue
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                break  # the rest stay queued in the DB for the next pass
+            queued += 1
+        return queued
+
+    def purge_expired(self) -> int:
+        """Drop the stored files of jobs that finished over ``result_ttl`` ago."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.result_ttl)
+        db = self.session_factory()
+        try:
+            purged = (
+                db.query(ProposalJob)
+                .filter(ProposalJob.status == "succeeded", ProposalJob.finished_at < cutoff)
+                .update(
+                    {"status": "expired", "excel": None, "pdf": None},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return purged
+        finally:
+            db.close()
+
+    def submit(self, request: Dict) -> str:
+        """Persist a new job and queue it. Raises JobQueueFull at capacity."""
+        if not self._threads:
+            self.start()
+
+        job_id = secrets.token_urlsafe(12)
+        db = self.session_factory()
+        try:
+            db.add(ProposalJob(id=job_id, status="queued", request=request, timings={}))
+            db.commit()
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                db.query(ProposalJob).filter(ProposalJob.id == job_id).delete()
+                db.commit()
+                raise JobQueueFull(
+                    f"{self._queue.qsize()} proposal jobs queued (limit {self.max_queue})"
+                )
+        finally:
+            db.close()
+        return job_id
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print(f"Proposal job {job_id} crashed: {e}")
+
+    def _housekeep(self):
+        while not self._stopping.wait(self.heartbeat):
+            try:
+                self._beat()
+                self.recover()
+                self.purge_expired()
+            except Exception as e:
+                print(f"Proposal job housekeeping failed: {e}")
+
+    def _beat(self):
+        db = self.session_factory()
+        try:
+            db.query(ProposalJob).filter(
+                ProposalJob.status == "running", ProposalJob.worker_id == self.worker_id
+            ).update(
+                {"heartbeat_at": datetime.datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _run(self, job_id: str):
+        db = self.session_factory()
+        try:
+            now = datetime.datetime.utcnow()
+            # Claim it: only one worker, in any process, moves it off "queued"
+            claimed = (
+                db.query(ProposalJob)
+                .filter(ProposalJob.id == job_id, ProposalJob.status == "queued")
+                .update(
+                    {
+                        "status": "running",
+                        "worker_id": self.worker_id,
+                        "started_at": now,
+                        "heartbeat_at": now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if not claimed:
+                return
+            job = db.get(ProposalJob, job_id)
+
+            def on_stage(name: str, ctx: PipelineContext):
+                job.stage = name
+                job.timings = dict(ctx.timings)
+                job.heartbeat_at = datetime.datetime.utcnow()
+                db.commit()
+
+            ctx = PipelineContext(request=dict(job.request))
+            try:
+                pipeline = self.pipeline.with_stage(
+                    "storing", functools.partial(self._store, job)
+                )
+                pipeline.run(ctx, on_stage)
+            except Exception as e:
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e)
+            else:
+                job.status = "succeeded"
+            job.timings = dict(ctx.timings)
+            job.finished_at = datetime.datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def _store(self, job: ProposalJob, ctx: PipelineContext):
+        job.excel = ctx.excel
+        job.pdf = ctx.pdf
+        job.result = {
+            "screens": len(ctx.rollup),
+            "total_sell_price": ctx.rollup.totals["sell_price"],
+            "files": {
+                "excel": "ANC_Expert_Estimation.xlsx",
+                "pdf": "ANC_Proposal.pdf",
+            },
+        }
@@ -0,0 +1,212 @@
+"""
+Proposal pipeline shared by /api/generate, /api/send-proposal, proposal
+jobs and the bulk generator.
+
+A proposal runs through named stages, each a callable taking the
+PipelineContext:
+
+    inputs     build CPQInputs from the request payload
+    pricing    price every screen with CPQCalculator.calculate_batch
+    rendering  render the Excel and PDF concurrently (RenderService)
+    persist    park the files in the in-memory ArtifactStore
+    outbox     queue the proposal email (only when a recipient is set)
+
+Stages are pluggable: callers swap or drop them with with_stage() /
+without(). Every run records wall-clock seconds per stage in
+``context.timings``.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from calculator import CPQCalculator, CPQInput
+from project_rollup import ProjectRollup
+
+Stage = Callable[["PipelineContext"], None]
+
+# ScreenInput defaults (server.py) for payloads that were not validated
+SCREEN_DEFAULTS = {
+    "mounting_type": "Wall",
+    "structure_condition": "Existing",
+    "labor_type": "NonUnion",
+    "power_distance": "Close",
+    "target_margin": 30.0,
+    "venue_type": "corporate",
+    "shape": "Flat",
+    "access": "Rear",
+    "complexity": "Standard",
+    "permits": "Client",
+    "control_system": "Include",
+    "bond_required": False,
+    "unit_cost": 0.0,
+}
+
+PROJECT_DEFAULTS = {
+    "service_level": "bronze",
+    "timeline": "standard",
+    "permits": "client",
+    "control_system": "include",
+    "bond_required": False,
+}
+
+
+@dataclass
+class PipelineContext:
+    """Everything a proposal accumulates on its way through the stages."""
+
+    request: Dict[str, Any]
+    recipient_email: Optional[str] = None
+    inputs: List[CPQInput] = field(default_factory=list)
+    project_data: List[Dict] = field(default_factory=list)
+    rollup: Optional[ProjectRollup] = None
+    excel: Optional[bytes] = None
+    pdf: Optional[bytes] = None
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+    outbox: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def client_name(self) -> str:
+        return self.request.get("client_name", "")
+
+
+def build_inputs(ctx: PipelineContext):
+    """CPQInputs for every screen, with project-level fallbacks."""
+    project = {**PROJECT_DEFAULTS, **ctx.request}
+    ctx.inputs = []
+    for screen in project.get("screens", []):
+        s = {**SCREEN_DEFAULTS, **screen}
+        ctx.inputs.append(
+            CPQInput(
+                client_name=project["client_name"],
+                product_class=s["product_class"],
+                pixel_pitch=float(s["pixel_pitch"]),
+                width_ft=float(s["width_ft"]),
+                height_ft=float(s["height_ft"]),
+                is_outdoor=bool(s["is_outdoor"]),
+                shape=s["shape"],
+                access=s["access"],
+                complexity=s["complexity"],
+                target_margin=s["target_margin"],
+                structure_condition=s["structure_condition"],
+                labor_type=s["labor_type"],
+                power_distance=s["power_distance"],
+                venue_type=s["venue_type"],
+                service_level=project["service_level"],
+                timeline=project["timeline"],
+                permits=s["permits"] or project["permits"],
+                control_system=s["control_system"] or project["control_system"],
+                bond_required=bool(s["bond_required"] or project["bond_required"]),
+                unit_cost=s["unit_cost"],
+            )
+        )
+
+
+def annotate_quote(result: Dict, mounting_type: Optional[str] = None) -> Dict:
+    """Add the derived input attributes the Excel and PDF renderers read."""
+    inp = result["inputs"]
+    inp.width_px = int((inp.width_ft * 304.8) / inp.pixel_pitch)
+    inp.height_px = int((inp.height_ft * 304.8) / inp.pixel_pitch)
+    inp.total_sqft = inp.width_ft * inp.height_ft
+    inp.indoor = not inp.is_outdoor
+    inp.mounting_type = mounting_type or "Wall"
+    return result
+
+
+def price(ctx: PipelineContext):
+    """Batch-price the inputs and add the attributes the Excel tabs read."""
+    screens = ctx.request.get("screens", [])
+    ctx.project_data = CPQCalculator().calculate_batch(ctx.inputs)
+    for result, screen in zip(ctx.project_data, screens):
+        annotate_quote(result, screen.get("mounting_type"))
+    ctx.rollup = ProjectRollup.from_project_data(ctx.project_data)
+
+
+def render_with(
+    render: Callable[[List[Dict], str, ProjectRollup], Tuple[bytes, bytes]]
+) -> Stage:
+    """Rendering stage around a (project_data, client_name, rollup) renderer
+    that returns (excel_bytes, pdf_bytes), e.g. RenderService.render_sync."""
+
+    def rendering(ctx: PipelineContext):
+        ctx.excel, ctx.pdf = render(ctx.project_data, ctx.client_name, ctx.rollup)
+
+    return rendering
+
+
+def persist(ctx: PipelineContext):
+    """Park both files in the process-wide ArtifactStore."""
+    from artifacts import ARTIFACTS, EXCEL_MEDIA_TYPE, PDF_MEDIA_TYPE
+
+    ctx.artifacts = {
+        "excel": ARTIFACTS.put(
+            "excel", "ANC_Expert_Estimation.xlsx", EXCEL_MEDIA_TYPE, ctx.excel
+        ),
+        "pdf": ARTIFACTS.put("pdf", "ANC_Proposal.pdf", PDF_MEDIA_TYPE, ctx.pdf),
+    }
+
+
+def outbox(ctx: PipelineContext):
+    """Queue the proposal email with both files attached."""
+    if not ctx.recipient_email:
+        return
+    from server_email import send_proposal_to_outbox
+
+    attachments = [
+        (a.filename, a.content) for a in (ctx.artifacts["pdf"], ctx.artifacts["excel"])
+    ]
+    ctx.outbox = send_proposal_to_outbox(
+        ctx.recipient_email, attachments, metadata={"client": ctx.client_name}
+    )
+
+
+class ProposalPipeline:
+    def __init__(self, stages: List[Tuple[str, Stage]]):
+        self.stages = list(stages)
+
+    @property
+    def stage_names(self) -> List[str]:
+        return [name for name, _ in self.stages]
+
+    def with_stage(self, name: str, stage: Stage) -> "ProposalPipeline":
+        """Copy with ``name`` replaced (or appended when it is new)."""
+        stages = [(n, stage if n == name else s) for n, s in self.stages]
+        if name not in self.stage_names:
+            stages.append((name, stage))
+        return ProposalPipeline(stages)
+
+    def without(self, *names: str) -> "ProposalPipeline":
+        return ProposalPipeline([(n, s) for n, s in self.stages if n not in names])
+
+    def run(
+        self,
+        ctx: PipelineContext,
+        on_stage: Optional[Callable[[str, PipelineContext], None]] = None,
+    ) -> PipelineContext:
+        """Run every stage in order. ``on_stage(name, ctx)`` is called as each
+        stage starts; ``ctx.timings`` gains the stage's seconds as it ends."""
+        for name, stage in self.stages:
+            if on_stage is not None:
+                on_stage(name, ctx)
+            started = time.perf_counter()
+            stage(ctx)
+            ctx.timings[name] = round(time.perf_counter() - started, 4)
+        return ctx
+
+
+def default_pipeline(render=None) -> ProposalPipeline:
+    """inputs -> pricing -> rendering -> persist -> outbox."""
+    if render is None:
+        from render_service import RENDER_SERVICE
+
+        render = RENDER_SERVICE.render_sync
+    return ProposalPipeline(
+        [
+            ("inputs", build_inputs),
+            ("pricing", price),
+            ("rendering", render_with(render)),
+            ("persist", persist),
+            ("outbox", outbox),
+        ]
+    )
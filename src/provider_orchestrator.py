@@ -0,0 +1,210 @@
+"""
+Hedged calls across redundant upstream providers (geocoding).
+
+Providers are tried in priority order. The next one is started as soon as
+the current one fails or comes back empty, or once ``hedge_after`` seconds
+pass without an answer, so a degraded primary costs at most the hedge
+budget. The first non-empty answer wins and the calls still running are
+cancelled.
+
+Each provider has a CircuitBreaker. After ``failure_threshold`` consecutive
+failures it opens and the provider is skipped. After ``reset_seconds`` a
+single half-open probe call is allowed: success closes the breaker again,
+failure re-opens it. Each provider also keeps LatencyStats (calls,
+failures, hedged-away calls, p50/p95 over recent calls).
+
+Configuration (environment):
+    PROVIDER_HEDGE_AFTER_MS         latency budget before hedging (default 300)
+    PROVIDER_BREAKER_FAILURES       consecutive failures that open (default 3)
+    PROVIDER_BREAKER_RESET_SECONDS  open time before a probe (default 30)
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class NoProviderAvailable(Exception):
+    """Every provider failed or has its circuit open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold or int(
+            os.getenv("PROVIDER_BREAKER_FAILURES", "3")
+        )
+        self.reset_seconds = (
+            reset_seconds
+            if reset_seconds is not None
+            else float(os.getenv("PROVIDER_BREAKER_RESET_SECONDS", "30"))
+        )
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """May a call go out now? In half-open state only one probe may."""
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+    def record_cancelled(self):
+        """A hedged-away call proves nothing; let the next call probe."""
+        self._probing = False
+
+
+class LatencyStats:
+    def __init__(self, window: int = 200):
+        self.calls = 0
+        self.failures = 0
+        self.hedged = 0
+        self._latencies = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool):
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+        self._latencies.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "hedged": self.hedged,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class Provider:
+    """One upstream: ``fetch(query)`` returns a list of results."""
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[str], Awaitable[List]],
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = LatencyStats()
+
+
+class ProviderOrchestrator:
+    def __init__(self, providers: List[Provider], hedge_after: Optional[float] = None):
+        self.providers = providers
+        self.hedge_after = (
+            hedge_after
+            if hedge_after is not None
+            else float(os.getenv("PROVIDER_HEDGE_AFTER_MS", "300")) / 1000
+        )
+
+    async def _call(self, provider: Provider, query: str) -> List:
+        started = time.perf_counter()
+        try:
+            results = await provider.fetch(query)
+        except asyncio.CancelledError:
+            provider.stats.hedged += 1
+            provider.breaker.record_cancelled()
+            raise
+        except Exception:
+            provider.stats.record(time.perf_counter() - started, ok=False)
+            provider.breaker.record_failure()
+            raise
+        provider.stats.record(time.perf_counter() - started, ok=True)
+        provider.breaker.record_success()
+        return results
+
+    async def first(self, query: str) -> List:
+        """The first non-empty answer; [] when every provider answered with
+        nothing. Raises NoProviderAvailable when none had an answer and at
+        least one failed or was skipped, so callers do not cache it."""
+        waiting = list(self.providers)
+        running: Dict[asyncio.Task, Provider] = {}
+        errors = []
+        answered = False
+
+        def launch_next() -> bool:
+            while waiting:
+                provider = waiting.pop(0)
+                if provider.breaker.allow():
+                    task = asyncio.create_task(self._call(provider, query))
+                    running[task] = provider
+                    return True
+                errors.append(f"{provider.name}: circuit open")
+            return False
+
+        launch_next()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self.hedge_after if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Latency budget spent: hedge with the next provider
+                    launch_next()
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        results = task.result()
+                    except Exception as e:
+                        errors.append(f"{provider.name}: {e}")
+                        continue
+                    if results:
+                        return results
+                    answered = True
+                if not running:
+                    launch_next()
+        finally:
+            for task in running:
+                task.cancel()
+        if answered and not errors:
+            return []
+        raise NoProviderAvailable("; ".join(errors) or "no providers configured")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            p.name: dict(p.stats.snapshot(), circuit=p.breaker.state)
+            for p in self.providers
+        }
@@ -0,0 +1,231 @@
+"""
+Process-pool rendering service for proposal artifacts.
+
+ReportLab and openpyxl are pure Python and CPU bound, so rendering in the
+request path both serialises the two documents and holds up the server.
+RenderService keeps a warm ProcessPoolExecutor whose workers import both
+libraries, compile the PDF styles, load the branding assets and build the
+Excel skeleton once at start-up. Each request submits the Excel and the PDF
+as two jobs that run side by side, so latency is max(excel, pdf).
+
+Only the rollup is sent to the workers: it already carries every screen's
+quote, so the worker rebuilds project_data from it instead of receiving
+(and unpickling) the same quotes twice.
+
+A request is refused up front with RenderQueueFull when too many renders
+are already in flight, and fails with RenderTimeout when its jobs do not
+finish within the per-job timeout. A job that is already running cannot be
+cancelled, so a timed-out render keeps its queue slot until both of its
+jobs have actually finished.
+
+Configuration (environment):
+    RENDER_WORKERS          worker processes (default 2; 0 renders in-process)
+    RENDER_QUEUE_DEPTH      max renders in flight before refusing (default 16)
+    RENDER_TIMEOUT_SECONDS  per-request timeout (default 60)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+
+from project_rollup import ProjectRollup
+
+
+class RenderQueueFull(Exception):
+    """Too many renders are already queued or running."""
+
+
+class RenderTimeout(Exception):
+    """A render job did not finish within the configured timeout."""
+
+
+def _warm_worker():
+    """Pool initializer: pay the import and cache-building costs once."""
+    from brand_assets import BRAND_ASSETS
+    from excel_generator import ExcelGenerator
+    import pdf_generator  # noqa: F401  (compiles STYLES at import)
+
+    BRAND_ASSETS.load()
+    ExcelGenerator()._clone_skeleton()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _quotes(rollup: ProjectRollup) -> List[Dict]:
+    return [screen.quote for screen in rollup.screens]
+
+
+def render_excel(rollup: ProjectRollup) -> bytes:
+    from excel_generator import ExcelGenerator
+
+    return ExcelGenerator().render_expert_estimator(_quotes(rollup), rollup=rollup)
+
+
+def render_pdf(client_name: str, rollup: ProjectRollup) -> bytes:
+    from pdf_generator import PDFGenerator
+
+    return PDFGenerator().render_proposal(_quotes(rollup), client_name, rollup=rollup)
+
+
+class RenderService:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.workers = (
+            workers if workers is not None else int(os.getenv("RENDER_WORKERS", "2"))
+        )
+        self.max_queue = (
+            max_queue
+            if max_queue is not None
+            else int(os.getenv("RENDER_QUEUE_DEPTH", "16"))
+        )
+        self.timeout = (
+            timeout
+            if timeout is not None
+            else float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def start(self):
+        """Spawn and warm the worker processes (idempotent)."""
+        with self._lock:
+            if self._pool is None and self.workers > 0:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_warm_worker
+                )
+                # Force every worker up now rather than on the first request
+                for future in [self._pool.submit(_ping) for _ in range(self.workers)]:
+                    future.result()
+        return self
+
+    def worker_pool(self) -> Optional[ProcessPoolExecutor]:
+        """The warm worker pool, started on first use, so other CPU-heavy work
+        (cpu_executor.py) shares it; None when rendering in-process."""
+        if self._pool is None:
+            self.start()
+        return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.max_queue:
+                raise RenderQueueFull(
+                    f"{self._in_flight} renders in flight (limit {self.max_queue})"
+                )
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _release_when_done(self, futures):
+        """Hold the slot until every job has finished, even after a timeout."""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._release()
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def _submit(self, client_name, rollup):
+        try:
+            if self._pool is None:
+                self.start()
+            if self._pool is None:
+                return None
+            futures = (
+                self._pool.submit(render_excel, rollup),
+                self._pool.submit(render_pdf, client_name, rollup),
+            )
+        except Exception:
+            self._release()
+            raise
+        self._release_when_done(futures)
+        return futures
+
+    async def render(
+        self,
+        project_data: List[Dict],
+        client_name: str,
+        rollup: Optional[ProjectRollup] = None,
+    ) -> Tuple[bytes, bytes]:
+        """Render (excel_bytes, pdf_bytes) without blocking the event loop."""
+        if rollup is None:
+            rollup = ProjectRollup.from_project_data(project_data)
+        self._acquire()
+        futures = self._submit(client_name, rollup)
+        if futures is None:
+            try:
+                excel, pdf = await asyncio.gather(
+                    asyncio.to_thread(render_excel, rollup),
+                    asyncio.to_thread(render_pdf, client_name, rollup),
+                )
+                return excel, pdf
+            finally:
+                self._release()
+        try:
+            excel, pdf = await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(f) for f in futures)),
+                timeout=self.timeout,
+            )
+        except asyncio.TimeoutError:
+            for future in futures:
+                future.cancel()
+            raise RenderTimeout(f"render exceeded {self.timeout}s")
+        return excel, pdf
+
+    def render_sync(
+        self,
+        project_data: List[Dict],
+        client_name: str,
+        rollup: Optional[ProjectRollup] = None,
+    ) -> Tuple[bytes, bytes]:
+        """Blocking variant of render() for synchronous callers."""
+        if rollup is None:
+            rollup = ProjectRollup.from_project_data(project_data)
+        self._acquire()
+        futures = self._submit(client_name, rollup)
+        if futures is None:
+            try:
+                return render_excel(rollup), render_pdf(client_name, rollup)
+            finally:
+                self._release()
+        deadline = time.monotonic() + self.timeout
+        try:
+            return tuple(
+                f.result(timeout=max(0, deadline - time.monotonic())) for f in futures
+            )
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise RenderTimeout(f"render exceeded {self.timeout}s")
+
+
+# Process-wide service used by the API
+RENDER_SERVICE = RenderService()
@@ -9,23 +9,39 @@ if not os.environ.get("DATABASE_URL"):
     if os.path.exists(parent_env):
         load_dotenv(parent_env)
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import json
 import datetime
-from calculator import CPQCalculator, CPQInput
 from excel_generator import ExcelGenerator
 from pdf_generator import PDFGenerator
+from address_search import ADDRESS_SEARCH
+from venue_index import VENUE_INDEX, project_entry
+from message_log import MESSAGE_LOG
+from project_search import SEARCH_INDEX
+from artifacts import ARTIFACTS, EXCEL_MEDIA_TYPE, PDF_MEDIA_TYPE
+from proposal_pipeline import PipelineContext, default_pipeline
+from fast_json import FastJSONResponse, GZIP_MIN_BYTES
+from fieldsets import parse_fields, select
+from singleflight import SingleFlight, IdempotencyConflict, request_fingerprint
+from brand_assets import BRAND_ASSETS
+from render_service import RENDER_SERVICE, RenderQueueFull, RenderTimeout
+from cpu_executor import CPU_EXECUTOR
+from api_routes import router as wizard_router
+from proposal_jobs import ProposalJobQueue, JobQueueFull, job_progress, STAGES
 from database import (
     init_db,
     get_db,
     Project,
+    ProjectRevision,
     Message,
     SharedProposal,
+    ProposalJob,
     SessionLocal,
     Organization,
     User,
@@ -33,11 +49,15 @@ from database import (
     create_invite,
     consume_invite,
 )
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from pagination import InvalidCursor, decode_cursor, encode_cursor
+from json_patch import JsonPatchError, apply_patch, make_patch
+from project_history import VersionConflict, commit_state, state_at, revisions as project_revisions
 import secrets
 import string
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 
 @app.exception_handler(RequestValidationError)
@@ -86,7 +106,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Idempotent-Replay", "X-Next-Cursor"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
+
+# Wizard calculate/generate endpoints (api_routes.py)
+app.include_router(wizard_router)
 
 # Initialize database
 init_db()
@@ -169,108 +194,122 @@ async def search_places(query: str):
 @app.post("/api/search-address")
 async def search_address(req: SearchRequest):
     """
-    Perform a high-precision address search using Serper.dev (web search)
-    with a robust fallback to Nominatim.
+    Search the local venue index first (bundled venues and stored project
+    addresses, see venue_index.py) and answer from it alone when the query
+    names a venue. Otherwise perform a high-precision address search using
+    Serper.dev (web search) with a robust fallback to Nominatim, listing any
+    weaker local hits ahead of its results. Remote results are cached and
+    identical in-flight queries coalesced (see address_search.py).
     """
-    import httpx
-    import os
+    local, strong = VENUE_INDEX.match(req.query)
+    if strong:
+        return {"results": local}
+    seen = {(hit["title"], hit["address"]) for hit in local}
+    remote = [
+        hit
+        for hit in await ADDRESS_SEARCH.search(req.query)
+        if (hit["title"], hit["address"]) not in seen
+    ]
+    return {"results": local + remote}
+
+
+@app.get("/api/search-address/stats")
+def search_address_stats():
+    """Per-provider latency, failure and circuit-breaker state."""
+    return ADDRESS_SEARCH.stats()
+
+
+# /api/projects page sizes
+DEFAULT_PROJECT_PAGE = 50
+MAX_PROJECT_PAGE = 200
+
+# Summary columns for project lists; `state` is left out on purpose
+PROJECT_SUMMARY_COLUMNS = (
+    Project.id,
+    Project.client_name,
+    Project.project_name,
+    Project.organization_id,
+    Project.final_price,
+    Project.created_at,
+    Project.updated_at,
+)
 
-    query = req.query.strip()
-    if not query:
-        return {"results": []}
 
-    results = []
+@app.get("/api/projects")
+def list_projects(
+    response: Response,
+    limit: int = DEFAULT_PROJECT_PAGE,
+    cursor: Optional[str] = None,
+    org_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """List project summaries, most recently updated first.
+
+    Keyset-paginated on (updated_at, id): when more projects follow, the
+    X-Next-Cursor header holds the ``cursor`` for the next page. Summaries
+    never include ``state``; fetch it from /api/projects/{id}.
+    """
+    limit = max(1, min(limit, MAX_PROJECT_PAGE))
+    query = db.query(*PROJECT_SUMMARY_COLUMNS)
+    if org_id is not None:
+        query = query.filter(Project.organization_id == org_id)
+    if cursor:
+        try:
+            updated_at, last_id = decode_cursor(cursor)
+        except (InvalidCursor, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            or_(
+                Project.updated_at < updated_at,
+                and_(Project.updated_at == updated_at, Project.id < last_id),
+            )
+        )
+    rows = (
+        query.order_by(Project.updated_at.desc(), Project.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            rows[-1].updated_at, rows[-1].id
+        )
+    return [dict(row._mapping) for row in rows]
 
-    # 1) Try Serper.dev (Google-powered) first
-    try:
-        serper_key = os.getenv("SERPER_API_KEY")
-        if serper_key:
-            async with httpx.AsyncClient() as client:
-                r = await client.post(
-                    "https://google.serper.dev/places",
-                    headers={
-                        "X-API-KEY": serper_key,
-                        "Content-Type": "application/json",
-                    },
-                    json={"q": query, "num": 5},
-                    timeout=5.0,
-                )
-                r.raise_for_status()
-                data = r.json()
-
-                for place in data.get("places", []):
-                    # Use displayName if title missing
-                    title = place.get("title") or place.get("displayName", "Unknown")
-                    address = place.get("address", "")
-                    lat = place.get("latitude")
-                    lng = place.get("longitude")
-
-                    if lat is not None and lng is not None:
-                        results.append(
-                            {
-                                "title": title,
-                                "address": address,
-                                "lat": float(lat),
-                                "lng": float(lng),
-                            }
-                        )
-    except Exception as e:
-        print(f"Serper search error: {e}")
 
-    # 2) Fallback to Nominatim (OpenStreetMap) if Serper fails or returns empty
-    if not results:
-        try:
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
-                    "https://nominatim.openstreetmap.org/search",
-                    params={
-                        "q": query,
-                        "format": "json",
-                        "addressdetails": 1,
-                        "limit": 5,
-                    },
-                    headers={"User-Agent": "ANC-Proposal-System/1.0"},
-                    timeout=5.0,
-                )
-                r.raise_for_status()
-                data = r.json()
-
-                for place in data:
-                    # Build a readable address
-                    address_parts = []
-                    addr = place.get("address", {})
-                    if addr.get("name"):
-                        address_parts.append(addr["name"])
-                    if addr.get("road"):
-                        address_parts.append(addr["road"])
-                    if addr.get("city"):
-                        address_parts.append(addr["city"])
-                    if addr.get("state"):
-                        address_parts.append(addr["state"])
-                    if addr.get("postcode"):
-                        address_parts.append(addr["postcode"])
-
-                    results.append(
-                        {
-                            "title": place.get("display_name", "")
-                            .split(",")[0]
-                            .strip(),
-                            "address": ", ".join(address_parts),
-                            "lat": float(place.get("lat", 0)),
-                            "lng": float(place.get("lon", 0)),
-                        }
-                    )
-        except Exception as e:
-            print(f"Nominatim error: {e}")
-
-    return {"results": results[:5]}
+# /api/search page sizes
+DEFAULT_SEARCH_PAGE = 20
+MAX_SEARCH_PAGE = 100
 
 
-@app.get("/api/projects")
-def list_projects(db: Session = Depends(get_db)):
-    """List all projects"""
-    projects = db.query(Project).all()
-    return projects
+@app.get("/api/search")
+def search_projects(
+    q: str,
+    response: Response,
+    limit: int = DEFAULT_SEARCH_PAGE,
+    cursor: Optional[str] = None,
+    org_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """Full-text search over project names, key state fields and chat history.
+
+    Hits are ranked best first; ``kind`` is "project" or "message". When
+    more hits follow, the X-Next-Cursor header holds the next page's
+    ``cursor``.
+    """
+    limit = max(1, min(limit, MAX_SEARCH_PAGE))
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except (InvalidCursor, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if len(after) != 2:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    hits, next_after = SEARCH_INDEX.search(db, q, org_id=org_id, limit=limit, after=after)
+    if next_after:
+        response.headers["X-Next-Cursor"] = encode_cursor(*next_after)
+    return hits
 
 
 # --- Organization & Membership Endpoints ---
@@ -360,22 +399,40 @@ def create_project(client_name: str = "New Project", db: Session = Depends(get_d
     db.add(new_project)
     db.commit()
     db.refresh(new_project)
+    SEARCH_INDEX.index_project(db, new_project.id, new_project.client_name, None, {})
+    db.commit()
     return {"id": new_project.id, "client_name": new_project.client_name}
 
 
 @app.get("/api/projects/{project_id}")
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    """Get project state"""
+def get_project(project_id: int, version: Optional[int] = None, db: Session = Depends(get_db)):
+    """Get project state, or its state as of an earlier ``version``"""
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    current = project.version or 0
+    if version is not None and version != current:
+        if not 0 <= version < current:
+            raise HTTPException(status_code=404, detail="Version not found")
+        state = state_at(db, project_id, version)
+    else:
+        state, version = project.state, current
     return {
         "id": project.id,
         "client_name": project.client_name,
-        "state": project.state,
+        "state": state,
+        "version": version,
     }
 
 
+@app.get("/api/projects/{project_id}/revisions")
+def list_project_revisions(project_id: int, limit: int = 50, db: Session = Depends(get_db)):
+    """Recent state versions, newest first"""
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project_revisions(db, project_id, limit=max(1, min(limit, 500)))
+
+
 @app.delete("/api/projects/{project_id}")
 def delete_project(project_id: int, db: Session = Depends(get_db)):
     """Delete a project and its associated data"""
@@ -383,47 +440,218 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    MESSAGE_LOG.forget(project_id)
+    SEARCH_INDEX.remove_project(db, project_id)
+    for model in (ProjectRevision, Message):
+        db.query(model).filter(model.project_id == project_id).delete(
+            synchronize_session=False
+        )
     db.delete(project)
     db.commit()
+    if VENUE_INDEX.remove(f"project:{project_id}"):
+        VENUE_INDEX.schedule_save()
     return {"status": "success", "message": f"Project {project_id} deleted"}
 
 
+def state_final_price(state: Dict) -> Optional[float]:
+    """The quoted total a wizard state carries, if any."""
+    for key in ("finalPrice", "final_price", "total_sell_price"):
+        value = state.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return None
+
+
+def commit_project_state(
+    db: Session,
+    project: Project,
+    state: Dict,
+    patch: List[Dict],
+    base_version: Optional[int] = None,
+) -> Dict:
+    """Save a new state version, keeping the summary columns and the local
+    venue index in step with it."""
+    columns = {}
+    if "clientName" in state:
+        columns["client_name"] = state["clientName"]
+    final_price = state_final_price(state)
+    if final_price is not None:
+        columns["final_price"] = final_price
+    try:
+        version = commit_state(db, project, state, patch, base_version, **columns)
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Project state has changed", "version": e.current},
+        )
+
+    client_name = columns.get("client_name", project.client_name)
+    SEARCH_INDEX.index_project(db, project.id, client_name, project.project_name, state)
+    db.commit()
+
+    # Make the project's address searchable locally
+    entry = project_entry(project.id, client_name, state)
+    if entry and VENUE_INDEX.add(entry):
+        VENUE_INDEX.schedule_save()
+    return {"status": "saved", "version": version}
+
+
+def if_match_version(if_match: Optional[str]) -> int:
+    """The project version an If-Match header names ("5", W/"5" or 5)."""
+    if if_match is None:
+        raise HTTPException(
+            status_code=428,
+            detail="If-Match with the project version being replaced is required",
+        )
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match: {if_match}")
+
+
 @app.post("/api/projects/{project_id}/save")
 @app.put("/api/projects/{project_id}/state")
-def save_project_state(project_id: int, state: Dict, db: Session = Depends(get_db)):
-    """Save project state"""
+def save_project_state(
+    project_id: int,
+    state: Dict,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """Replace the full project state.
+
+    If-Match must carry the version the new state was based on; 409 (with
+    the current version) when the project has moved on since.
+    """
+    base_version = if_match_version(if_match)
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    if base_version != (project.version or 0):
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Project state has changed", "version": project.version or 0},
+        )
+    patch = make_patch(project.state or {}, state)
+    if not patch:
+        return {"status": "saved", "version": base_version}
+    return commit_project_state(db, project, state, patch, base_version=base_version)
 
-    # Store state as JSON string
-    project.state = state
-    if "clientName" in state:
-        project.client_name = state["clientName"]
 
-    db.commit()
-    return {"status": "saved"}
+class StatePatch(BaseModel):
+    version: int  # the version the patch was made against
+    patch: List[Dict[str, Any]]
 
 
-@app.post("/api/projects/{project_id}/message")
-def save_message(project_id: int, msg: ChatMessage, db: Session = Depends(get_db)):
-    """Log a chat message to history"""
+@app.patch("/api/projects/{project_id}/state")
+def patch_project_state(project_id: int, req: StatePatch, db: Session = Depends(get_db)):
+    """Apply an RFC 6902 JSON Patch to the project state.
+
+    409 (with the current version) when the project is no longer at
+    ``req.version``; 422 when the patch does not apply.
+    """
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    if req.version != (project.version or 0):
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Project state has changed", "version": project.version or 0},
+        )
+    try:
+        state = apply_patch(project.state or {}, req.patch)
+    except JsonPatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=422, detail="Project state must be an object")
+    if not req.patch:
+        return {"status": "saved", "version": req.version}
+    return commit_project_state(db, project, state, req.patch, base_version=req.version)
 
-    new_msg = Message(
-        project_id=project_id,
-        role=msg.role,
-        content=msg.content,
-        thinking=msg.thinking,
-        timestamp=datetime.datetime.utcnow(),
-    )
-    db.add(new_msg)
-    db.commit()
+
+@app.post("/api/projects/{project_id}/message")
+def save_message(project_id: int, msg: ChatMessage, db: Session = Depends(get_db)):
+    """Log a chat message to history (written behind, in batches)"""
+    if not MESSAGE_LOG.project_exists(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    MESSAGE_LOG.append(project_id, [msg.dict()])
     return {"status": "logged"}
 
 
+@app.post("/api/projects/{project_id}/messages")
+def save_messages(project_id: int, msgs: List[ChatMessage], db: Session = Depends(get_db)):
+    """Log several chat messages to history in one call"""
+    if not MESSAGE_LOG.project_exists(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    count = MESSAGE_LOG.append(project_id, [m.dict() for m in msgs])
+    return {"status": "logged", "count": count}
+
+
+# Message history page sizes
+DEFAULT_MESSAGE_PAGE = 50
+MAX_MESSAGE_PAGE = 200
+
+
+@app.get("/api/projects/{project_id}/messages")
+def list_messages(
+    project_id: int,
+    response: Response,
+    limit: int = DEFAULT_MESSAGE_PAGE,
+    cursor: Optional[str] = None,
+    thinking: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Chat history, a page at a time, oldest first within the page.
+
+    The first page is the latest ``limit`` messages; when older ones exist
+    the X-Next-Cursor header holds the ``cursor`` for the page before it.
+    Reasoning transcripts are left out unless ``thinking=true``;
+    ``has_thinking`` says whether one exists.
+    """
+    if not MESSAGE_LOG.project_exists(db, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    MESSAGE_LOG.flush(project_id)
+
+    limit = max(1, min(limit, MAX_MESSAGE_PAGE))
+    columns = [
+        Message.id,
+        Message.role,
+        Message.content,
+        Message.timestamp,
+        Message.thinking.isnot(None).label("has_thinking"),
+    ]
+    if thinking:
+        columns.append(Message.thinking)
+    query = db.query(*columns).filter(Message.project_id == project_id)
+    if cursor:
+        try:
+            (before_id,) = decode_cursor(cursor)
+        except (InvalidCursor, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(Message.id < before_id)
+    rows = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    return [dict(row._mapping) for row in reversed(rows)]
+
+
+@app.get("/api/projects/{project_id}/messages/{message_id}/thinking")
+def get_message_thinking(project_id: int, message_id: int, db: Session = Depends(get_db)):
+    """The reasoning transcript of one message"""
+    MESSAGE_LOG.flush(project_id)
+    row = (
+        db.query(Message.thinking)
+        .filter(Message.id == message_id, Message.project_id == project_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return {"id": message_id, "thinking": row.thinking}
+
+
 @app.post("/api/share")
 def create_share(req: ShareRequest, db: Session = Depends(get_db)):
     """Create a persistent shared proposal link"""
@@ -468,80 +696,142 @@ def get_share(share_id: str, db: Session = Depends(get_db)):
     }
 
 
-@app.post("/api/generate")
-async def generate_proposal(req: ProjectRequest, db: Session = Depends(get_db)):
-    try:
-        # Use the existing working CPQCalculator instead of the missing configurable one
-        calc = CPQCalculator()
-        project_data = []
-
-        for s in req.screens:
-            # Create CPQInput for the working calculator
-            inp = CPQInput(
-                client_name=req.client_name,
-                product_class=s.product_class,
-                pixel_pitch=float(s.pixel_pitch),
-                width_ft=s.width_ft,
-                height_ft=s.height_ft,
-                is_outdoor=s.is_outdoor,
-                shape=s.shape,
-                access=s.access,
-                complexity=s.complexity,
-                target_margin=s.target_margin,
-                structure_condition=s.structure_condition,
-                labor_type=s.labor_type,
-                power_distance=s.power_distance,
-                venue_type=s.venue_type,
-                service_level=req.service_level,
-                timeline=req.timeline,
-                permits=s.permits or req.permits,
-                control_system=s.control_system or req.control_system,
-                bond_required=s.bond_required or req.bond_required,
-                unit_cost=s.unit_cost,
-            )
-
-            # Calculate using the working CPQCalculator
-            result = calc.calculate_quote(inp)
-
-            # Add pixel dimensions for Excel generator
-            pixel_pitch_mm = float(s.pixel_pitch)
-            width_pixels = int((s.width_ft * 304.8) / pixel_pitch_mm)
-            height_pixels = int((s.height_ft * 304.8) / pixel_pitch_mm)
-
-            # Add calculated dimensions to result
-            if "inputs" in result:
-                # result["inputs"] is a dataclass instance in CPQCalculator
-                setattr(result["inputs"], "width_px", width_pixels)
-                setattr(result["inputs"], "height_px", height_pixels)
-                setattr(result["inputs"], "total_sqft", s.width_ft * s.height_ft)
-                setattr(result["inputs"], "indoor", not s.is_outdoor)
-                setattr(result["inputs"], "mounting_type", s.mounting_type)
-
-            project_data.append(result)
-
-        # Generate Files
-        excel_gen = ExcelGenerator()
-        excel_gen.update_expert_estimator(
-            project_data, output_path="anc_internal_estimation.xlsx"
+def render_error(exc: Exception) -> HTTPException:
+    """Map rendering-service refusals onto HTTP errors."""
+    if isinstance(exc, RenderQueueFull):
+        return HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "5"}
         )
+    return HTTPException(status_code=504, detail=str(exc))
 
-        pdf_gen = PDFGenerator()
-        pdf_gen.generate_proposal(
-            project_data, req.client_name, filename="anc_client_proposal.pdf"
-        )
 
-        result = {
-            "status": "success",
-            "message": "Files Generated",
-            "files": ["anc_internal_estimation.xlsx", "anc_client_proposal.pdf"],
-            "data": project_data,
-        }
+# Shared by /api/generate, /api/send-proposal and proposal jobs
+PIPELINE = default_pipeline(render=RENDER_SERVICE.render_sync)
+
+
+# Coalesces duplicate /api/generate calls (retries, double clicks)
+GENERATE_FLIGHTS = SingleFlight()
+
+
+async def run_generate(req: ProjectRequest) -> Dict[str, Any]:
+    # inputs -> pricing -> Excel+PDF rendered side by side -> persist,
+    # all off the event loop
+    ctx = PipelineContext(request=req.dict())
+    try:
+        await CPU_EXECUTOR.run("generate", PIPELINE.run, ctx)
+    except (RenderQueueFull, RenderTimeout) as e:
+        raise render_error(e)
+    artifacts = ctx.artifacts
+
+    return {
+        "status": "success",
+        "message": "Files Generated",
+        "files": [a.filename for a in artifacts.values()],
+        "artifacts": {kind: a.id for kind, a in artifacts.items()},
+        "downloads": {
+            kind: f"/api/download/{kind}?artifact_id={a.id}"
+            for kind, a in artifacts.items()
+        },
+        "timings": ctx.timings,
+        "data": ctx.project_data,
+    }
+
 
-        return result
+@app.post("/api/generate")
+async def generate_proposal(
+    req: ProjectRequest,
+    fields: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
+    """Identical requests in flight share one generation; a completed result
+    is replayed for a short while (X-Idempotent-Replay: true).
+
+    ``fields`` (see fieldsets.py) trims each per-screen entry in ``data``,
+    e.g. ``?fields=summary`` when only the files and totals are needed.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    fingerprint = request_fingerprint(req.dict())
+    key = f"key:{idempotency_key}" if idempotency_key else f"body:{fingerprint}"
+    try:
+        result, shared = await GENERATE_FLIGHTS.do(
+            key, fingerprint, lambda: run_generate(req)
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    if selected is not None:
+        result = dict(result, data=[select(r, selected) for r in result["data"]])
+    # Returned as a response so the quote trees skip jsonable_encoder
+    headers = {"X-Idempotent-Replay": "true"} if shared else None
+    return FastJSONResponse(result, headers=headers)
+
+
+# --- Proposal Jobs (submit / poll / download) ---
+
+PROPOSAL_JOBS = ProposalJobQueue(PIPELINE)
+
+
+@app.post("/api/jobs/proposals", status_code=202)
+def submit_proposal_job(req: ProjectRequest):
+    """Queue pricing + rendering; poll GET /api/jobs/{id} for progress."""
+    try:
+        job_id = PROPOSAL_JOBS.submit(req.dict())
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "10"})
+    return {"job_id": job_id, "status": "queued", "status_url": f"/api/jobs/{job_id}"}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_proposal_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(ProposalJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    body = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "stages": STAGES,
+        "progress": job_progress(job),
+        "timings": job.timings or {},
+        "error": job.error,
+        "result": job.result,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == "succeeded":
+        body["downloads"] = {
+            kind: f"/api/jobs/{job.id}/download/{kind}" for kind in ("excel", "pdf")
+        }
+    return body
+
+
+@app.get("/api/jobs/{job_id}/download/{kind}")
+def download_proposal_job(job_id: str, kind: str, db: Session = Depends(get_db)):
+    if kind not in ("excel", "pdf"):
+        raise HTTPException(status_code=404, detail="Unknown artifact")
+    job = db.get(ProposalJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "expired":
+        raise HTTPException(status_code=410, detail="Job files have expired")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    filename = job.result["files"][kind]
+    return Response(
+        content=getattr(job, kind),
+        media_type=EXCEL_MEDIA_TYPE if kind == "excel" else PDF_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @app.post('/api/send-proposal')
@@ -558,44 +848,14 @@ def send_proposal(payload: Dict, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f'Invalid payload: {e}')
 
-    # Call internal generator logic (duplicate of /api/generate behavior)
-    calc = CPQCalculator()
-    project_data = []
-    for s in req.screens:
-        inp = CPQInput(
-            client_name=req.client_name,
-            product_class=s.product_class,
-            pixel_pitch=float(s.pixel_pitch),
-            width_ft=s.width_ft,
-            height_ft=s.height_ft,
-            is_outdoor=s.is_outdoor,
-            shape=s.shape,
-            access=s.access,
-            complexity=s.complexity,
-            target_margin=s.target_margin,
-            structure_condition=s.structure_condition,
-            labor_type=s.labor_type,
-            power_distance=s.power_distance,
-            venue_type=s.venue_type,
-            service_level=req.service_level,
-            timeline=req.timeline,
-            permits=s.permits or req.permits,
-            control_system=s.control_system or req.control_system,
-            bond_required=s.bond_required or req.bond_required,
-            unit_cost=s.unit_cost,
-        )
-        result = calc.calculate_quote(inp)
-        project_data.append(result)
-
-    excel_gen = ExcelGenerator()
-    excel_gen.update_expert_estimator(project_data, output_path='anc_internal_estimation.xlsx')
-    pdf_gen = PDFGenerator()
-    pdf_gen.generate_proposal(project_data, req.client_name, filename='anc_client_proposal.pdf')
-
-    from src.server_email import send_proposal_to_outbox
-    out_path = send_proposal_to_outbox(recipient, ['anc_client_proposal.pdf', 'anc_internal_estimation.xlsx'], metadata={'client': req.client_name})
+    # Same pipeline as /api/generate (this handler already runs in a worker thread)
+    ctx = PipelineContext(request=req.dict(), recipient_email=recipient)
+    try:
+        PIPELINE.run(ctx)
+    except (RenderQueueFull, RenderTimeout) as e:
+        raise render_error(e)
 
-    return {'status': 'sent', 'outbox': out_path}
+    return {'status': 'sent', 'outbox': ctx.outbox, 'timings': ctx.timings}
 
 
 @app.post("/api/upload-master")
@@ -637,26 +897,28 @@ async def upload_master_file(org_id: Optional[int] = None, file: Optional["Uploa
     return {"status": "uploaded", "path": str(safe_name), "report": report}
 
 
+def _artifact_response(kind: str, artifact_id: Optional[str]):
+    # Only ever by id: "the latest file" would be whoever rendered last
+    if not artifact_id:
+        raise HTTPException(status_code=400, detail="artifact_id is required")
+    artifact = ARTIFACTS.get(artifact_id)
+    if artifact is None or artifact.kind != kind:
+        raise HTTPException(status_code=404, detail="File not found")
+    return Response(
+        content=artifact.content,
+        media_type=artifact.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{artifact.filename}"'},
+    )
+
+
 @app.get("/api/download/excel")
-async def download_excel():
-    file_path = "anc_internal_estimation.xlsx"
-    if os.path.exists(file_path):
-        return FileResponse(
-            file_path,
-            filename="ANC_Expert_Estimation.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-    return HTTPException(status_code=404, detail="File not found")
+async def download_excel(artifact_id: Optional[str] = None):
+    return _artifact_response("excel", artifact_id)
 
 
 @app.get("/api/download/pdf")
-async def download_pdf():
-    file_path = "anc_client_proposal.pdf"
-    if os.path.exists(file_path):
-        return FileResponse(
-            file_path, filename="ANC_Proposal.pdf", media_type="application/pdf"
-        )
-    return HTTPException(status_code=404, detail="File not found")
+async def download_pdf(artifact_id: Optional[str] = None):
+    return _artifact_response("pdf", artifact_id)
 
 
 # Add startup and shutdown events
@@ -664,6 +926,37 @@ async def download_pdf():
 async def startup_event():
     init_db()
     print("Database initialized")
+    print(f"Branding assets loaded: {BRAND_ASSETS.load()}")
+    if not VENUE_INDEX.load():
+        db = SessionLocal()
+        try:
+            projects = db.query(Project).all()
+            VENUE_INDEX.build(
+                filter(None, (project_entry(p.id, p.client_name, p.state) for p in projects))
+            ).save()
+        finally:
+            db.close()
+    print(f"Venue index ready: {len(VENUE_INDEX)} entries")
+    db = SessionLocal()
+    try:
+        SEARCH_INDEX.ensure(db)  # creates and back-fills it on first run
+    finally:
+        db.close()
+    RENDER_SERVICE.start()
+    print(f"Render workers ready: {RENDER_SERVICE.workers}")
+    PROPOSAL_JOBS.start()
+    print(f"Proposal job workers ready: {PROPOSAL_JOBS.workers}")
+    MESSAGE_LOG.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    MESSAGE_LOG.stop()
+    PROPOSAL_JOBS.stop()
+    RENDER_SERVICE.shutdown()
+    CPU_EXECUTOR.shutdown()
+    VENUE_INDEX.flush()
+    await ADDRESS_SEARCH.aclose()
 
 
 # Health check endpoint
@@ -7,9 +7,20 @@ def send_proposal_to_outbox(recipient_email: str, files: list, metadata: dict =
     outbox.mkdir(exist_ok=True)
     ts = __import__('datetime').datetime.utcnow().strftime('%Y%m%d%H%M%S')
     name = outbox / f'email_{recipient_email.replace("@","_at_")}_{ts}.json'
+    # files may be paths, or (filename, bytes) pairs rendered in memory;
+    # the latter are written next to the email as its attachments
+    attached = []
+    for item in files:
+        if isinstance(item, (tuple, list)):
+            filename, content = item
+            path = outbox / f'{name.stem}_{filename}'
+            path.write_bytes(content)
+            attached.append(str(path))
+        else:
+            attached.append(item)
     payload = {
         'to': recipient_email,
-        'files': files,
+        'files': attached,
         'metadata': metadata or {},
         'timestamp': ts,
     }
@@ -0,0 +1,101 @@
+"""
+Idempotency keys and singleflight coalescing for expensive endpoints.
+
+The front end retries on timeout and users double-click Generate, which used
+to start several identical multi-second generations. SingleFlight runs one
+computation per key: concurrent callers with the same key await the call
+already in flight, and a completed result is replayed from a short-TTL cache.
+Failures are shared with the callers already waiting but never cached.
+
+Keys are either the client's ``Idempotency-Key`` header or, without one, a
+canonical hash of the request body (request_fingerprint). A key reused with
+a different body raises IdempotencyConflict.
+
+Configuration (environment):
+    IDEMPOTENCY_TTL_SECONDS  how long completed results are replayed (default 60)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused with a different request body."""
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a JSON-able request body (key order does not matter)."""
+    canonical = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Per-key coalescing of async calls with a bounded, expiring LRU cache.
+
+    Not thread-safe: use it from a single event loop.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 256):
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "60"))
+        )
+        self.max_entries = max_entries
+        # key -> (fingerprint, future)
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        # key -> (fingerprint, expires_at, result)
+        self._done: "OrderedDict[str, Tuple[str, float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def _purge(self):
+        now = time.monotonic()
+        for key in [k for k, (_, expires, _) in self._done.items() if expires <= now]:
+            del self._done[key]
+
+    async def do(
+        self, key: str, fingerprint: str, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when the result came
+        from a call already in flight or from the replay cache."""
+        self._purge()
+        if key in self._done:
+            seen, _, result = self._done[key]
+            if seen != fingerprint:
+                raise IdempotencyConflict(f"key {key!r} was used for another request")
+            self._done.move_to_end(key)
+            return result, True
+        if key in self._in_flight:
+            seen, future = self._in_flight[key]
+            if seen != fingerprint:
+                raise IdempotencyConflict(f"key {key!r} is in use by another request")
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; nobody else must
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(result)
+        if self.ttl_seconds > 0:
+            self._done[key] = (fingerprint, time.monotonic() + self.ttl_seconds, result)
+            while len(self._done) > self.max_entries:
+                self._done.popitem(last=False)
+        return result, False
@@ -0,0 +1,291 @@
+"""
+Offline venue / address index for instant local search.
+
+Most address searches are for the same few hundred stadiums, arenas and
+transit hubs, so /api/search-places looks here first and only goes to the
+remote geocoders (address_search.py) when nothing matches locally.
+
+The index holds the bundled venue list (venues.json: title, address,
+lat/lng and aliases such as team names) plus the addresses of stored
+projects. It is built in memory and persisted to VENUE_INDEX_PATH, so a
+restart loads it instead of rescanning:
+
+    prefix   token prefix -> entry ids ("lamb" -> Lambeau Field)
+    trigram  character trigram -> entry ids, for typos ("lambaeu")
+
+A query matches entries where every query token is a prefix of some entry
+token; when none do, entries sharing at least TRIGRAM_MIN_SHARE of the
+query's trigrams are returned instead. match() also reports whether the
+best hit is strong, meaning the whole query is a prefix of its title or of
+an alias. Only a strong hit is trusted to stand in for the geocoders.
+Street addresses ("1 Main St, Boston") share words and trigrams with many
+venues without naming any of them.
+
+Project saves change entries often (the title follows the project name
+as it is typed), so they call schedule_save(), which writes the index at
+most once per VENUE_INDEX_SAVE_MS on a timer thread rather than on the
+request thread.
+
+Configuration (environment):
+    VENUE_INDEX_PATH     persisted index (default venue_index.json)
+    VENUE_INDEX_SAVE_MS  delay before a scheduled save is written (default 2000)
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+BUNDLED_VENUES = os.path.join(os.path.dirname(__file__), "venues.json")
+INDEX_VERSION = 1
+MAX_PREFIX = 12
+TRIGRAM_MIN_SHARE = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower().replace("'", ""))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {' '.join(tokenize(text))} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _terms(entry: Dict) -> Tuple[Set[str], Set[str]]:
+    """The (token prefixes, trigrams) ``entry`` is posted under."""
+    text = " ".join([entry["title"], entry["address"], *entry.get("aliases", [])])
+    prefixes = {
+        token[:n]
+        for token in tokenize(text)
+        for n in range(1, min(len(token), MAX_PREFIX) + 1)
+    }
+    return prefixes, trigrams(text)
+
+
+def _names(entry: Dict) -> List[str]:
+    return [" ".join(tokenize(name)) for name in [entry["title"], *entry.get("aliases", [])]]
+
+
+def project_entry(project_id: int, client_name: Optional[str], state: Dict) -> Optional[Dict]:
+    """Index entry for a stored project, or None when it has no address."""
+    address = (state or {}).get("address")
+    if not address:
+        return None
+    lat = state.get("lat", state.get("latitude"))
+    lng = state.get("lng", state.get("longitude"))
+    return {
+        "key": f"project:{project_id}",
+        "title": state.get("projectName") or client_name or address,
+        "address": address,
+        "lat": float(lat) if lat is not None else None,
+        "lng": float(lng) if lng is not None else None,
+        "aliases": [client_name] if client_name else [],
+        "source": "project",
+    }
+
+
+class VenueIndex:
+    def __init__(self, path: Optional[str] = None, save_delay: Optional[float] = None):
+        self.path = path or os.getenv("VENUE_INDEX_PATH", "venue_index.json")
+        self.save_delay = (
+            save_delay
+            if save_delay is not None
+            else float(os.getenv("VENUE_INDEX_SAVE_MS", "2000")) / 1000
+        )
+        self.entries: List[Optional[Dict]] = []
+        self._by_key: Dict[str, int] = {}
+        self._prefix: Dict[str, Set[int]] = defaultdict(set)
+        self._trigram: Dict[str, Set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._save_timer: Optional[threading.Timer] = None
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def _index(self, entry_id: int, entry: Dict):
+        prefixes, grams = _terms(entry)
+        for prefix in prefixes:
+            self._prefix[prefix].add(entry_id)
+        for gram in grams:
+            self._trigram[gram].add(entry_id)
+
+    def _unindex(self, entry_id: int):
+        # The entry's own terms are derived from the entry, so only the
+        # posting lists it is actually in are touched
+        prefixes, grams = _terms(self.entries[entry_id])
+        for postings, terms in ((self._prefix, prefixes), (self._trigram, grams)):
+            for term in terms:
+                ids = postings.get(term)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del postings[term]
+
+    def add(self, entry: Dict) -> bool:
+        """Insert or replace ``entry`` (by its ``key``); False if unchanged."""
+        with self._lock:
+            entry_id = self._by_key.get(entry["key"])
+            if entry_id is not None:
+                if self.entries[entry_id] == entry:
+                    return False
+                self._unindex(entry_id)
+                self.entries[entry_id] = entry
+            else:
+                entry_id = len(self.entries)
+                self.entries.append(entry)
+                self._by_key[entry["key"]] = entry_id
+            self._index(entry_id, entry)
+            return True
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            entry_id = self._by_key.pop(key, None)
+            if entry_id is None:
+                return False
+            self._unindex(entry_id)
+            self.entries[entry_id] = None  # ids stay stable
+            return True
+
+    def build(self, projects: Iterable[Dict] = ()):
+        """Rebuild from the bundled venues plus ``projects`` entries."""
+        with open(BUNDLED_VENUES) as f:
+            venues = json.load(f)
+        with self._lock:
+            self.entries = []
+            self._by_key = {}
+            self._prefix = defaultdict(set)
+            self._trigram = defaultdict(set)
+        for venue in venues:
+            self.add(dict(venue, key=f"venue:{venue['title']}", source="venue"))
+        for entry in projects:
+            self.add(entry)
+        return self
+
+    def schedule_save(self):
+        """Save within ``save_delay`` seconds, off the calling thread. Calls
+        made while a save is pending are folded into it."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self._scheduled_save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+        atexit.register(self.flush)
+
+    def _scheduled_save(self):
+        with self._save_lock:
+            if self._save_timer is not threading.current_thread():
+                return  # flush() got here first
+            self._save_timer = None
+        atexit.unregister(self.flush)
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Venue index save failed: {e}")
+
+    def flush(self):
+        """Write a pending scheduled save now (e.g. at shutdown)."""
+        with self._save_lock:
+            timer, self._save_timer = self._save_timer, None
+        atexit.unregister(self.flush)
+        if timer is not None:
+            timer.cancel()
+            self.save()
+
+    def save(self):
+        with self._lock:
+            payload = {
+                "version": INDEX_VERSION,
+                "venues_mtime": os.path.getmtime(BUNDLED_VENUES),
+                "entries": self.entries,
+                "prefix": {k: sorted(v) for k, v in self._prefix.items() if v},
+                "trigram": {k: sorted(v) for k, v in self._trigram.items() if v},
+            }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        """Load the persisted index; False when it is missing, from another
+        version, or older than the bundled venue list."""
+        try:
+            with open(self.path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if payload.get("version") != INDEX_VERSION:
+            return False
+        if payload.get("venues_mtime") != os.path.getmtime(BUNDLED_VENUES):
+            return False
+        with self._lock:
+            self.entries = payload["entries"]
+            self._by_key = {
+                e["key"]: i for i, e in enumerate(self.entries) if e is not None
+            }
+            self._prefix = defaultdict(set, {k: set(v) for k, v in payload["prefix"].items()})
+            self._trigram = defaultdict(set, {k: set(v) for k, v in payload["trigram"].items()})
+        return True
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """Best local matches for ``query`` in the /api/search-address shape."""
+        return self.match(query, limit)[0]
+
+    def match(self, query: str, limit: int = 5) -> Tuple[List[Dict], bool]:
+        """(hits, strong): the best local matches for ``query``, and whether
+        the first is a strong match (the query is a prefix of its title or
+        one of its aliases)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return [], False
+        head = " ".join(tokens)
+
+        def strong(i: int) -> bool:
+            return any(name.startswith(head) for name in _names(self.entries[i]))
+
+        with self._lock:
+            ids = None
+            for token in tokens:
+                matches = self._prefix.get(token[:MAX_PREFIX], set())
+                ids = matches if ids is None else ids & matches
+                if not ids:
+                    break
+            if ids:
+                ranked = sorted(
+                    ids,
+                    key=lambda i: (
+                        not strong(i),
+                        self.entries[i]["source"] != "venue",
+                        len(self.entries[i]["title"]),
+                    ),
+                )
+            else:
+                grams = trigrams(query)
+                shared: Dict[int, int] = defaultdict(int)
+                for gram in grams:
+                    for i in self._trigram.get(gram, ()):
+                        shared[i] += 1
+                needed = TRIGRAM_MIN_SHARE * len(grams)
+                ranked = sorted(
+                    (i for i, n in shared.items() if n >= needed),
+                    key=lambda i: -shared[i],
+                )
+            hits = [
+                {
+                    "title": self.entries[i]["title"],
+                    "address": self.entries[i]["address"],
+                    "lat": self.entries[i]["lat"],
+                    "lng": self.entries[i]["lng"],
+                    "source": "local",
+                }
+                for i in ranked[:limit]
+            ]
+            return hits, bool(ids) and strong(ranked[0])
+
+
+# Process-wide index used by the search endpoints
+VENUE_INDEX = VenueIndex()
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+# Modules import their siblings by bare module name (as server.py does)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from calculator import CPQCalculator, CPQInput
+from database import Base, get_db
+
+
+def _project_data(count):
+    calc = CPQCalculator()
+    project_data = []
+    for idx in range(count):
+        inp = CPQInput(
+            client_name='Test',
+            product_class='Ribbon',
+            pixel_pitch=10,
+            width_ft=40 + idx,
+            height_ft=6,
+            is_outdoor=True,
+            shape='Flat',
+            access='Rear',
+            complexity='Standard',
+            target_margin=30.0,
+        )
+        result = calc.calculate_quote(inp)
+        result['inputs'].width_px = int(inp.width_ft * 304.8 / 10)
+        result['inputs'].height_px = int(inp.height_ft * 304.8 / 10)
+        result['inputs'].total_sqft = inp.width_ft * inp.height_ft
+        result['inputs'].indoor = not inp.is_outdoor
+        project_data.append(result)
+    return project_data
+
+
+@pytest.fixture
+def make_project_data():
+    """``make_project_data(n)``: n priced, annotated Ribbon screens."""
+    return _project_data
+
+
+@pytest.fixture
+def db_factory(tmp_path):
+    """Session factory bound to a fresh SQLite database under ``tmp_path``."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def api_client(db_factory):
+    """TestClient whose ``get_db`` sessions come from ``db_factory``."""
+    from server import app
+
+    def override():
+        db = db_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
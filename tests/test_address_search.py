@@ -0,0 +1,136 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from address_search import AddressSearch
+
+
+class _StubProviders(BaseHTTPRequestHandler):
+    """Serper at POST /places, Nominatim at GET /search."""
+
+    hits = []
+    serper_places = []
+
+    def _reply(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        query = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['q']
+        self.hits.append(('serper', query, self.headers.get('X-API-KEY')))
+        time.sleep(0.05)
+        self._reply({'places': self.serper_places})
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        self.hits.append(('nominatim', query, None))
+        if query == 'down':
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._reply([{
+            'display_name': 'Lambeau Field, Green Bay',
+            'lat': '44.5013', 'lon': '-88.0622',
+            'address': {'name': 'Lambeau Field', 'city': 'Green Bay', 'state': 'Wisconsin'},
+        }])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubProviders)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubProviders.hits = []
+    _StubProviders.serper_places = []
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def _search(base, serper_key=None):
+    return AddressSearch(serper_key=serper_key or '', serper_url=f'{base}/places',
+                         nominatim_url=f'{base}/search', ttl_seconds=60)
+
+
+def test_identical_queries_coalesce_and_normalized_repeats_hit_the_cache(stub):
+    search = _search(stub, serper_key='test-key')
+    _StubProviders.serper_places = [
+        {'title': 'Lambeau Field', 'address': '1265 Lombardi Ave', 'latitude': 44.5, 'longitude': -88.06}
+    ]
+
+    async def main():
+        try:
+            burst = await asyncio.gather(*(search.search('Lambeau Field') for _ in range(5)))
+            again = await search.search('  lambeau   FIELD ')
+            return burst, again
+        finally:
+            await search.aclose()
+
+    burst, again = asyncio.run(main())
+    assert _StubProviders.hits == [('serper', 'Lambeau Field', 'test-key')]
+    assert all(r == burst[0] for r in burst)
+    assert again == burst[0]
+    assert again[0]['address'] == '1265 Lombardi Ave'
+
+
+def test_falls_back_to_nominatim_and_does_not_cache_failures(stub):
+    search = _search(stub, serper_key='test-key')
+
+    async def main():
+        try:
+            fallback = await search.search('lambeau')
+            down = [await search.search('down') for _ in range(2)]
+            return fallback, down
+        finally:
+            await search.aclose()
+
+    fallback, down = asyncio.run(main())
+    assert fallback[0]['address'] == 'Lambeau Field, Green Bay, Wisconsin'
+    assert down == [[], []]
+    assert [h[:2] for h in _StubProviders.hits] == [
+        ('serper', 'lambeau'), ('nominatim', 'lambeau'),
+        ('serper', 'down'), ('nominatim', 'down'),
+        ('serper', 'down'), ('nominatim', 'down'),
+    ]
+
+
+def test_each_loop_gets_a_client_and_aclose_closes_them_on_their_own_loop(stub):
+    search = _search(stub)
+
+    async def lookup():
+        await search.search('lambeau')
+        return search.client
+
+    finished = asyncio.run(lookup())  # its loop is closed once run() returns
+
+    worker = asyncio.new_event_loop()
+    thread = threading.Thread(target=worker.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def main():
+            other = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(lookup(), worker))
+            mine = await lookup()
+            assert mine is search.client and mine is not other
+            assert finished not in search._clients.values()
+            await search.aclose()
+            return mine, other
+
+        mine, other = asyncio.run(main())
+        assert mine.is_closed and other.is_closed
+        assert search._clients == {}
+    finally:
+        worker.call_soon_threadsafe(worker.stop)
+        thread.join()
+        worker.close()
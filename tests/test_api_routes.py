@@ -0,0 +1,85 @@
+import json
+
+from fastapi.testclient import TestClient
+
+CONFIG = {'client_name': 'Test Co', 'product_class': 'Ribbon', 'pixel_pitch': 10,
+          'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+
+
+def test_served_app_streams_calculate_batch_lines_in_order():
+    from server import app
+
+    client = TestClient(app)
+    r = client.post('/api/calculate/batch', json=[CONFIG, {'pixel_pitch': 'wide'}, dict(CONFIG, width_ft=20)])
+
+    assert r.status_code == 200
+    assert r.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [(l['index'], l['success']) for l in lines] == [(0, True), (1, False), (2, True)]
+    assert lines[1]['error'].startswith('Invalid configuration')
+    assert lines[0]['summary']['final_sell_price'] > lines[2]['summary']['final_sell_price']
+
+    assert client.post('/api/calculate/batch', json=[CONFIG] * 501).status_code == 413
+
+
+def test_generate_excel_writes_the_estimator(tmp_path, monkeypatch):
+    from server import app
+
+    monkeypatch.chdir(tmp_path)
+    client = TestClient(app)
+
+    r = client.post('/api/generate-excel', json={'config': CONFIG})
+    assert r.status_code == 200, r.text
+    assert (tmp_path / r.json()['filename']).read_bytes().startswith(b'PK')
+
+    priced = client.post('/api/calculate', json={'config': CONFIG}).json()['calculation_result']
+    r = client.post('/api/generate-excel', json={'config': CONFIG, 'calculation_result': priced})
+    assert r.status_code == 200, r.text
+    assert r.json()['sheets'] == len(priced['cost_breakdown'])
+
+
+def test_calculate_fields_trim_single_and_batch_results():
+    from server import app
+
+    client = TestClient(app)
+    full = client.post('/api/calculate', json={'config': CONFIG}).json()
+    trimmed = client.post('/api/calculate', params={'fields': 'summary'}, json={'config': CONFIG}).json()
+
+    assert set(trimmed) == {'success', 'calculation_timestamp', 'calculation_result'}
+    assert trimmed['calculation_result'] == {'summary': full['summary']}
+    assert client.post('/api/calculate', params={'fields': 'everything'},
+                       json={'config': CONFIG}).status_code == 400
+
+    r = client.post('/api/calculate/batch', params={'fields': 'breakdown'}, json=[CONFIG])
+    line = json.loads(r.text)
+    assert set(line['calculation_result']) == {'summary', 'pricing', 'cost_breakdown'}
+    assert client.post('/api/calculate/batch', params={'fields': 'nope'}, json=[CONFIG]).status_code == 400
+
+
+def test_calculate_is_orjson_encoded_and_gzipped_on_both_apps():
+    import api_routes
+    from server import app
+
+    for served in (app, api_routes.app):
+        r = TestClient(served).post('/api/calculate', json={'config': CONFIG},
+                                    headers={'Accept-Encoding': 'gzip'})
+        assert r.status_code == 200
+        assert r.headers['content-encoding'] == 'gzip'
+        # CPQInput is a dataclass: orjson encodes it without jsonable_encoder
+        assert r.json()['calculation_result']['inputs']['width_ft'] == 40
+
+
+def test_generate_pdf_writes_the_proposal(tmp_path, monkeypatch):
+    from server import app
+
+    monkeypatch.chdir(tmp_path)
+    client = TestClient(app)
+
+    r = client.post('/api/generate-pdf', json={'config': CONFIG})
+    assert r.status_code == 200, r.text
+    assert (tmp_path / r.json()['filename']).read_bytes().startswith(b'%PDF')
+
+    priced = client.post('/api/calculate', json={'config': CONFIG}).json()['calculation_result']
+    r = client.post('/api/generate-pdf', json={'config': CONFIG, 'calculation_result': priced})
+    assert r.status_code == 200, r.text
+    assert (tmp_path / r.json()['filename']).read_bytes().startswith(b'%PDF')
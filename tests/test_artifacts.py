@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from artifacts import ARTIFACTS, ArtifactStore
+from server import app
+
+client = TestClient(app)
+
+
+def test_artifact_store_evicts_oldest_and_expired():
+    store = ArtifactStore(ttl_seconds=3600, max_entries=2)
+    first = store.put('pdf', 'a.pdf', 'application/pdf', b'1')
+    second = store.put('pdf', 'b.pdf', 'application/pdf', b'2')
+    third = store.put('pdf', 'c.pdf', 'application/pdf', b'3')
+
+    assert store.get(first.id) is None
+    assert store.get(second.id).content == b'2'
+    assert store.get(third.id).content == b'3'
+
+    store.ttl_seconds = 0
+    assert store.get(third.id) is None
+    assert len(store) == 0
+
+
+def test_downloads_serve_artifacts_by_id():
+    pdf = ARTIFACTS.put('pdf', 'ANC_Proposal.pdf', 'application/pdf', b'%PDF-first')
+    ARTIFACTS.put('pdf', 'ANC_Proposal.pdf', 'application/pdf', b'%PDF-second')
+
+    r = client.get(f'/api/download/pdf?artifact_id={pdf.id}')
+    assert r.status_code == 200
+    assert r.content == b'%PDF-first'
+    assert 'ANC_Proposal.pdf' in r.headers['content-disposition']
+
+    # Never "the newest file": that would be another user's
+    assert client.get('/api/download/pdf').status_code == 400
+
+    # ids are typed: a PDF id is not served from the Excel endpoint
+    assert client.get(f'/api/download/excel?artifact_id={pdf.id}').status_code == 404
+
+
+def test_generate_serves_files_from_memory():
+    payload = {
+        'client_name': 'Test Co',
+        'screens': [
+            {'product_class': 'Ribbon', 'pixel_pitch': '10', 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+        ],
+    }
+    r = client.post('/api/generate', json=payload)
+    assert r.status_code == 200
+    downloads = r.json()['downloads']
+
+    assert client.get(downloads['pdf']).content.startswith(b'%PDF')
+    assert client.get(downloads['excel']).content.startswith(b'PK')
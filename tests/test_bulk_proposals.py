@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from bulk_proposals import read_projects, run_bulk
+
+
+def test_bulk_run_writes_unique_artifacts_and_manifest(tmp_path):
+    screen = {'product_class': 'Ribbon', 'pixel_pitch': 10, 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+    source = tmp_path / 'projects.jsonl'
+    source.write_text(
+        '\n'.join(
+            json.dumps(p)
+            for p in [
+                {'client_name': 'Arena One', 'screens': [screen, screen]},
+                {'client_name': 'Arena One', 'screens': [screen]},
+                {'client_name': 'Broken', 'screens': [{'product_class': 'Ribbon'}]},
+            ]
+        )
+    )
+    out = tmp_path / 'out'
+
+    manifest = run_bulk(str(source), str(out), workers=2)
+
+    assert [p['status'] for p in manifest['projects']] == ['ok', 'ok', 'error']
+    files = [p['files'] for p in manifest['projects'][:2]]
+    assert files[0] != files[1]
+    for entry in files:
+        assert (out / entry['excel']).read_bytes().startswith(b'PK')
+        assert (out / entry['pdf']).read_bytes().startswith(b'%PDF')
+    assert set(manifest['projects'][0]['timings']) == {'price_s', 'excel_s', 'pdf_s'}
+    assert json.loads((out / 'manifest.json').read_text())['succeeded'] == 2
+
+
+def test_csv_rows_are_grouped_into_projects(tmp_path):
+    source = tmp_path / 'projects.csv'
+    source.write_text(
+        'project,client_name,product_class,pixel_pitch,width_ft,height_ft,is_outdoor\n'
+        'p1,Arena,Ribbon,10,40,6,true\n'
+        'p1,Arena,Scoreboard,6,20,10,false\n'
+        'p2,Stadium,Ribbon,10,30,4,yes\n'
+    )
+    projects = read_projects(str(source))
+    assert [p['client_name'] for p in projects] == ['Arena', 'Stadium']
+    assert len(projects[0]['screens']) == 2
+    assert projects[0]['screens'][1]['is_outdoor'] is False
+    assert projects[1]['screens'][0]['width_ft'] == 30.0
+
+
+def test_a_project_that_kills_its_worker_fails_alone(tmp_path, monkeypatch):
+    import os
+
+    import bulk_proposals
+
+    real_render_pdf = bulk_proposals.render_pdf
+
+    def render_pdf(client_name, rollup):
+        if client_name == 'Crash':
+            os._exit(1)
+        return real_render_pdf(client_name, rollup)
+
+    # Pool workers are forked after the patch, so they inherit it
+    monkeypatch.setattr(bulk_proposals, 'render_pdf', render_pdf)
+    screen = {'product_class': 'Ribbon', 'pixel_pitch': 10, 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+    source = tmp_path / 'projects.jsonl'
+    source.write_text('\n'.join(
+        json.dumps({'client_name': name, 'screens': [screen]})
+        for name in ['One', 'Crash', 'Three', 'Four', 'Five']
+    ))
+
+    manifest = run_bulk(str(source), str(tmp_path / 'out'), workers=2, max_pending=2)
+
+    assert [p['status'] for p in manifest['projects']] == ['ok', 'error', 'ok', 'ok', 'ok']
+    assert manifest['projects'][1]['error'].startswith('render failed')
+    assert all('project_data' not in p for p in manifest['projects'])
+
+
+def test_unparseable_lines_and_rows_fail_their_project_only(tmp_path):
+    screen = {'product_class': 'Ribbon', 'pixel_pitch': 10, 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+    jsonl = tmp_path / 'projects.jsonl'
+    jsonl.write_text('\n'.join([
+        json.dumps({'client_name': 'Good', 'screens': [screen]}),
+        '{"client_name": "Truncated", "screens": [',
+        '[1, 2]',
+    ]))
+    manifest = run_bulk(str(jsonl), str(tmp_path / 'out'), workers=0)
+    assert [p['status'] for p in manifest['projects']] == ['ok', 'error', 'error']
+    assert manifest['projects'][1]['error'].startswith('parse failed: line 2:')
+    assert manifest['projects'][2]['error'] == 'parse failed: line 3: expected a JSON object'
+
+    csv_file = tmp_path / 'projects.csv'
+    csv_file.write_text(
+        'project,client_name,product_class,pixel_pitch,width_ft,height_ft,is_outdoor\n'
+        'p1,Arena,Ribbon,10,40,6,true\n'
+        'p1,Arena,Ribbon,10,forty,6,true\n'
+        'p2,Stadium,Ribbon,10,30,4,yes\n'
+        ',,Ribbon,10,30,4,yes\n'
+    )
+    manifest = run_bulk(str(csv_file), str(tmp_path / 'out_csv'), workers=0)
+    assert [(p['client_name'], p['status']) for p in manifest['projects']] == [
+        ('Arena', 'error'), ('Stadium', 'ok'), ('', 'error'),
+    ]
+    assert manifest['projects'][0]['error'] == "parse failed: line 3: width_ft is not a number: 'forty'"
+    assert manifest['projects'][2]['error'] == 'parse failed: line 5: no project or client_name'
+
+
+def test_csv_without_a_grouping_column_is_rejected(tmp_path):
+    source = tmp_path / 'projects.csv'
+    source.write_text('product_class,pixel_pitch,width_ft,height_ft\nRibbon,10,40,6\n')
+    with pytest.raises(ValueError, match='project or client_name'):
+        read_projects(str(source))
+    with pytest.raises(ValueError):
+        run_bulk(str(source), str(tmp_path / 'out'), workers=0)
+    assert not (tmp_path / 'out').exists()
@@ -42,3 +42,19 @@ def test_timeline_multiplier():
     assert timeline_result['multiplier'] == 1.2
     assert timeline_result['surcharge'] == round(10000 * 0.2)
 
+
+
+def test_batch_repeats_do_not_share_nested_results():
+    calc = CPQCalculator()
+
+    def screen():
+        return CPQInput(client_name='Test', product_class='Ribbon', pixel_pitch=10, width_ft=40,
+                        height_ft=6, is_outdoor=True, shape='Flat', access='Rear', complexity='Standard')
+
+    inputs = [screen(), screen()]
+    first, repeat = calc.calculate_batch(inputs)
+
+    assert repeat == dict(first, inputs=inputs[1])
+    assert first['inputs'] is inputs[0] and repeat['inputs'] is inputs[1]
+    repeat['summary']['final_sell_price'] = 0
+    assert first['summary']['final_sell_price'] != 0
@@ -0,0 +1,53 @@
+import asyncio
+import math
+import time
+
+import pytest
+
+from cpu_executor import CPUExecutor
+from render_service import RenderService
+
+
+def test_route_kinds_come_from_defaults_env_and_arguments(monkeypatch):
+    monkeypatch.setenv('CPU_EXECUTOR_ROUTES', 'calculate=inline, generate_pdf=thread')
+    executor = CPUExecutor(route_kinds={'generate_excel': 'thread'})
+    assert executor.kind_for('calculate') == 'inline'
+    assert executor.kind_for('generate_pdf') == 'thread'
+    assert executor.kind_for('generate_excel') == 'thread'
+    assert executor.kind_for('unknown') == 'thread'
+
+    monkeypatch.setenv('CPU_EXECUTOR_ROUTES', 'calculate=gpu')
+    with pytest.raises(ValueError):
+        CPUExecutor()
+
+
+def test_blocking_work_does_not_stall_the_event_loop():
+    render_service = RenderService(workers=1)
+    executor = CPUExecutor(route_kinds={'slow': 'thread', 'render': 'process'}, render_service=render_service)
+
+    async def scenario():
+        slow = asyncio.ensure_future(executor.run('slow', time.sleep, 0.3))
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        tick = time.perf_counter() - started
+        await slow
+        return tick, await executor.run('render', math.factorial, 10)
+
+    try:
+        tick, value = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+        render_service.shutdown()
+    assert tick < 0.2
+    assert value == 3628800
+
+
+def test_process_work_shares_the_render_service_pool():
+    render_service = RenderService(workers=1).start()
+    try:
+        assert CPUExecutor(render_service=render_service)._pool('process') is render_service._pool
+        # Rendering in-process: process work runs on threads instead
+        executor = CPUExecutor(render_service=RenderService(workers=0))
+        assert executor._pool('process') is executor._pool('thread')
+    finally:
+        render_service.shutdown()
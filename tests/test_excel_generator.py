@@ -0,0 +1,70 @@
+import openpyxl
+
+from excel_generator import ExcelGenerator
+
+
+def test_named_styles_registered_once(tmp_path, make_project_data):
+    out = tmp_path / 'estimate.xlsx'
+    ExcelGenerator().update_expert_estimator(make_project_data(3), output_path=str(out))
+
+    wb = openpyxl.load_workbook(out)
+    for name in (
+        'anc_title',
+        'anc_header',
+        'anc_currency',
+        'anc_total_currency',
+        'anc_note',
+    ):
+        assert wb.named_styles.count(name) == 1
+
+    ws = wb['LED Hardware']
+    assert ws['A1'].style == 'anc_title'
+    assert ws['A3'].style == 'anc_header'
+    assert ws['H4'].style == 'anc_currency'
+    assert ws['H4'].number_format == '$#,##0'
+
+
+def _cell_values(path):
+    wb = openpyxl.load_workbook(path)
+    return {
+        ws.title: [[cell.value for cell in row] for row in ws.iter_rows()] for ws in wb
+    }
+
+
+def test_streaming_mode_matches_in_memory_layout(tmp_path, make_project_data):
+    project_data = make_project_data(3)
+    in_memory = tmp_path / 'in_memory.xlsx'
+    streamed = tmp_path / 'streamed.xlsx'
+
+    ExcelGenerator().update_expert_estimator(
+        project_data, str(in_memory), streaming=False
+    )
+    ExcelGenerator().update_expert_estimator(
+        project_data, str(streamed), streaming=True
+    )
+
+    assert _cell_values(streamed) == _cell_values(in_memory)
+    wb = openpyxl.load_workbook(streamed)
+    assert wb['Labor Analysis']['G17'].style == 'anc_total_currency'
+
+
+def test_skeleton_is_built_once_and_reused(tmp_path, monkeypatch, make_project_data):
+    import excel_generator
+
+    generator = ExcelGenerator()
+    generator.update_expert_estimator(make_project_data(1), str(tmp_path / 'first.xlsx'))
+    skeleton = excel_generator._skeleton_bytes
+    assert skeleton is not None
+
+    def _fail():
+        raise AssertionError('skeleton rebuilt')
+
+    monkeypatch.setattr(generator, '_build_skeleton', _fail)
+    out = tmp_path / 'second.xlsx'
+    generator.update_expert_estimator(make_project_data(2), str(out))
+    assert excel_generator._skeleton_bytes is skeleton
+
+    wb = openpyxl.load_workbook(out)
+    assert 'Screen Details Template' not in wb.sheetnames
+    assert wb.sheetnames[-2:] == ['Screen 1 Details', 'Screen 2 Details']
+    assert wb['Professional Services']['E10'].value > 0
@@ -0,0 +1,44 @@
+import datetime
+import enum
+import json
+from decimal import Decimal
+
+from fast_json import dumps
+
+
+class Level(enum.Enum):
+    GOLD = 'gold'
+
+
+def test_dumps_handles_quote_types(make_project_data):
+    result = make_project_data(1)[0]
+    payload = {
+        'quote': result,
+        'when': datetime.datetime(2024, 1, 2, 3, 4, 5),
+        'level': Level.GOLD,
+        'amount': Decimal('1.5'),
+        1: 'non-string key',
+    }
+
+    decoded = json.loads(dumps(payload))
+
+    assert decoded['quote']['inputs']['width_px'] == result['inputs'].width_px
+    assert decoded['quote']['summary'] == result['summary']
+    assert decoded['when'] == '2024-01-02T03:04:05'
+    assert decoded['level'] == 'gold'
+    assert decoded['amount'] == 1.5
+    assert decoded['1'] == 'non-string key'
+
+
+def test_generate_response_is_gzipped_when_accepted():
+    from fastapi.testclient import TestClient
+    from server import app
+
+    client = TestClient(app)
+    screen = {'product_class': 'Ribbon', 'pixel_pitch': '10', 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+    r = client.post('/api/generate', json={'client_name': 'Gzip Co', 'screens': [screen] * 3},
+                    headers={'Accept-Encoding': 'gzip'})
+
+    assert r.status_code == 200
+    assert r.headers['content-encoding'] == 'gzip'
+    assert len(r.json()['data']) == 3
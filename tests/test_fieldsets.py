@@ -0,0 +1,19 @@
+import pytest
+
+from fieldsets import parse_fields, select
+
+
+def test_views_prune_the_quote_result(make_project_data):
+    result = make_project_data(1)[0]
+
+    assert select(result, None) is result
+    assert list(select(result, parse_fields('summary'))) == ['summary']
+    assert set(select(result, parse_fields('breakdown,inputs'))) == {
+        'inputs', 'pricing', 'cost_breakdown', 'summary'
+    }
+    explained = select(result, parse_fields('explain'))['explain']
+    assert explained['Hardware'] == result['details']['hardware']['calculation']
+    assert 'Structural Labor' in explained
+
+    with pytest.raises(ValueError):
+        parse_fields('summary,everything')
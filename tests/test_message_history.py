@@ -0,0 +1,40 @@
+from sqlalchemy import text
+
+from database import Message, Project
+
+
+def test_history_pages_compress_large_payloads_and_defer_thinking(api_client, db_factory, monkeypatch):
+    from server import MESSAGE_LOG
+
+    reasoning = 'step by step. ' * 500
+    db = db_factory()
+    db.add(Project(id=1, state={}))
+    db.add_all(Message(project_id=1, role='user' if i % 2 else 'assistant', content=f'message {i}',
+                       thinking=reasoning if i == 4 else None) for i in range(7))
+    db.add(Message(project_id=1, role='user', content='zlib:not really compressed'))
+    db.commit()
+    db.close()
+
+    with db_factory.kw['bind'].connect() as conn:
+        stored = dict(conn.execute(text('SELECT content, thinking FROM messages WHERE id = 5')).one()._mapping)
+        assert stored['content'] == 'message 4'
+        assert stored['thinking'].startswith('zlib:') and len(stored['thinking']) < len(reasoning) / 10
+
+    monkeypatch.setattr(MESSAGE_LOG, 'session_factory', db_factory)
+    first = api_client.get('/api/projects/1/messages', params={'limit': 3})
+    assert [m['content'] for m in first.json()] == ['message 5', 'message 6', 'zlib:not really compressed']
+    assert all('thinking' not in m for m in first.json())
+
+    second = api_client.get('/api/projects/1/messages',
+                            params={'limit': 3, 'cursor': first.headers['x-next-cursor'], 'thinking': True})
+    assert [m['content'] for m in second.json()] == ['message 2', 'message 3', 'message 4']
+    assert [m['has_thinking'] for m in second.json()] == [False, False, True]
+    assert second.json()[2]['thinking'] == reasoning
+
+    assert api_client.get('/api/projects/1/messages/5/thinking').json()['thinking'] == reasoning
+    assert api_client.get('/api/projects/1/messages', params={'cursor': 'bad'}).status_code == 400
+
+    assert api_client.delete('/api/projects/1').status_code == 200
+    db = db_factory()
+    assert db.query(Message).count() == 0
+    db.close()
@@ -0,0 +1,72 @@
+import time
+
+from sqlalchemy import event
+
+from database import Message, Project
+from message_log import MessageLog
+
+
+def _seed(factory):
+    """Add projects 1 and 2; returns the list of INSERT INTO messages statements run from now on."""
+    inserts = []
+
+    @event.listens_for(factory.kw['bind'], 'before_cursor_execute')
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO messages'):
+            inserts.append(statement)
+
+    db = factory()
+    db.add_all([Project(id=1, state={}), Project(id=2, state={})])
+    db.commit()
+    db.close()
+    return inserts
+
+
+def _messages(factory):
+    db = factory()
+    try:
+        return [(m.project_id, m.content) for m in db.query(Message).order_by(Message.id)]
+    finally:
+        db.close()
+
+
+def test_messages_are_written_in_batches_and_flushed_on_stop(db_factory):
+    inserts = _seed(db_factory)
+    log = MessageLog(session_factory=db_factory, max_batch=4, flush_interval=30)
+
+    log.append(1, [{'role': 'user', 'content': 'a'}, {'role': 'assistant', 'content': 'b'}])
+    log.append(2, [{'role': 'user', 'content': 'c'}])
+    assert _messages(db_factory) == []
+
+    log.append(1, [{'role': 'user', 'content': 'd'}])  # batch is full
+    deadline = time.time() + 5
+    while log.pending and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert sorted(_messages(db_factory)) == [(1, 'a'), (1, 'b'), (1, 'd'), (2, 'c')]
+    assert len(inserts) == 1
+
+    log.append(2, [{'role': 'user', 'content': 'e'}])
+    log.append(3, [{'role': 'user', 'content': 'orphan'}])  # no such project
+    log.stop()
+    assert _messages(db_factory)[-1] == (2, 'e')
+    assert len(inserts) == 2 and log.pending == 0
+
+
+def test_bulk_endpoint_buffers_messages(api_client, db_factory, monkeypatch):
+    from server import MESSAGE_LOG
+
+    _seed(db_factory)
+    monkeypatch.setattr(MESSAGE_LOG, 'session_factory', db_factory)
+    try:
+        r = api_client.post('/api/projects/1/messages', json=[
+            {'role': 'user', 'content': 'hi'},
+            {'role': 'assistant', 'content': 'hello', 'thinking': 'greet back'},
+        ])
+        assert r.json() == {'status': 'logged', 'count': 2}
+        assert api_client.post('/api/projects/1/message', json={'role': 'user', 'content': 'more'}).status_code == 200
+        assert api_client.post('/api/projects/99/messages', json=[]).status_code == 404
+        MESSAGE_LOG.flush(1)
+        assert _messages(db_factory) == [(1, 'hi'), (1, 'hello'), (1, 'more')]
+    finally:
+        MESSAGE_LOG.stop()
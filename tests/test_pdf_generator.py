@@ -0,0 +1,104 @@
+import socket
+
+from PIL import Image as PILImage
+
+from brand_assets import BrandAssetCache, CachedImage, VectorRule
+from pdf_generator import PDFGenerator
+
+
+def test_proposal_renders_without_network(monkeypatch, make_project_data):
+    def _no_network(*args, **kwargs):
+        raise AssertionError('PDF rendering opened a socket')
+
+    monkeypatch.setattr(socket, 'create_connection', _no_network)
+    monkeypatch.setattr(socket.socket, 'connect', _no_network)
+
+    pdf = PDFGenerator().render_proposal(make_project_data(2), 'Test Co')
+    assert pdf.startswith(b'%PDF')
+
+
+def test_brand_assets_load_once_with_vector_fallback(tmp_path):
+    PILImage.new('RGB', (20, 4), (59, 130, 246)).save(tmp_path / 'rule.png')
+    logo = {'path_png': 'missing.png', 'rule_path_png': 'rule.png', 'width': 150, 'height': 50}
+
+    cache = BrandAssetCache(logo=logo, root=str(tmp_path))
+    assert cache.load() == {'logo': False, 'rule': True}
+    reader = cache.get('rule')
+
+    (tmp_path / 'rule.png').unlink()
+    assert cache.load() == {'logo': False, 'rule': True}
+    assert cache.get('rule') is reader
+    assert isinstance(cache.rule(556, 5), CachedImage)
+    assert cache.logo() is None
+
+    empty = BrandAssetCache(logo=logo, root=str(tmp_path / 'none'))
+    assert isinstance(empty.rule(556, 5), VectorRule)
+
+
+def test_page_furniture_is_one_form_shared_by_every_page(make_project_data):
+    import pdf_generator
+
+    assert PDFGenerator().styles is PDFGenerator().styles is pdf_generator.STYLES
+
+    pdf = PDFGenerator().render_proposal(make_project_data(40), 'Test Co')
+    assert pdf.count(b'/Type /Page\n') > 1
+    # Header and footer are each recorded once and drawn on every page
+    assert pdf.count(b'/Subtype /Form') == 2
+
+
+def test_paginated_tables_fit_one_page_each_with_subtotals(make_project_data):
+    from pdf_generator import FRAME_HEIGHT
+    from project_rollup import ProjectRollup
+    from reportlab.platypus import Table
+
+    project_data = make_project_data(45)
+    rollup = ProjectRollup.from_project_data(project_data)
+    generator = PDFGenerator()
+    tables = [
+        f
+        for f in generator._paginated_product_tables(
+            rollup, rollup.totals['sell_price'], FRAME_HEIGHT - 100
+        )
+        if isinstance(f, Table)
+    ]
+
+    assert len(tables) > 1
+    assert all(t._cellvalues[0][0] == 'Item Description' for t in tables)
+    assert all(sum(t._argH) <= FRAME_HEIGHT for t in tables)
+    assert sum(len(t._cellvalues) - 2 for t in tables) - 1 == 45
+    subtotals = [t._cellvalues[-2 if t is tables[-1] else -1][4] for t in tables]
+    assert sum(float(s.strip('$').replace(',', '')) for s in subtotals) == round(
+        rollup.totals['sell_price'], 2
+    )
+
+    pdf = generator.render_proposal(project_data, 'Test Co')
+    assert pdf.count(b'/Type /Page\n') == len(tables)
+
+
+def test_grand_total_label_never_touches_a_large_amount(make_project_data):
+    from pdf_generator import FRAME_HEIGHT
+    from project_rollup import ProjectRollup
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.platypus import Table
+
+    rollup = ProjectRollup.from_project_data(make_project_data(2))
+    tables = [
+        f
+        for f in PDFGenerator()._paginated_product_tables(rollup, 18_020_003_980.0, FRAME_HEIGHT)
+        if isinstance(f, Table)
+    ]
+    table = tables[-1]
+    table.wrap(556, FRAME_HEIGHT)
+    row = len(table._cellvalues) - 1
+    values = table._cellvalues[row]
+    col = next(c for c, v in enumerate(values) if v.startswith('$'))
+    label, amount = table._cellStyles[row][0], table._cellStyles[row][col]
+    assert values[0] == 'TOTAL:'
+
+    # Cell edges come from the spans the style sets on the total row
+    cols = table._colpositions
+    label_end = table._spanRanges[(0, row)][2] + 1
+    amount_end = table._spanRanges[(col, row)][2] + 1
+    amount_left = cols[amount_end] - amount.rightPadding - stringWidth(values[col], amount.fontname, amount.fontsize)
+    assert amount_left - amount.leftPadding >= cols[col]
+    assert amount_left - (cols[label_end] - label.rightPadding) >= 12
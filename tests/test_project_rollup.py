@@ -0,0 +1,23 @@
+from project_rollup import ProjectRollup
+
+
+def test_rollup_totals_match_per_screen_columns(make_project_data):
+    project_data = make_project_data(4)
+    rollup = ProjectRollup.from_project_data(project_data)
+
+    assert len(rollup) == 4
+    assert [s.number for s in rollup.screens] == [1, 2, 3, 4]
+    assert rollup.totals['sell_price'] == sum(
+        q['summary']['final_sell_price'] for q in project_data
+    )
+    assert rollup.totals['structural'] == sum(
+        s.structural_total for s in rollup.screens
+    )
+
+    first = rollup.screens[0]
+    details = project_data[0]['details']
+    assert first.hardware == details['hardware']['raw_cost']
+    assert (
+        first.electrical_labor == details['electrical']['electrical_labor']['raw_cost']
+    )
+    assert first.labor_total == first.led_installation + first.electrical_labor
@@ -0,0 +1,48 @@
+from database import Message, Project
+
+
+def test_search_backfills_then_follows_saves_messages_and_deletes(api_client, db_factory, monkeypatch):
+    from server import MESSAGE_LOG
+
+    db = db_factory()
+    db.add(Project(id=1, organization_id=1, client_name='Green Bay Packers',
+                   state={'address': '1265 Lombardi Ave', 'projectName': 'Lambeau Field ribbon'}))
+    db.add(Project(id=2, organization_id=2, client_name='Lambert Transit', state={}))
+    db.add(Message(project_id=1, role='user', content='Can we quote the south end zone scoreboard?'))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(MESSAGE_LOG, 'session_factory', db_factory)
+    try:
+        # Rows written before the index existed are back-filled
+        hits = api_client.get('/api/search', params={'q': 'lamb'}).json()
+        assert sorted(h['project_id'] for h in hits) == [1, 2]
+        assert api_client.get('/api/search', params={'q': 'scoreboard'}).json()[0]['kind'] == 'message'
+        scoped = api_client.get('/api/search', params={'q': 'lamb', 'org_id': 2}).json()
+        assert [h['client_name'] for h in scoped] == ['Lambert Transit']
+
+        # Saves and flushed messages are indexed incrementally
+        api_client.put('/api/projects/2/state', json={'clientName': 'Lambert Transit',
+                                                      'address': 'Union Station, Denver'},
+                       headers={'If-Match': '0'})
+        api_client.post('/api/projects/2/messages', json=[{'role': 'user', 'content': 'Denver concourse LED wall'}])
+        MESSAGE_LOG.flush()
+        denver = api_client.get('/api/search', params={'q': 'denver'}).json()
+        assert sorted(h['kind'] for h in denver) == ['message', 'project']
+        assert all(h['project_id'] == 2 for h in denver)
+
+        # Keyset pages cover every hit once
+        seen, cursor = [], None
+        while True:
+            r = api_client.get('/api/search', params={'q': 'lamb', 'limit': 1, **({'cursor': cursor} if cursor else {})})
+            seen.extend((h['kind'], h['project_id']) for h in r.json())
+            cursor = r.headers.get('x-next-cursor')
+            if not cursor:
+                break
+        assert sorted(seen) == [('project', 1), ('project', 2)]
+
+        api_client.delete('/api/projects/2')
+        assert api_client.get('/api/search', params={'q': 'denver'}).json() == []
+        assert api_client.get('/api/search', params={'q': '   '}).json() == []
+    finally:
+        MESSAGE_LOG.stop()
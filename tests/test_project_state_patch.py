@@ -0,0 +1,81 @@
+import pytest
+
+import project_history
+from database import Project, ProjectRevision
+from json_patch import JsonPatchError, apply_patch, make_patch
+
+
+def test_apply_patch_operations_and_make_patch_round_trip():
+    doc = {'a': {'b': 1}, 'list': [1, 2], 'x/y': 'slash'}
+    patched = apply_patch(doc, [
+        {'op': 'add', 'path': '/list/-', 'value': 3},
+        {'op': 'replace', 'path': '/a/b', 'value': 2},
+        {'op': 'move', 'from': '/x~1y', 'path': '/moved'},
+        {'op': 'copy', 'from': '/a', 'path': '/a2'},
+        {'op': 'test', 'path': '/a2/b', 'value': 2},
+        {'op': 'remove', 'path': '/list/0'},
+    ])
+    assert patched == {'a': {'b': 2}, 'a2': {'b': 2}, 'list': [2, 3], 'moved': 'slash'}
+    assert doc['list'] == [1, 2]
+
+    with pytest.raises(JsonPatchError):
+        apply_patch(doc, [{'op': 'test', 'path': '/a/b', 'value': 5}])
+    with pytest.raises(JsonPatchError):
+        apply_patch(doc, [{'op': 'remove', 'path': '/missing'}])
+
+    new = {'a': {'b': 1, 'c': True}, 'list': [1], 'z': None}
+    assert apply_patch(doc, make_patch(doc, new)) == new
+    assert make_patch(new, new) == []
+
+
+@pytest.fixture
+def client(api_client, db_factory, monkeypatch):
+    monkeypatch.setattr(project_history, 'SNAPSHOT_EVERY', 3)
+    db = db_factory()
+    db.add(Project(id=1, client_name='Legacy', state={'clientName': 'Legacy', 'width': 10}))
+    db.commit()
+    db.close()
+    return api_client
+
+
+def test_patches_apply_with_optimistic_concurrency_and_rebuild_history(client, db_factory):
+    states = [{'clientName': 'Legacy', 'width': 10}]
+    for width in range(11, 16):
+        base = client.get('/api/projects/1').json()
+        patch = [{'op': 'replace', 'path': '/width', 'value': width}]
+        r = client.patch('/api/projects/1/state', json={'version': base['version'], 'patch': patch})
+        assert r.status_code == 200 and r.json()['version'] == base['version'] + 1
+        states.append(dict(states[-1], width=width))
+
+    stale = client.patch('/api/projects/1/state',
+                         json={'version': 2, 'patch': [{'op': 'add', 'path': '/x', 'value': 1}]})
+    assert stale.status_code == 409 and stale.json()['detail']['version'] == 5
+    bad = client.patch('/api/projects/1/state',
+                       json={'version': 5, 'patch': [{'op': 'remove', 'path': '/nope'}]})
+    assert bad.status_code == 422
+
+    full = dict(states[-1], clientName='Renamed', finalPrice=1234.5)
+    assert client.put('/api/projects/1/state', json=full).status_code == 428
+    stale = client.put('/api/projects/1/state', json=full, headers={'If-Match': '"4"'})
+    assert stale.status_code == 409 and stale.json()['detail']['version'] == 5
+    assert client.put('/api/projects/1/state', json=full,
+                      headers={'If-Match': '"5"'}).json() == {'status': 'saved', 'version': 6}
+    states.append(full)
+
+    for version, state in enumerate(states):
+        assert client.get('/api/projects/1', params={'version': version}).json()['state'] == state
+    assert client.get('/api/projects/1', params={'version': 7}).status_code == 404
+
+    db = db_factory()
+    project = db.get(Project, 1)
+    assert (project.client_name, project.final_price) == ('Renamed', 1234.5)
+    revisions = db.query(ProjectRevision).order_by(ProjectRevision.version).all()
+    assert [r.version for r in revisions if r.snapshot is not None] == [0, 3, 6]
+    assert revisions[-1].patch == [
+        {'op': 'replace', 'path': '/clientName', 'value': 'Renamed'},
+        {'op': 'add', 'path': '/finalPrice', 'value': 1234.5},
+    ]
+    db.close()
+
+    listed = client.get('/api/projects/1/revisions', params={'limit': 2}).json()
+    assert [(r['version'], r['snapshot']) for r in listed] == [(6, True), (5, False)]
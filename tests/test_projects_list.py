@@ -0,0 +1,47 @@
+import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+from database import Base, Project, ensure_columns
+
+
+def test_keyset_pages_cover_every_project_without_state(api_client, db_factory):
+    db = db_factory()
+    base = datetime.datetime(2025, 1, 1)
+    for i in range(7):
+        db.add(Project(client_name=f'Client {i}', organization_id=1 if i % 2 else 2,
+                       state={'big': 'x' * 1000}, final_price=1000.0 * i,
+                       created_at=base, updated_at=base + datetime.timedelta(minutes=i // 2)))
+    db.commit()
+    db.close()
+
+    seen, cursor = [], None
+    while True:
+        r = api_client.get('/api/projects', params={'limit': 3, **({'cursor': cursor} if cursor else {})})
+        assert r.status_code == 200
+        seen.extend(r.json())
+        cursor = r.headers.get('x-next-cursor')
+        if not cursor:
+            break
+
+    assert [p['client_name'] for p in seen] == [f'Client {i}' for i in reversed(range(7))]
+    assert all('state' not in p for p in seen)
+    assert seen[0]['final_price'] == 6000.0
+
+    org = api_client.get('/api/projects', params={'org_id': 1}).json()
+    assert {p['organization_id'] for p in org} == {1} and len(org) == 3
+    assert api_client.get('/api/projects', params={'cursor': 'nope'}).status_code == 400
+
+
+def test_ensure_columns_upgrades_an_old_projects_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE projects (id INTEGER PRIMARY KEY, client_name VARCHAR, '
+                          'state JSON, created_at DATETIME, updated_at DATETIME, organization_id INTEGER)'))
+
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+
+    columns = {c['name'] for c in inspect(engine).get_columns('projects')}
+    assert 'final_price' in columns
+    assert 'ix_projects_updated_at_id' in {i['name'] for i in inspect(engine).get_indexes('projects')}
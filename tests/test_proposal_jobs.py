@@ -0,0 +1,130 @@
+import datetime
+import time
+
+import pytest
+
+from database import ProposalJob
+from project_rollup import ProjectRollup
+from proposal_jobs import JobQueueFull, ProposalJobQueue
+from proposal_pipeline import ProposalPipeline, render_with
+
+
+def _queue(factory, make_project_data, **kwargs):
+    def _pricing(ctx):
+        ctx.project_data = make_project_data(ctx.request['screens'])
+        ctx.rollup = ProjectRollup.from_project_data(ctx.project_data)
+
+    pipeline = ProposalPipeline([
+        ('inputs', lambda ctx: None),
+        ('pricing', _pricing),
+        ('rendering', render_with(lambda project_data, client_name, rollup: (b'PK-excel', b'%PDF-pdf'))),
+    ])
+    return ProposalJobQueue(
+        pipeline,
+        session_factory=factory,
+        **kwargs,
+    )
+
+
+def _wait(factory, job_id):
+    for _ in range(200):
+        db = factory()
+        job = db.get(ProposalJob, job_id)
+        db.close()
+        if job.status in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError('job did not finish')
+
+
+def test_job_runs_stages_and_stores_artifacts(db_factory, make_project_data):
+    jobs = _queue(db_factory, make_project_data, workers=1).start()
+    try:
+        job = _wait(db_factory, jobs.submit({'client_name': 'Test Co', 'screens': 2}))
+    finally:
+        jobs.stop()
+
+    assert job.status == 'succeeded'
+    assert set(job.timings) == {'inputs', 'pricing', 'rendering', 'storing'}
+    assert job.result['screens'] == 2
+    db = db_factory()
+    assert db.get(ProposalJob, job.id).pdf == b'%PDF-pdf'
+    db.close()
+
+
+def test_full_queue_refuses_and_restart_requeues_only_stale_jobs(db_factory, make_project_data):
+    idle = _queue(db_factory, make_project_data, workers=0, max_queue=1)
+    idle.submit({'client_name': 'x', 'screens': 1})
+    with pytest.raises(JobQueueFull):
+        idle.submit({'client_name': 'y', 'screens': 1})
+    db = db_factory()
+    assert db.query(ProposalJob).count() == 1  # the refused job is not kept
+    db.query(ProposalJob).delete()
+
+    # A job left running by a dead process is picked up again on start();
+    # one whose worker is still heartbeating is left alone
+    now = datetime.datetime.utcnow()
+    db.add(ProposalJob(id='left-over', status='running', stage='rendering', worker_id='gone',
+                       heartbeat_at=now - datetime.timedelta(minutes=5),
+                       request={'client_name': 'Test Co', 'screens': 1}, timings={}))
+    db.add(ProposalJob(id='elsewhere', status='running', stage='rendering', worker_id='alive',
+                       heartbeat_at=now, request={'client_name': 'Test Co', 'screens': 1}, timings={}))
+    db.commit()
+    db.close()
+
+    jobs = _queue(db_factory, make_project_data, workers=1).start()
+    try:
+        assert _wait(db_factory, 'left-over').status == 'succeeded'
+    finally:
+        jobs.stop()
+    db = db_factory()
+    assert (db.get(ProposalJob, 'left-over').worker_id, db.get(ProposalJob, 'elsewhere').status) == (
+        jobs.worker_id, 'running')
+    db.close()
+
+
+def test_finished_jobs_drop_their_files_after_the_ttl(db_factory, make_project_data):
+    jobs = _queue(db_factory, make_project_data, workers=1, result_ttl=3600).start()
+    try:
+        job_id = jobs.submit({'client_name': 'Test Co', 'screens': 1})
+        _wait(db_factory, job_id)
+    finally:
+        jobs.stop()
+    assert jobs.purge_expired() == 0
+
+    db = db_factory()
+    db.get(ProposalJob, job_id).finished_at -= datetime.timedelta(hours=2)
+    db.commit()
+    db.close()
+    assert jobs.purge_expired() == 1
+
+    db = db_factory()
+    job = db.get(ProposalJob, job_id)
+    assert (job.status, job.excel, job.pdf) == ('expired', None, None)
+    db.close()
+
+
+def test_job_api_submit_poll_download():
+    from fastapi.testclient import TestClient
+    from server import app
+
+    client = TestClient(app)
+    payload = {
+        'client_name': 'Test Co',
+        'screens': [
+            {'product_class': 'Ribbon', 'pixel_pitch': '10', 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+        ],
+    }
+    r = client.post('/api/jobs/proposals', json=payload)
+    assert r.status_code == 202
+    status_url = r.json()['status_url']
+
+    for _ in range(300):
+        body = client.get(status_url).json()
+        if body['status'] in ('succeeded', 'failed'):
+            break
+        time.sleep(0.05)
+    assert body['status'] == 'succeeded', body
+    assert body['progress'] == 1.0
+    assert client.get(body['downloads']['pdf']).content.startswith(b'%PDF')
+    assert client.get('/api/jobs/missing').status_code == 404
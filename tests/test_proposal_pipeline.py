@@ -0,0 +1,42 @@
+from proposal_pipeline import PipelineContext, default_pipeline
+
+
+def _request():
+    screen = {'product_class': 'Ribbon', 'pixel_pitch': '10', 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+    return {'client_name': 'Test Co', 'screens': [screen, dict(screen, mounting_type='Rigging')]}
+
+
+def test_pipeline_runs_every_stage_and_times_it():
+    rendered = []
+
+    def render(project_data, client_name, rollup):
+        rendered.append((len(project_data), client_name, len(rollup)))
+        return b'PK-excel', b'%PDF-pdf'
+
+    started = []
+    ctx = default_pipeline(render).run(
+        PipelineContext(request=_request()), lambda name, ctx: started.append(name)
+    )
+
+    assert started == ['inputs', 'pricing', 'rendering', 'persist', 'outbox']
+    assert set(ctx.timings) == set(started)
+    assert rendered == [(2, 'Test Co', 2)]
+    assert ctx.project_data[1]['inputs'].mounting_type == 'Rigging'
+    assert ctx.project_data[0]['inputs'].width_px == int(40 * 304.8 / 10)
+    assert ctx.artifacts['pdf'].content == b'%PDF-pdf'
+    assert ctx.outbox is None
+
+
+def test_stages_can_be_swapped_and_dropped():
+    stored = {}
+    pipeline = (
+        default_pipeline(lambda *args: (b'x', b'y'))
+        .without('outbox')
+        .with_stage('persist', lambda ctx: stored.update(excel=ctx.excel))
+    )
+
+    ctx = pipeline.run(PipelineContext(request=_request()))
+
+    assert pipeline.stage_names == ['inputs', 'pricing', 'rendering', 'persist']
+    assert stored == {'excel': b'x'}
+    assert ctx.artifacts == {}
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from provider_orchestrator import CircuitBreaker, NoProviderAvailable, Provider, ProviderOrchestrator
+
+
+def _fake(delay=0.0, results=('hit',), fail=False):
+    calls = []
+
+    async def fetch(query):
+        calls.append(query)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError('upstream down')
+        return list(results)
+
+    fetch.calls = calls
+    return fetch
+
+
+def test_slow_primary_is_hedged_within_the_latency_budget():
+    slow, fast = _fake(delay=2.0, results=['slow']), _fake(results=['fast'])
+    orchestrator = ProviderOrchestrator(
+        [Provider('primary', slow), Provider('fallback', fast)], hedge_after=0.05
+    )
+
+    async def main():
+        started = time.perf_counter()
+        results = await orchestrator.first('venue')
+        await asyncio.sleep(0)  # let the cancelled primary unwind
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(main())
+    assert results == ['fast']
+    assert elapsed < 0.5
+    stats = orchestrator.stats()
+    assert stats['primary']['hedged'] == 1
+    assert stats['fallback']['calls'] == 1 and stats['fallback']['p50_ms'] is not None
+
+
+def test_breaker_opens_skips_and_probes_half_open():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+    broken = _fake(fail=True)
+    fallback = _fake(results=['fallback'])
+    orchestrator = ProviderOrchestrator(
+        [Provider('primary', broken, breaker), Provider('fallback', fallback)], hedge_after=1
+    )
+
+    async def lookups(n):
+        return [await orchestrator.first('q') for _ in range(n)]
+
+    assert asyncio.run(lookups(3)) == [['fallback']] * 3
+    assert len(broken.calls) == 2 and breaker.state == 'open'
+
+    # After the reset period exactly one probe goes out; a failure re-opens
+    now[0] = 11
+    asyncio.run(lookups(2))
+    assert len(broken.calls) == 3 and breaker.state == 'open'
+
+    now[0] = 22
+    orchestrator.providers[0].fetch = _fake(results=['primary'])
+    assert asyncio.run(lookups(1)) == [['primary']]
+    assert breaker.state == 'closed'
+
+
+def test_all_failing_raises_so_callers_do_not_cache():
+    orchestrator = ProviderOrchestrator(
+        [Provider('a', _fake(fail=True)), Provider('b', _fake(results=[]))], hedge_after=1
+    )
+    with pytest.raises(NoProviderAvailable):
+        asyncio.run(orchestrator.first('q'))
+
+    empty = ProviderOrchestrator([Provider('a', _fake(results=[]))], hedge_after=1)
+    assert asyncio.run(empty.first('q')) == []
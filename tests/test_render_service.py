@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+
+from render_service import RenderQueueFull, RenderService, RenderTimeout
+
+
+def test_pool_renders_excel_and_pdf_in_parallel(make_project_data):
+    service = RenderService(workers=2, max_queue=4, timeout=60).start()
+    try:
+        excel, pdf = asyncio.run(service.render(make_project_data(3), 'Test Co'))
+        assert excel.startswith(b'PK')
+        assert pdf.startswith(b'%PDF')
+
+        excel, pdf = service.render_sync(make_project_data(1), 'Test Co')
+        assert excel.startswith(b'PK') and pdf.startswith(b'%PDF')
+        assert service.in_flight == 0
+    finally:
+        service.shutdown()
+
+
+def test_queue_depth_and_timeout_are_enforced(make_project_data):
+    with pytest.raises(RenderQueueFull):
+        RenderService(workers=0, max_queue=0).render_sync(make_project_data(1), 'Test Co')
+
+    service = RenderService(workers=1, max_queue=4, timeout=0.0001).start()
+    try:
+        with pytest.raises(RenderTimeout):
+            asyncio.run(service.render(make_project_data(200), 'Test Co'))
+        # The running job cannot be cancelled, so it keeps its slot until done
+        assert service.in_flight == 1
+        deadline = time.time() + 60
+        while service.in_flight and time.time() < deadline:
+            time.sleep(0.05)
+        assert service.in_flight == 0
+    finally:
+        service.shutdown()
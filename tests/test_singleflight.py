@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from singleflight import IdempotencyConflict, SingleFlight, request_fingerprint
+
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({'a': 1, 'b': [1, 2]}) == request_fingerprint({'b': [1, 2], 'a': 1})
+    assert request_fingerprint({'a': 1}) != request_fingerprint({'a': 2})
+
+
+def test_concurrent_calls_share_one_computation_and_replay():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'n': len(calls)}
+
+    async def main():
+        flights = SingleFlight(ttl_seconds=60)
+        results = await asyncio.gather(*(flights.do('k', 'fp', work) for _ in range(5)))
+        replay = await flights.do('k', 'fp', work)
+        with pytest.raises(IdempotencyConflict):
+            await flights.do('k', 'other', work)
+        return results, replay
+
+    results, replay = asyncio.run(main())
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert replay == ({'n': 1}, True)
+
+
+def test_failures_reach_waiters_but_are_not_cached():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError('boom')
+        return 'ok'
+
+    async def main():
+        flights = SingleFlight(ttl_seconds=60)
+        first = await asyncio.gather(
+            flights.do('k', 'fp', flaky), flights.do('k', 'fp', flaky), return_exceptions=True
+        )
+        return first, await flights.do('k', 'fp', flaky)
+
+    first, retry = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in first)
+    assert retry == ('ok', False)
+
+
+def test_generate_replays_by_idempotency_key_and_rejects_reuse():
+    from fastapi.testclient import TestClient
+    from server import app
+
+    client = TestClient(app)
+    screen = {'product_class': 'Ribbon', 'pixel_pitch': '10', 'width_ft': 40, 'height_ft': 6, 'is_outdoor': True}
+    body = {'client_name': 'Replay Co', 'screens': [screen]}
+    headers = {'Idempotency-Key': 'replay-test-key'}
+
+    first = client.post('/api/generate', json=body, headers=headers)
+    second = client.post('/api/generate', json=body, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert 'x-idempotent-replay' not in first.headers
+    assert second.headers['x-idempotent-replay'] == 'true'
+    assert second.json()['artifacts'] == first.json()['artifacts']
+
+    reused = client.post('/api/generate', json=dict(body, client_name='Other Co'), headers=headers)
+    assert reused.status_code == 422
@@ -0,0 +1,85 @@
+import time
+
+from venue_index import VenueIndex, project_entry
+
+
+def test_prefix_alias_and_typo_queries_hit_bundled_venues(tmp_path):
+    index = VenueIndex(str(tmp_path / 'venues.json')).build()
+
+    assert index.search('lamb')[0]['title'] == 'Lambeau Field'
+    assert index.search('green bay packers')[0]['title'] == 'Lambeau Field'
+    assert index.search('lambaeu')[0]['title'] == 'Lambeau Field'
+    assert index.search('Levi\'s')[0]['lng'] == -121.97
+    assert index.search('zzzz qqqq') == []
+
+
+def test_project_addresses_persist_and_can_be_removed(tmp_path):
+    path = str(tmp_path / 'venues.json')
+    state = {'address': '500 Center Court Dr, Springfield, IL', 'lat': 39.8, 'lng': -89.6}
+    index = VenueIndex(path).build([project_entry(7, 'Springfield Arena Co', state)])
+    assert project_entry(8, 'No Address', {}) is None
+    index.save()
+
+    loaded = VenueIndex(path)
+    assert loaded.load()
+    hit = loaded.search('springfield arena')[0]
+    assert hit['address'] == state['address'] and hit['source'] == 'local'
+
+    assert loaded.remove('project:7')
+    loaded.save()
+    reloaded = VenueIndex(path)
+    assert reloaded.load()
+    assert reloaded.search('springfield arena') == []
+    assert len(reloaded) == len(loaded)
+
+
+def test_only_venue_name_prefixes_are_strong_matches(tmp_path):
+    index = VenueIndex(str(tmp_path / 'venues.json')).build()
+
+    for query in ['lamb', 'green bay packers', "Levi's", 'union station']:
+        assert index.match(query)[1], query
+    # Street addresses and near-miss names share words with venues but name none
+    for query in ['1 Main St, Boston', '350 Fifth Avenue New York', 'Houston Texas 77002',
+                  'Union Station Denver', 'Target Center', 'Dallas TX', 'lambaeu']:
+        assert not index.match(query)[1], query
+
+
+def test_address_queries_reach_the_geocoders_behind_local_hits(tmp_path, monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, 'VENUE_INDEX', VenueIndex(str(tmp_path / 'venues.json')).build())
+    remote_queries = []
+
+    async def remote(query):
+        remote_queries.append(query)
+        return [{'title': 'Target Center', 'address': '600 N 1st Ave, Minneapolis, MN', 'lat': 44.98, 'lng': -93.28}]
+
+    monkeypatch.setattr(server.ADDRESS_SEARCH, 'search', remote)
+    client = TestClient(server.app)
+
+    titles = [r['title'] for r in client.post('/api/search-address', json={'query': 'Target Center'}).json()['results']]
+    assert titles == ['United Center', 'Target Center']
+    assert [r['title'] for r in client.post('/api/search-address', json={'query': 'lamb'}).json()['results']] == [
+        'Lambeau Field']
+    assert remote_queries == ['Target Center']
+
+
+def test_saves_are_batched_off_thread_and_removal_is_targeted(tmp_path):
+    path = tmp_path / 'venues.json'
+    index = VenueIndex(str(path), save_delay=0.05).build()
+    for name in ['Springfield', 'Springfield Arena', 'Springfield Arena Project']:
+        index.add(project_entry(7, 'Co', {'address': '500 Center Court Dr', 'projectName': name}))
+        index.schedule_save()
+    assert not path.exists()
+    time.sleep(0.3)
+    assert VenueIndex(str(path)).load()
+
+    entry_id = index._by_key['project:7']
+    index.remove('project:7')
+    assert not any(entry_id in ids for ids in index._prefix.values())
+    assert not any(entry_id in ids for ids in index._trigram.values())
+    index.schedule_save()
+    index.flush()
+    reloaded = VenueIndex(str(path))
+    assert reloaded.load() and reloaded.search('springfield arena') == []